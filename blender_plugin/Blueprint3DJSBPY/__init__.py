@@ -1,4 +1,8 @@
-import bpy
+try:
+    import bpy
+except ImportError:
+    # Imported outside Blender, only the bp3dpy model is usable
+    bpy = None
 # This program is free software; you can redistribute it and/or modify
 # it under the terms of the GNU General Public License as published by
 # the Free Software Foundation; either version 3 of the License, or
@@ -24,9 +28,10 @@ bl_info = {
 }
 
 # from Blueprint3DJSBPY import properties;
-from . import auto_load
+if bpy:
+    from . import auto_load
 
-auto_load.init()
+    auto_load.init()
 
 def register():
     # properties.register();
@@ -1,35 +1,171 @@
 import bpy;
-from Blueprint3DJSBPY.bp3dpy.core.utils import newCollection;
+import time;
+from Blueprint3DJSBPY.bp3dpy.blender.blenderutils import getCollection, applyUnitSettings;
 from Blueprint3DJSBPY.bp3dpy.blender.room3d import Room3D;
 from Blueprint3DJSBPY.bp3dpy.blender.halfedge3d import HalfEdge3D;
+from Blueprint3DJSBPY.bp3dpy.blender.meshbuilder import MeshBuilder;
+from Blueprint3DJSBPY.bp3dpy.blender.scenesync import SceneSync;
+from Blueprint3DJSBPY.bp3dpy.blender.itemlibrary import ItemLibrary, ItemBuilder;
+from Blueprint3DJSBPY.bp3dpy.geometry.surfaces import halfEdgeSurfaces, roomSurfaces, roomHoles, wallKey;
+from Blueprint3DJSBPY.bp3dpy.geometry.curves import tessellateWalls, curveTolerance;
+from Blueprint3DJSBPY.bp3dpy.core.constants import MESH_MODE_SURFACE, MESH_MODE_WALL, MESH_MODE_COLLECTION, CURVE_QUALITY_RENDER;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import NULL_PROFILER;
 
 
 class BlenderSceneViewer():
-    def __init__(self, context, model, scene, collection, assets_path):
+    def __init__(self, context, model, scene, collection, assets_path, meshMode=MESH_MODE_SURFACE, immediate=True, profiler=None, curveQuality=CURVE_QUALITY_RENDER):
         self.__context = context;
+        self.__curveQuality = curveQuality;
+        self.__profiler = profiler or NULL_PROFILER;
+        self.__meshMode = meshMode;
         self.__collection = collection;
         self.__model = model;
         self.__scene = scene;
         self.__floorplan = self.__model.floorplan;
         self.__assets_path = assets_path;
-        self.__createFloorPlan();
+        self.__library = ItemLibrary(assets_path, self.__profiler);
+        self.__sync = None;
+        self.__jobs = [];
+        self.__collections = {};
+        self.__built = 0;
+        if(immediate):
+            self.__createFloorPlan();
 
     def __createFloorPlan(self):
-        collection = self.__collection;
+        self.plan();
+        self.prepare();
+        self.buildNext();
+        self.finish();
 
-        roomCollection = newCollection('rooms');#bpy.data.collections.get('rooms') or bpy.data.collections.new('rooms');
-        wallCollection = newCollection('walls');#bpy.data.collections.get('walls') or bpy.data.collections.new('walls');
-
-        collection.children.link(roomCollection);
-        collection.children.link(wallCollection);
+    def plan(self):
+        # All the geometry, uvs and content hashes, no bpy calls. Safe to run on a worker thread
+        with self.__profiler.span('plan'):
+            return self.__plan();
 
+    def __plan(self):
+        profiler = self.__profiler;
         rooms = self.__floorplan.rooms;
         wallEdges = self.__floorplan.wallEdges();
 
-        for room in rooms:
-            room3d = Room3D(self.__scene, room, roomCollection, self.__context, self.__assets_path);
+        with profiler.span('curves'):
+            curved = tessellateWalls(self.__floorplan.walls, curveTolerance(self.__curveQuality));
+        profiler.count('curved walls', curved);
+
+        with profiler.span('surfaces'):
+            holes = roomHoles(rooms);
+            if(self.__meshMode == MESH_MODE_WALL):
+                jobs = self.__planMergedPerEntity(rooms, holes, wallEdges);
+            elif(self.__meshMode == MESH_MODE_COLLECTION):
+                jobs = self.__planMergedPerCollection(rooms, holes, wallEdges);
+            else:
+                jobs = [];
+                for room, roomHoleOutlines in zip(rooms, holes):
+                    jobs.extend(('rooms', builder) for builder in Room3D.surfaceBuilders(room, self.__context, self.__assets_path, profiler, roomHoleOutlines));
+
+                for halfEdge in wallEdges:
+                    jobs.extend(('walls', builder) for builder in HalfEdge3D.surfaceBuilders(halfEdge, self.__context, self.__assets_path, profiler));
+
+        # One instance per placement, the models are imported when built
+        with profiler.span('items'):
+            jobs.extend(('items', ItemBuilder(item, self.__library)) for item in self.__model.roomItems);
+        profiler.count('item instances', len(self.__model.roomItems));
+
+        # The mesh arrays are computed along with the hashes
+        with profiler.span('arrays'):
+            for collectionName, builder in jobs:
+                builder.contentHash();
+        profiler.count('planned objects', len(jobs));
+        self.__jobs = jobs;
+        self.__built = 0;
+        return jobs;
+
+    def prepare(self, collection=None, scene=None):
+        # Blender side setup, on the main thread
+        with self.__profiler.span('prepare'):
+            self.__prepare(collection, scene);
+
+    def __prepare(self, collection, scene):
+        if(collection):
+            self.__collection = collection;
+        if(scene):
+            self.__scene = scene;
+        applyUnitSettings(self.__scene);
+
+        # Existing collections and unchanged objects from a previous import are kept
+        roomCollection = getCollection('rooms', self.__collection);
+        wallCollection = getCollection('walls', self.__collection);
+        itemCollection = getCollection('items', self.__collection);
+        self.__collections = {'rooms': roomCollection, 'walls': wallCollection, 'items': itemCollection};
+        self.__sync = SceneSync([roomCollection, wallCollection, itemCollection]);
+
+    def buildNext(self, budget=None):
+        # Builds the planned objects for at most budget seconds, returns True when all are built
+        started = time.perf_counter();
+        with self.__profiler.span('build'):
+            while(self.__built < len(self.__jobs)):
+                collectionName, builder = self.__jobs[self.__built];
+                self.__sync.build(builder, self.__collections[collectionName]);
+                self.__built += 1;
+                if(budget is not None and time.perf_counter() - started >= budget):
+                    break;
+        return self.__built >= len(self.__jobs);
 
+    def finish(self):
+        with self.__profiler.span('finish'):
+            self.__sync.removeStale();
+            self.__library.commit();
+        self.__profiler.count('objects kept', self.__sync.kept);
+        self.__profiler.count('objects removed', self.__sync.removed);
+        print('BP3DJS IMPORT ::: kept %d, built %d, removed %d objects'%(self.__sync.kept, self.__sync.built, self.__sync.removed));
+
+    def cancel(self):
+        # Removes the objects built so far, the previous import is left untouched
+        if(self.__sync):
+            self.__sync.rollback();
+        self.__library.rollback();
+        self.__built = 0;
+
+    def __planMergedPerEntity(self, rooms, holes, wallEdges):
+        # One object per room (floor and roof) and one per wall (both of its half edges)
+        jobs = [];
+        for room, roomHoleOutlines in zip(rooms, holes):
+            builder = MeshBuilder('room-%s'%(room.getUuid()), self.__context, self.__assets_path, profiler=self.__profiler);
+            builder.addSurfaces(roomSurfaces(room, roomHoleOutlines));
+            jobs.append(('rooms', builder));
+
+        wallBuilders = {};
+        for halfEdge in wallEdges:
+            wall = halfEdge.wall;
+            builder = wallBuilders.get(wall.id);
+            if(not builder):
+                builder = wallBuilders[wall.id] = MeshBuilder('wall-%s'%(wall.id), self.__context, self.__assets_path, 'wall-%s'%(wallKey(wall)), self.__profiler);
+            builder.addSurfaces(halfEdgeSurfaces(halfEdge));
+
+        jobs.extend(('walls', builder) for builder in wallBuilders.values());
+        return jobs;
+
+    def __planMergedPerCollection(self, rooms, holes, wallEdges):
+        roomBuilder = MeshBuilder('rooms', self.__context, self.__assets_path, profiler=self.__profiler);
+        for room, roomHoleOutlines in zip(rooms, holes):
+            roomBuilder.addSurfaces(roomSurfaces(room, roomHoleOutlines));
+
+        wallBuilder = MeshBuilder('walls', self.__context, self.__assets_path, profiler=self.__profiler);
         for halfEdge in wallEdges:
-            edge3d = HalfEdge3D(self.__scene, halfEdge, wallCollection, self.__context, self.__assets_path);
+            wallBuilder.addSurfaces(halfEdgeSurfaces(halfEdge));
 
+        jobs = [];
+        if(len(roomBuilder.surfaces)):
+            jobs.append(('rooms', roomBuilder));
+        if(len(wallBuilder.surfaces)):
+            jobs.append(('walls', wallBuilder));
+        return jobs;
         
+    @property
+    def profiler(self):
+        return self.__profiler;
+
+    @property
+    def progress(self):
+        if(not len(self.__jobs)):
+            return 1.0;
+        return self.__built / len(self.__jobs);
@@ -0,0 +1,27 @@
+import bpy;
+from Blueprint3DJSBPY.bp3dpy.core import Configuration;
+from Blueprint3DJSBPY.bp3dpy.core.Configuration import configDimUnit;
+from Blueprint3DJSBPY.bp3dpy.core.constants import dimCentiMeter, dimMeter, dimMilliMeter, dimInch, dimFeetAndInch;
+
+BLENDER_LENGTH_UNITS = {dimCentiMeter: 'CENTIMETERS', dimMeter: 'METERS', dimMilliMeter: 'MILLIMETERS', dimInch: 'INCHES', dimFeetAndInch: 'FEET'};
+BLENDER_SYSTEM_UNITS = {dimCentiMeter: 'METRIC', dimMeter: 'METRIC', dimMilliMeter: 'METRIC', dimInch: 'IMPERIAL', dimFeetAndInch: 'IMPERIAL'};
+
+def newCollection(collectionName):
+    collection = bpy.data.collections.get(collectionName);
+    if(collection):
+        bpy.data.collections.remove(collection, do_unlink=True, do_id_user=True, do_ui_user=True);
+    
+    return bpy.data.collections.new(collectionName);
+
+def getCollection(collectionName, parent):
+    # Reuses the collection of a previous import, linked under parent
+    collection = bpy.data.collections.get(collectionName) or bpy.data.collections.new(collectionName);
+    if(parent.children.find(collection.name) == -1):
+        parent.children.link(collection);
+    return collection;
+
+def applyUnitSettings(scene):
+    # Configuration is scene free, the unit system of the loaded design is copied to the scene here
+    unit = Configuration.getStringValue(configDimUnit);
+    scene.unit_settings.system = BLENDER_SYSTEM_UNITS[unit];
+    scene.unit_settings.length_unit = BLENDER_LENGTH_UNITS[unit];
@@ -0,0 +1,139 @@
+import os;
+import bpy;
+import json;
+import hashlib;
+from mathutils import Matrix;
+from Blueprint3DJSBPY.bp3dpy.blender.meshbuilder import KEY_PROPERTY, HASH_PROPERTY;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import NULL_PROFILER;
+
+# Items as collection instances. Every distinct model file is imported once into a
+# collection of the library, which is not linked to any scene, and every placement is
+# an empty instancing that collection. The library is kept in the .blend file, a model
+# is imported again only when its file changed since the previous import. The previous
+# import of a changed model is kept until commit, rollback removes the new imports
+
+LIBRARY_COLLECTION = 'bp3djs-library';
+ASSET_PROPERTY = 'bp3djs_asset';
+STAMP_PROPERTY = 'bp3djs_asset_stamp';
+
+def fileStamp(filepath):
+    # Size and modification time, cheap enough to check on every import
+    if(not os.path.isfile(filepath)):
+        return None;
+    stat = os.stat(filepath);
+    return '%d-%d'%(stat.st_size, stat.st_mtime_ns);
+
+
+class ItemLibrary():
+    def __init__(self, assets_path, profiler=None):
+        self.__assets_path = assets_path;
+        self.__profiler = profiler or NULL_PROFILER;
+        self.__library = None;
+        self.__assets = {};
+        self.__replaced = [];
+        self.__imported = [];
+
+    def filepath(self, modelURL):
+        return os.path.join(self.__assets_path, os.path.normpath(modelURL));
+
+    def __libraryCollection(self):
+        if(not self.__library):
+            self.__library = bpy.data.collections.get(LIBRARY_COLLECTION) or bpy.data.collections.new(LIBRARY_COLLECTION);
+            self.__library.use_fake_user = True;
+            for collection in self.__library.children:
+                if(collection.get(ASSET_PROPERTY)):
+                    self.__assets[collection[ASSET_PROPERTY]] = collection;
+        return self.__library;
+
+    def assetCollection(self, modelURL, stamp):
+        # The collection with the objects of the model, None when the file is missing
+        library = self.__libraryCollection();
+        if(not stamp):
+            return None;
+        collection = self.__assets.get(modelURL);
+        if(collection and collection.get(STAMP_PROPERTY) == stamp):
+            return collection;
+        if(collection):
+            self.__replaced.append(collection);
+
+        with self.__profiler.span('models'):
+            collection = self.__importModel(library, modelURL, stamp);
+        self.__profiler.count('models imported');
+        self.__assets[modelURL] = collection;
+        self.__imported.append(collection);
+        return collection;
+
+    def commit(self):
+        for collection in self.__replaced:
+            self.__removeAsset(collection);
+        self.__replaced = [];
+        self.__imported = [];
+
+    def rollback(self):
+        for collection in self.__imported:
+            self.__removeAsset(collection);
+        for collection in self.__replaced:
+            self.__assets[collection[ASSET_PROPERTY]] = collection;
+        self.__replaced = [];
+        self.__imported = [];
+
+    def __importModel(self, library, modelURL, stamp):
+        before = set(bpy.data.objects);
+        bpy.ops.import_scene.gltf(filepath=self.filepath(modelURL));
+        imported = [obj for obj in bpy.data.objects if not obj in before];
+
+        collection = bpy.data.collections.new('asset-%s'%(os.path.splitext(os.path.basename(modelURL))[0]));
+        collection[ASSET_PROPERTY] = modelURL;
+        collection[STAMP_PROPERTY] = stamp;
+        library.children.link(collection);
+        # The importer links to the active collection, the objects only live in the library
+        for obj in imported:
+            for users in list(obj.users_collection):
+                users.objects.unlink(obj);
+            collection.objects.link(obj);
+        return collection;
+
+    def __removeAsset(self, collection):
+        for obj in list(collection.objects):
+            bpy.data.objects.remove(obj, do_unlink=True);
+        bpy.data.collections.remove(collection);
+
+
+class ItemBuilder():
+    # Same interface as MeshBuilder, so items go through SceneSync like walls and rooms
+    def __init__(self, item, library):
+        self.__item = item;
+        self.__library = library;
+        self.__key = 'item-%s'%(item.key);
+        self.__stamp = fileStamp(library.filepath(item.modelURL)) if item.modelURL else None;
+        self.__contentHash = None;
+
+    def contentHash(self):
+        if(self.__contentHash is None):
+            data = [self.__item.modelURL, self.__stamp, self.__item.transform()];
+            self.__contentHash = hashlib.sha1(json.dumps(data).encode('utf-8')).hexdigest();
+        return self.__contentHash;
+
+    def build(self, collection):
+        obj = bpy.data.objects.new(self.__item.name, None);
+        obj[KEY_PROPERTY] = self.__key;
+        obj[HASH_PROPERTY] = self.contentHash();
+        asset = self.__library.assetCollection(self.__item.modelURL, self.__stamp);
+        if(asset):
+            obj.instance_type = 'COLLECTION';
+            obj.instance_collection = asset;
+        obj.matrix_world = Matrix(self.__item.transform());
+        collection.objects.link(obj);
+        return obj;
+
+    @property
+    def name(self):
+        return self.__item.name;
+
+    @property
+    def key(self):
+        return self.__key;
+
+    @property
+    def item(self):
+        return self.__item;
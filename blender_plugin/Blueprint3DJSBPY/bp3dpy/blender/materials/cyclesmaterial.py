@@ -1,31 +1,55 @@
 import os;
 import bpy;
-from Blueprint3DJSBPY.bp3dpy.core import Dimensioning;
+from Blueprint3DJSBPY.bp3dpy.geometry.surfaces import texturePackKey;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import NULL_PROFILER;
+
+# Materials are shared by every surface with the same texture pack, looked up by the
+# pack hash over the resolved image paths. The texture repeat is baked into the uvs of
+# each surface (see Surface.scaledUVs) so the Mapping node stays at unit scale. All
+# meshes built by the add-on use the same uv layer name for the normal map node
+UV_MAP_NAME = 'UVMap';
+TEXTURE_KEY_PROPERTY = 'bp3djs_texture_key';
+
+def materialName(texturepack, assets_path=None):
+    return 'bp3djs-%s'%(texturePackKey(texturepack, assets_path)[:16]);
 
 class CyclesMaterial():
 
-    def __init__(self, context, mesh, texturepack, dimensions, assets_path):
+    def __init__(self, context, mesh, texturepack, assets_path, profiler=None):
         self.__mesh = mesh;
         self.__texturepack = texturepack;
+        self.__key = texturePackKey(texturepack, assets_path);
         self.__context = context;
-        self.__dimensions = dimensions;
         self.__assets_path = assets_path;
-        self.__material = self.__createNodeCyclesMaterial();
+        self.__profiler = profiler or NULL_PROFILER;
+        self.__material = self.__getCachedMaterial();
+        if(self.__material):
+            self.__profiler.count('materials reused');
+        else:
+            self.__material = self.__createNodeCyclesMaterial();
+            self.__profiler.count('materials created');
+        if(self.__mesh.data.materials.find(self.__material.name) == -1):
+            self.__mesh.data.materials.append(self.__material);
     
     def __getPath(self, relative_path):
         abs_path_value = os.path.abspath(os.path.join(self.__assets_path, relative_path));
         base_name = bpy.path.basename(abs_path_value);
         return base_name, abs_path_value;
 
-    def __textureRepeatScale(self):
-        repeat = self.__texturepack.get('repeat') or 200;
-        repeat = Dimensioning.cmToMeasureRaw(repeat);
-        repeatX, repeatY = self.__dimensions.x / repeat, self.__dimensions.y / repeat;
-        return repeatX, repeatY;
+    def __getCachedMaterial(self):
+        mat = bpy.data.materials.get(materialName(self.__texturepack, self.__assets_path));
+        if(mat and mat.get(TEXTURE_KEY_PROPERTY) == self.__key):
+            return mat;
+        return None;
 
     def __getImageNode(self, nodes, image_name, image_path):
         image_node = nodes.get(image_name) or nodes.new('ShaderNodeTexImage');
-        image = bpy.data.images.get(image_name) or bpy.data.images.load(image_path);
+        # Looked up by the file path, images of another project can have the same name
+        image = bpy.data.images.get(image_name);
+        if(not image or os.path.abspath(bpy.path.abspath(image.filepath)) != image_path):
+            with self.__profiler.span('images'):
+                image = bpy.data.images.load(image_path, check_existing=True);
+            self.__profiler.count('images loaded');
         image_node.image = image;
         image_node.name = image_name;
         return image_node;
@@ -37,11 +61,10 @@ class CyclesMaterial():
             rgb = tuple(float(int(h[i:i+2], 16))/ 255.0 for i in (0, 2, 4));
             return (rgb[0], rgb[1], rgb[2], 1.0);
 
-        uv_map = self.__mesh.data.uv_layers[0];#.get(self.__mesh.name);
-
         texpack = self.__texturepack;
-        mat_name = self.__mesh.name;
+        mat_name = materialName(texpack, self.__assets_path);
         mat = bpy.data.materials.get(mat_name) or bpy.data.materials.new(mat_name);
+        mat[TEXTURE_KEY_PROPERTY] = self.__key;
 
         mat.use_nodes = True;
         node_tree = mat.node_tree;
@@ -58,8 +81,7 @@ class CyclesMaterial():
         final_base_color.use_clamp = True;
         
 
-        repeatX, repeatY = self.__textureRepeatScale();
-        mapping.inputs[3].default_value = (repeatX, repeatY, repeatY);
+        mapping.inputs[3].default_value = (1.0, 1.0, 1.0);
         node_tree.links.new(texcoord.outputs[2], mapping.inputs[0]);
 
         
@@ -82,7 +104,7 @@ class CyclesMaterial():
             normal_map_image_node = self.__getImageNode(nodes, normal_map_image_name, normal_map_image_path);
 
             normal_map_nmap_node = nodes.get('Normal Map') or nodes.new('ShaderNodeNormalMap');
-            normal_map_nmap_node.uv_map = uv_map.name;
+            normal_map_nmap_node.uv_map = UV_MAP_NAME;
 
             node_tree.links.new(mapping.outputs[0], normal_map_image_node.inputs[0]);
             node_tree.links.new(normal_map_image_node.outputs[0], normal_map_nmap_node.inputs[1]);
@@ -122,7 +144,7 @@ class CyclesMaterial():
             
             node_tree.links.new(mix_rgb_node.outputs[0], final_base_color.inputs[1]);
 
-        self.__mesh.data.materials.append(mat);  
+        return mat;
 
     @property
     def material(self):
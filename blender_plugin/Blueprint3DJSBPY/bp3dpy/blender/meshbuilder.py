@@ -0,0 +1,160 @@
+import bpy;
+import hashlib;
+import itertools;
+import numpy as np;
+from Blueprint3DJSBPY.bp3dpy.blender.materials.cyclesmaterial import CyclesMaterial, UV_MAP_NAME;
+from Blueprint3DJSBPY.bp3dpy.geometry.surfaces import texturePackKey;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import NULL_PROFILER;
+
+# Builds one Blender mesh object out of many bp3dpy.geometry surfaces. Every distinct
+# texture pack gets a material slot and the faces are assigned to the slot of their
+# surface, so a whole wall, room or collection becomes a single object.
+# The geometry goes to Blender as flat arrays through foreach_set, there are no
+# per vertex or per loop Python calls
+
+KEY_PROPERTY = 'bp3djs_key';
+HASH_PROPERTY = 'bp3djs_hash';
+
+def buildMeshFromArrays(mesh, coords, loopVertices, loopTotals, uvs=None, uvName=None, materialIndices=None):
+    coords = np.ascontiguousarray(coords, dtype=np.float32).reshape(-1);
+    loopVertices = np.ascontiguousarray(loopVertices, dtype=np.int32);
+    loopTotals = np.ascontiguousarray(loopTotals, dtype=np.int32);
+    loopStarts = np.zeros(len(loopTotals), dtype=np.int32);
+    np.cumsum(loopTotals[:-1], out=loopStarts[1:]);
+
+    mesh.vertices.add(len(coords) // 3);
+    mesh.vertices.foreach_set('co', coords);
+    mesh.loops.add(len(loopVertices));
+    mesh.loops.foreach_set('vertex_index', loopVertices);
+    mesh.polygons.add(len(loopTotals));
+    mesh.polygons.foreach_set('loop_start', loopStarts);
+    try:
+        mesh.polygons.foreach_set('loop_total', loopTotals);
+    except (AttributeError, TypeError):
+        # Read only since Blender 4.0, derived from loop_start
+        pass;
+    if(materialIndices is not None):
+        mesh.polygons.foreach_set('material_index', np.ascontiguousarray(materialIndices, dtype=np.int32));
+
+    if(uvs is not None):
+        uv_map = mesh.uv_layers.get(uvName) or mesh.uv_layers.new(name=uvName);
+        uv_map.data.foreach_set('uv', np.ascontiguousarray(uvs, dtype=np.float32).reshape(-1));
+
+    mesh.update(calc_edges=True);
+    return mesh;
+
+
+class MeshBuilder():
+    def __init__(self, name, context, assets_path, key=None, profiler=None):
+        self.__name = name;
+        self.__key = key or name;
+        self.__context = context;
+        self.__assets_path = assets_path;
+        self.__profiler = profiler or NULL_PROFILER;
+        self.__surfaces = [];
+        # The arrays and hash need no bpy, they can be computed ahead on a worker thread
+        self.__arrays = None;
+        self.__contentHash = None;
+
+    def addSurface(self, surface):
+        self.__surfaces.append(surface);
+        self.__arrays = self.__contentHash = None;
+
+    def addSurfaces(self, surfaces):
+        self.__surfaces.extend(surfaces);
+        self.__arrays = self.__contentHash = None;
+
+    def arrays(self):
+        if(self.__arrays is None):
+            self.__arrays = self.__computeArrays();
+        return self.__arrays;
+
+    def __computeArrays(self):
+        # The surfaces are gathered into flat lists and go to numpy once, the loop
+        # indices are offset and the uvs looked up with one fancy index for the mesh
+        coords, uvs, loops, loopTotals = [], [], [], [];
+        vertexCounts, loopCounts, faceCounts = [], [], [];
+        for surface in self.__surfaces:
+            vertices, faces = surface.vertices, surface.faces;
+            coords.extend(vertices);
+            uvs.extend(surface.scaledUVs() if surface.uvs else [(0.0, 0.0)] * len(vertices));
+            start = len(loops);
+            loops.extend(itertools.chain.from_iterable(faces));
+            loopTotals.extend(map(len, faces));
+            vertexCounts.append(len(vertices));
+            loopCounts.append(len(loops) - start);
+            faceCounts.append(len(faces));
+
+        if(not coords):
+            return (np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32),
+                np.zeros((0, 2), dtype=np.float32), np.zeros(0, dtype=np.int32));
+        offsets = np.zeros(len(vertexCounts), dtype=np.int32);
+        np.cumsum(vertexCounts[:-1], out=offsets[1:]);
+        loopVertices = np.array(loops, dtype=np.int32) + np.repeat(offsets, loopCounts);
+        loopUVs = np.array(uvs, dtype=np.float32).reshape(-1, 2)[loopVertices];
+        polygonSurfaces = np.repeat(np.arange(len(faceCounts), dtype=np.int32), faceCounts);
+        return (np.array(coords, dtype=np.float32).reshape(-1, 3), loopVertices, np.array(loopTotals, dtype=np.int32),
+            loopUVs, polygonSurfaces);
+
+    def contentHash(self):
+        if(self.__contentHash is None):
+            self.__contentHash = self.__computeContentHash();
+        return self.__contentHash;
+
+    def __computeContentHash(self):
+        # Geometry, uvs and texture packs of all surfaces, equal hashes build equal objects
+        sha = hashlib.sha1();
+        for array in self.arrays():
+            sha.update(array.tobytes());
+        for surface in self.__surfaces:
+            sha.update(texturePackKey(surface.texturePack, self.__assets_path).encode('utf-8') if surface.texturePack else b'-');
+        return sha.hexdigest();
+
+    def build(self, collection):
+        coords, loopVertices, loopTotals, uvs, polygonSurfaces = self.arrays();
+        profiler = self.__profiler;
+
+        mesh = bpy.data.meshes.new(self.__name);
+        meshobject = bpy.data.objects.new(self.__name, mesh);
+        meshobject[KEY_PROPERTY] = self.__key;
+        meshobject[HASH_PROPERTY] = self.contentHash();
+        collection.objects.link(meshobject);
+        profiler.count('objects created');
+
+        # One slot per distinct texture pack in order of appearance. Slot 0 stays empty
+        # when there are untextured surfaces (fillers, roofs) as well
+        textured = [bool(surface.texturePack) for surface in self.__surfaces];
+        emptySlot = any(textured) and not all(textured);
+        packs = {};
+        slots = np.zeros(len(self.__surfaces), dtype=np.int32);
+        for si, surface in enumerate(self.__surfaces):
+            if(textured[si]):
+                key = texturePackKey(surface.texturePack);
+                if(not key in packs):
+                    packs[key] = (len(packs) + int(emptySlot), surface.texturePack);
+                slots[si] = packs[key][0];
+        hasUVs = any(surface.uvs for surface in self.__surfaces);
+
+        with profiler.span('meshes'):
+            buildMeshFromArrays(mesh, coords, loopVertices, loopTotals, uvs if hasUVs else None, UV_MAP_NAME, slots[polygonSurfaces]);
+        profiler.count('polygons', len(loopTotals));
+
+        if(emptySlot):
+            mesh.materials.append(None);
+        with profiler.span('materials'):
+            for slot, texturePack in packs.values():
+                CyclesMaterial(self.__context, meshobject, texturePack, self.__assets_path, profiler);
+
+        return meshobject;
+
+    @property
+    def name(self):
+        return self.__name;
+
+    @property
+    def key(self):
+        return self.__key;
+
+    @property
+    def surfaces(self):
+        return self.__surfaces;
@@ -0,0 +1,102 @@
+import bpy;
+from Blueprint3DJSBPY.bp3dpy.blender.meshbuilder import KEY_PROPERTY, HASH_PROPERTY;
+from Blueprint3DJSBPY.bp3dpy.blender.materials.cyclesmaterial import TEXTURE_KEY_PROPERTY;
+
+# Incremental re-import. Objects built by the add-on carry the key of the entity they
+# were built from (corner pairs for walls, room uuids for rooms) and a hash of their
+# content. On re-import an object with the same key and hash is kept as it is, along
+# with anything done to it in Blender (bakes, modifiers), changed ones are rebuilt and
+# objects whose entity is gone are removed.
+# Nothing of the previous import is removed before removeStale, until then a changed
+# object stays next to its rebuilt one. rollback removes what was built instead and
+# leaves the previous import as it was, for a cancelled import
+
+class SceneSync():
+    def __init__(self, collections):
+        self.__existing = {};
+        self.__visited = set();
+        self.__replaced = [];
+        self.__created = [];
+        self.__kept = 0;
+        self.__built = 0;
+        self.__removed = 0;
+        for collection in collections:
+            for obj in collection.objects:
+                key = obj.get(KEY_PROPERTY);
+                if(key is not None):
+                    self.__existing[key] = obj;
+
+    def __uniqueKey(self, key):
+        # Duplicate walls share corner pairs
+        unique, count = key, 1;
+        while(unique in self.__visited):
+            unique = '%s#%d'%(key, count);
+            count += 1;
+        return unique;
+
+    def build(self, builder, collection):
+        key = self.__uniqueKey(builder.key);
+        self.__visited.add(key);
+        contentHash = builder.contentHash();
+
+        obj = self.__existing.get(key);
+        if(obj and obj.get(HASH_PROPERTY) == contentHash and collection.objects.find(obj.name) != -1):
+            self.__kept += 1;
+            return obj;
+        if(obj):
+            self.__replaced.append(obj);
+
+        created = builder.build(collection);
+        created[KEY_PROPERTY] = key;
+        self.__created.append((created, obj.name if obj else None));
+        self.__built += 1;
+        return created;
+
+    def __removeObject(self, obj):
+        mesh = obj.data;
+        bpy.data.objects.remove(obj, do_unlink=True);
+        if(mesh and mesh.users == 0):
+            bpy.data.meshes.remove(mesh);
+
+    def removeStale(self):
+        for obj in self.__replaced:
+            self.__removeObject(obj);
+        for key, obj in list(self.__existing.items()):
+            if(not key in self.__visited):
+                self.__removeObject(obj);
+                self.__removed += 1;
+        # The rebuilt objects take the names of the objects they replaced
+        for obj, name in self.__created:
+            if(name):
+                obj.name = name;
+        self.__existing = {};
+        self.__replaced = [];
+        self.__created = [];
+        self.__removeUnusedMaterials();
+
+    def rollback(self):
+        for obj, name in self.__created:
+            self.__removeObject(obj);
+        self.__existing = {};
+        self.__replaced = [];
+        self.__created = [];
+        self.__built = 0;
+        self.__removeUnusedMaterials();
+
+    def __removeUnusedMaterials(self):
+        # Materials of texture packs no longer used by any surface
+        for material in list(bpy.data.materials):
+            if(material.get(TEXTURE_KEY_PROPERTY) and material.users == 0):
+                bpy.data.materials.remove(material);
+
+    @property
+    def kept(self):
+        return self.__kept;
+
+    @property
+    def built(self):
+        return self.__built;
+
+    @property
+    def removed(self):
+        return self.__removed;
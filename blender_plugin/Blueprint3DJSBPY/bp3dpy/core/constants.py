@@ -5,5 +5,20 @@ dimFeetAndInch = 'feetAndInch';
 dimMeter = 'm';
 dimCentiMeter = 'cm';
 dimMilliMeter = 'mm';
-WallTypes = Enum('STRAIGHT', 'CURVED');
+WallTypes = Enum('WallTypes', 'STRAIGHT CURVED');
 TEXTURE_DEFAULT_REPEAT = 300;
+
+# Item types of the web app (see src/scripts/items/factory.js)
+ITEM_TYPE_IN_WALL = 3;
+ITEM_TYPE_IN_WALL_FLOOR = 7;
+# Windows and doors, cut as openings into their wall
+IN_WALL_ITEM_TYPES = (ITEM_TYPE_IN_WALL, ITEM_TYPE_IN_WALL_FLOOR);
+
+MESH_MODE_SURFACE = 'SURFACE';
+MESH_MODE_WALL = 'WALL';
+MESH_MODE_COLLECTION = 'COLLECTION';
+
+CURVE_QUALITY_PREVIEW = 'PREVIEW';
+CURVE_QUALITY_RENDER = 'RENDER';
+# Chord error in cm allowed when tessellating curved walls
+CURVE_TOLERANCES = {CURVE_QUALITY_PREVIEW: 2.0, CURVE_QUALITY_RENDER: 0.1};
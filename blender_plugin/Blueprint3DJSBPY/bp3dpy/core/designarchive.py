@@ -0,0 +1,151 @@
+import os;
+import json;
+import zlib;
+import zipfile;
+import threading;
+from urllib.parse import unquote;
+from concurrent.futures import ThreadPoolExecutor;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import NULL_PROFILER;
+
+# A blueprint-js project zip. The design JSON is read straight from the zip member
+# and only the assets the design refers to (texture maps, item models) are extracted.
+# A .gltf item brings along the buffers and images its JSON refers to.
+# Members already on disk from a previous import with the same size and CRC are skipped
+
+DESIGN_FILE_NAME = 'design.blueprint3d';
+TEXTURE_MAP_KEYS = ('colormap', 'normalmap', 'roughnessmap', 'ambientmap', 'metalmap', 'bumpmap');
+ASSET_KEYS = TEXTURE_MAP_KEYS + ('modelURL', 'texture');
+CRC_CHUNK_SIZE = 1 << 20;
+
+def referencedPaths(design):
+    paths = set();
+    def __walk(value):
+        if(isinstance(value, dict)):
+            for k, v in value.items():
+                if(k in ASSET_KEYS and isinstance(v, str) and v):
+                    paths.add(v);
+                else:
+                    __walk(v);
+        elif(isinstance(value, list)):
+            for v in value:
+                __walk(v);
+    __walk(design);
+    return paths;
+
+def fileCRC(filepath):
+    crc = 0;
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CRC_CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc);
+    return crc;
+
+
+class DesignArchive():
+    def __init__(self, zipfilepath, profiler=None):
+        self.__zipfilepath = zipfilepath;
+        self.__profiler = profiler or NULL_PROFILER;
+        self.__zip = zipfile.ZipFile(zipfilepath);
+        self.__infos = {info.filename: info for info in self.__zip.infolist()};
+        self.__local = threading.local();
+        self.__threadZips = [];
+        self.__lock = threading.Lock();
+        self.__design = None;
+
+    def close(self):
+        for zip_file in self.__threadZips:
+            zip_file.close();
+        self.__threadZips = [];
+        self.__zip.close();
+
+    def __enter__(self):
+        return self;
+
+    def __exit__(self, *args):
+        self.close();
+
+    def isValid(self):
+        return DESIGN_FILE_NAME in self.__infos;
+
+    def readDesignJSON(self):
+        with self.__profiler.span('unzip'):
+            return self.__zip.read(DESIGN_FILE_NAME).decode('utf-8');
+
+    def readDesign(self):
+        if(self.__design is None):
+            self.__design = json.loads(self.readDesignJSON());
+        return self.__design;
+
+    def memberName(self, relative_path):
+        name = os.path.normpath(relative_path).replace(os.sep, '/').lstrip('/');
+        return name if name in self.__infos else None;
+
+    def gltfDependencies(self, name):
+        # The external buffers[].uri and images[].uri of a .gltf member, as member names
+        try:
+            gltf = json.loads(self.__zip.read(name).decode('utf-8'));
+        except (ValueError, UnicodeDecodeError):
+            return [];
+        directory = os.path.dirname(name);
+        members = [];
+        for entry in (gltf.get('buffers') or []) + (gltf.get('images') or []):
+            uri = entry.get('uri') if isinstance(entry, dict) else None;
+            if(not isinstance(uri, str) or not uri or uri.startswith('data:') or '://' in uri):
+                continue;
+            member = self.memberName(os.path.join(directory, unquote(uri)));
+            if(member):
+                members.append(member);
+        return members;
+
+    def referencedMembers(self):
+        members = set(self.memberName(path) for path in referencedPaths(self.readDesign()));
+        members.discard(None);
+        for name in [name for name in members if name.lower().endswith('.gltf')]:
+            members.update(self.gltfDependencies(name));
+        return sorted(members);
+
+    def __threadZip(self):
+        # ZipFile reads share one file position, every worker thread opens its own handle
+        zip_file = getattr(self.__local, 'zip', None);
+        if(zip_file is None):
+            zip_file = self.__local.zip = zipfile.ZipFile(self.__zipfilepath);
+            with self.__lock:
+                self.__threadZips.append(zip_file);
+        return zip_file;
+
+    def __isCurrent(self, info, target):
+        if(not os.path.isfile(target) or os.path.getsize(target) != info.file_size):
+            return False;
+        return fileCRC(target) == info.CRC;
+
+    def __extractMember(self, name, extract_path):
+        info = self.__infos[name];
+        target = os.path.abspath(os.path.join(extract_path, name));
+        if(os.path.commonpath([target, extract_path]) != extract_path):
+            raise ValueError('Zip member %s is outside of %s'%(name, extract_path));
+        if(self.__isCurrent(info, target)):
+            return False;
+        os.makedirs(os.path.dirname(target), exist_ok=True);
+        with self.__threadZip().open(info) as source, open(target, 'wb') as destination:
+            for chunk in iter(lambda: source.read(CRC_CHUNK_SIZE), b''):
+                destination.write(chunk);
+        self.__profiler.count('bytes extracted', info.file_size);
+        return True;
+
+    def extractReferenced(self, extract_path, workers=None):
+        # Returns the number of members written, unchanged ones are not counted
+        extract_path = os.path.abspath(extract_path);
+        with self.__profiler.span('extract'):
+            members = self.referencedMembers();
+            with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 4)) as executor:
+                written = list(executor.map(lambda name: self.__extractMember(name, extract_path), members));
+        self.__profiler.count('files extracted', sum(written));
+        self.__profiler.count('files up to date', len(written) - sum(written));
+        return sum(written);
+
+    @property
+    def filepath(self):
+        return self.__zipfilepath;
+
+    @property
+    def design(self):
+        return self.readDesign();
@@ -0,0 +1,89 @@
+import os;
+import mmap;
+import struct;
+import hashlib;
+import zipfile;
+import tempfile;
+import numpy as np;
+
+# Compiled designs. A loaded floorplan (see Floorplan.compile) is saved as an
+# uncompressed .npz named after the SHA-256 of the design json, so an unchanged design
+# is restored from flat arrays without decoding the json or recomputing the geometry.
+# The members of an uncompressed .npz are plain .npy files, they are memory mapped
+# in place instead of being read. Bump CACHE_VERSION when the compiled layout changes
+
+CACHE_VERSION = 5;
+CACHE_EXTENSION = '.npz';
+CACHE_DIR_ENVIRONMENT = 'BP3DPY_CACHE_DIR';
+ZIP_LOCAL_HEADER_SIZE = 30;
+
+def designHash(data):
+    if(isinstance(data, str)):
+        data = data.encode('utf-8');
+    return hashlib.sha256(data).hexdigest();
+
+def _memberArray(f, mapped, info):
+    # Local file header, then the .npy header, then the raw array data
+    f.seek(info.header_offset);
+    header = f.read(ZIP_LOCAL_HEADER_SIZE);
+    nameLength, extraLength = struct.unpack('<HH', header[26:30]);
+    f.seek(info.header_offset + ZIP_LOCAL_HEADER_SIZE + nameLength + extraLength);
+    version = np.lib.format.read_magic(f);
+    if(version == (1, 0)):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(f);
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(f);
+    if(dtype.hasobject):
+        raise ValueError('%s holds python objects'%(info.filename));
+    return np.ndarray(shape, dtype=dtype, buffer=mapped, offset=f.tell(), order='F' if fortran else 'C');
+
+def loadCompiled(filepath):
+    # The whole file is mapped once, every array is a read only view into the mapping
+    arrays = {};
+    with zipfile.ZipFile(filepath) as zip_file, open(filepath, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ);
+        for info in zip_file.infolist():
+            if(info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith('.npy')):
+                raise ValueError('%s is not an uncompressed npz'%(filepath));
+            arrays[info.filename[:-4]] = _memberArray(f, mapped, info);
+    return arrays;
+
+
+class DesignCache():
+    def __init__(self, cachedir):
+        self.__cachedir = os.path.abspath(cachedir);
+
+    def path(self, key):
+        return os.path.join(self.__cachedir, key + CACHE_EXTENSION);
+
+    def load(self, key):
+        # The compiled arrays or None when missing, outdated or unreadable
+        filepath = self.path(key);
+        if(not os.path.isfile(filepath)):
+            return None;
+        try:
+            arrays = loadCompiled(filepath);
+            if(int(arrays.pop('version')) != CACHE_VERSION):
+                return None;
+            return arrays;
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None;
+
+    def save(self, key, arrays):
+        # Written to a temporary file first, readers never see a partial cache file
+        tmpfilepath = None;
+        try:
+            os.makedirs(self.__cachedir, exist_ok=True);
+            fd, tmpfilepath = tempfile.mkstemp(suffix=CACHE_EXTENSION, dir=self.__cachedir);
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, version=np.array(CACHE_VERSION), **arrays);
+            os.replace(tmpfilepath, self.path(key));
+            return True;
+        except OSError:
+            if(tmpfilepath and os.path.exists(tmpfilepath)):
+                os.remove(tmpfilepath);
+            return False;
+
+    @property
+    def cachedir(self):
+        return self.__cachedir;
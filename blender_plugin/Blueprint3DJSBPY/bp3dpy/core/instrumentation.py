@@ -0,0 +1,110 @@
+import json;
+import time;
+import threading;
+
+# Import profiling. Spans time nested phases of the import and are reported by their
+# path (import/build/materials), counters add up totals like objects created or bytes
+# extracted. Safe to use from the worker thread and the main thread at the same time.
+# Every component takes an optional profiler, NULL_PROFILER records nothing
+
+class _Span():
+    def __init__(self, profiler, name):
+        self.__profiler = profiler;
+        self.__name = name;
+        self.__started = 0.0;
+
+    def __enter__(self):
+        self.__profiler._push(self.__name);
+        self.__started = time.perf_counter();
+        return self;
+
+    def __exit__(self, *args):
+        self.__profiler._pop(time.perf_counter() - self.__started);
+        return False;
+
+
+class _NullSpan():
+    def __enter__(self):
+        return self;
+
+    def __exit__(self, *args):
+        return False;
+
+
+class Profiler():
+    def __init__(self, enabled=True):
+        self.__enabled = enabled;
+        self.__lock = threading.Lock();
+        self.__local = threading.local();
+        self.__nullSpan = _NullSpan();
+        self.reset();
+
+    def reset(self):
+        with self.__lock:
+            # path -> [seconds, calls], in order of first use
+            self.__spans = {};
+            self.__counters = {};
+
+    def __stack(self):
+        stack = getattr(self.__local, 'stack', None);
+        if(stack is None):
+            stack = self.__local.stack = [];
+        return stack;
+
+    def _push(self, name):
+        stack = self.__stack();
+        path = stack[-1] + '/' + name if stack else name;
+        stack.append(path);
+        # Registered on entry so parents are reported before their children
+        with self.__lock:
+            if(not path in self.__spans):
+                self.__spans[path] = [0.0, 0];
+
+    def _pop(self, elapsed):
+        path = self.__stack().pop();
+        with self.__lock:
+            entry = self.__spans.setdefault(path, [0.0, 0]);
+            entry[0] += elapsed;
+            entry[1] += 1;
+
+    def span(self, name):
+        if(not self.__enabled):
+            return self.__nullSpan;
+        return _Span(self, name);
+
+    def count(self, name, value=1):
+        if(not self.__enabled):
+            return;
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value;
+
+    def toDict(self):
+        with self.__lock:
+            spans = {path: {'seconds': seconds, 'calls': calls} for path, (seconds, calls) in self.__spans.items()};
+            counters = dict(self.__counters);
+        return {'spans': spans, 'counters': counters};
+
+    def report(self):
+        # One line per span indented by its depth, then the counters
+        data = self.toDict();
+        lines = [];
+        for path, entry in data['spans'].items():
+            depth = path.count('/');
+            name = path.rsplit('/', 1)[-1];
+            calls = ' x%d'%(entry['calls']) if entry['calls'] > 1 else '';
+            lines.append('%s%s: %.3f s%s'%('  ' * depth, name, entry['seconds'], calls));
+        for name, value in data['counters'].items():
+            lines.append('%s: %s'%(name, value));
+        return lines;
+
+    def dump(self, filepath):
+        with open(filepath, 'w') as f:
+            json.dump(self.toDict(), f, indent=2);
+        return filepath;
+
+    @property
+    def enabled(self):
+        return self.__enabled;
+
+
+NULL_PROFILER = Profiler(enabled=False);
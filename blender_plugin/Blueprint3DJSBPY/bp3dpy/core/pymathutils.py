@@ -0,0 +1,265 @@
+import math;
+import numpy as np;
+
+# A mathutils compatible Vector and Matrix for running bp3dpy.model outside Blender.
+# Only the parts of the mathutils API used by bp3dpy are implemented. Vector keeps its
+# components in a plain list because the model works on 2D/3D vectors one at a time,
+# where Python floats are faster than NumPy scalars. Matrix is backed by a NumPy array.
+# Whole floorplan passes should use the NumPy batch paths (see model/miters.py)
+
+class Vector():
+    __slots__ = ('_v',);
+
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        self._v = [float(c) for c in seq];
+
+    def __len__(self):
+        return len(self._v);
+
+    def __getitem__(self, index):
+        return self._v[index];
+
+    def __setitem__(self, index, value):
+        self._v[index] = float(value);
+
+    def __iter__(self):
+        return iter(self._v);
+
+    def __eq__(self, other):
+        if(not isinstance(other, Vector)):
+            return NotImplemented;
+        return self._v == other._v;
+
+    __hash__ = None;
+
+    def __repr__(self):
+        return 'Vector((%s))'%(', '.join('%.4f'%(c) for c in self._v));
+
+    def __add__(self, other):
+        return Vector([a + b for a, b in zip(self._v, other)]);
+
+    def __sub__(self, other):
+        return Vector([a - b for a, b in zip(self._v, other)]);
+
+    def __mul__(self, other):
+        if(isinstance(other, Vector)):
+            # Element-wise, as in mathutils since Blender 2.8
+            return Vector([a * b for a, b in zip(self._v, other._v)]);
+        return Vector([a * other for a in self._v]);
+
+    def __rmul__(self, other):
+        return Vector([a * other for a in self._v]);
+
+    def __truediv__(self, other):
+        return Vector([a / other for a in self._v]);
+
+    def __matmul__(self, other):
+        return self.dot(other);
+
+    def __neg__(self):
+        return Vector([-a for a in self._v]);
+
+    def __iadd__(self, other):
+        self._v = [a + b for a, b in zip(self._v, other)];
+        return self;
+
+    def __isub__(self, other):
+        self._v = [a - b for a, b in zip(self._v, other)];
+        return self;
+
+    def __imul__(self, other):
+        self._v = [a * other for a in self._v];
+        return self;
+
+    def __getX(self):
+        return self._v[0];
+    def __setX(self, value):
+        self._v[0] = float(value);
+    x = property(__getX, __setX);
+
+    def __getY(self):
+        return self._v[1];
+    def __setY(self, value):
+        self._v[1] = float(value);
+    y = property(__getY, __setY);
+
+    def __getZ(self):
+        return self._v[2];
+    def __setZ(self, value):
+        self._v[2] = float(value);
+    z = property(__getZ, __setZ);
+
+    def __getW(self):
+        return self._v[3];
+    def __setW(self, value):
+        self._v[3] = float(value);
+    w = property(__getW, __setW);
+
+    @property
+    def xy(self):
+        return Vector(self._v[:2]);
+
+    @property
+    def length(self):
+        return math.sqrt(sum(a * a for a in self._v));
+
+    @property
+    def length_squared(self):
+        return sum(a * a for a in self._v);
+
+    def copy(self):
+        return Vector(self._v);
+
+    def to_tuple(self, precision=-1):
+        if(precision == -1):
+            return tuple(self._v);
+        return tuple(round(a, precision) for a in self._v);
+
+    def to_2d(self):
+        return self.resized(2);
+
+    def to_3d(self):
+        return self.resized(3);
+
+    def resized(self, size):
+        return Vector((self._v + [0.0] * size)[:size]);
+
+    def resize(self, size):
+        self._v = (self._v + [0.0] * size)[:size];
+
+    def normalize(self):
+        length = self.length;
+        # mathutils leaves a zero length vector untouched
+        if(length > 0.0):
+            self._v = [a / length for a in self._v];
+
+    def normalized(self):
+        vector = self.copy();
+        vector.normalize();
+        return vector;
+
+    def negate(self):
+        self._v = [-a for a in self._v];
+
+    def zero(self):
+        self._v = [0.0] * len(self._v);
+
+    def dot(self, other):
+        return sum(a * b for a, b in zip(self._v, other));
+
+    def cross(self, other):
+        a, b = self._v, other._v;
+        if(len(a) == 2):
+            return (a[0] * b[1]) - (a[1] * b[0]);
+        return Vector(((a[1] * b[2]) - (a[2] * b[1]), (a[2] * b[0]) - (a[0] * b[2]), (a[0] * b[1]) - (a[1] * b[0])));
+
+    def angle(self, other, fallback=None):
+        lengths = self.length * other.length;
+        if(lengths == 0.0):
+            if(fallback is None):
+                raise ValueError('Vector.angle(other): zero length vectors have no valid angle');
+            return fallback;
+        return math.acos(max(-1.0, min(1.0, self.dot(other) / lengths)));
+
+    def angle_signed(self, other, fallback=None):
+        if(self.length == 0.0 or other.length == 0.0):
+            if(fallback is None):
+                raise ValueError('Vector.angle_signed(other): zero length vectors have no valid angle');
+            return fallback;
+        a, b = self._v, other._v;
+        return -math.atan2((a[0] * b[1]) - (a[1] * b[0]), (a[0] * b[0]) + (a[1] * b[1]));
+
+    def lerp(self, other, factor):
+        return Vector([a + ((b - a) * factor) for a, b in zip(self._v, other)]);
+
+
+class Matrix():
+    __slots__ = ('_m',);
+
+    def __init__(self, rows=None):
+        self._m = np.identity(4) if rows is None else np.array(rows, dtype=np.float64);
+
+    @staticmethod
+    def Identity(size):
+        return Matrix(np.identity(size));
+
+    @staticmethod
+    def Translation(vector):
+        m = np.identity(4);
+        m[:len(vector), 3] = list(vector)[:3];
+        return Matrix(m);
+
+    @staticmethod
+    def Scale(factor, size, axis=None):
+        m = np.identity(size);
+        if(axis is None):
+            m[:min(size, 3), :min(size, 3)] *= factor;
+        else:
+            n = np.array(list(Vector(axis).normalized().resized(3)));
+            n = n[:min(size, 3)];
+            m[:len(n), :len(n)] += (factor - 1.0) * np.outer(n, n);
+        return Matrix(m);
+
+    @staticmethod
+    def Rotation(angle, size, axis=None):
+        cs, sn = math.cos(angle), math.sin(angle);
+        if(size == 2):
+            return Matrix([[cs, -sn], [sn, cs]]);
+        if(isinstance(axis, str)):
+            axis = {'X': (1.0, 0.0, 0.0), 'Y': (0.0, 1.0, 0.0), 'Z': (0.0, 0.0, 1.0)}[axis.upper()];
+        m = np.identity(size);
+        n = Vector(axis).resized(3);
+        # A zero axis gives the identity, like mathutils
+        if(n.length > 0.0):
+            x, y, z = n.normalized();
+            t = 1.0 - cs;
+            m[:3, :3] = [
+                [(t * x * x) + cs, (t * x * y) - (sn * z), (t * x * z) + (sn * y)],
+                [(t * x * y) + (sn * z), (t * y * y) + cs, (t * y * z) - (sn * x)],
+                [(t * x * z) - (sn * y), (t * y * z) + (sn * x), (t * z * z) + cs]];
+        return Matrix(m);
+
+    def __getitem__(self, index):
+        return Vector(self._m[index]);
+
+    def __len__(self):
+        return len(self._m);
+
+    def __repr__(self):
+        return 'Matrix(%s)'%(self._m.tolist(),);
+
+    def __mul__(self, other):
+        # Element-wise, as in mathutils since Blender 2.8
+        if(isinstance(other, Matrix)):
+            return Matrix(self._m * other._m);
+        return Matrix(self._m * other);
+
+    def __matmul__(self, other):
+        if(isinstance(other, Matrix)):
+            return Matrix(self._m @ other._m);
+        v = list(other);
+        size = len(self._m);
+        if(len(v) == size):
+            return Vector(self._m @ np.array(v));
+        if(len(v) == size - 1):
+            # Points are transformed with an implied w of 1.0
+            return Vector((self._m @ np.array(v + [1.0]))[:len(v)]);
+        raise ValueError('Matrix multiplication: vector size does not match the matrix');
+
+    def copy(self):
+        return Matrix(self._m.copy());
+
+    def inverted(self):
+        return Matrix(np.linalg.inv(self._m));
+
+    def transposed(self):
+        return Matrix(self._m.T.copy());
+
+    def to_3x3(self):
+        return Matrix(self._m[:3, :3].copy());
+
+    def to_translation(self):
+        return Vector(self._m[:3, 3]);
+
+    def to_numpy(self):
+        return self._m.copy();
@@ -1,13 +1,5 @@
 import math;
 import random;
-import bpy;
-
-def newCollection(collectionName):
-    collection = bpy.data.collections.get(collectionName);
-    if(collection):
-        bpy.data.collections.remove(collection, do_unlink=True, do_id_user=True, do_ui_user=True);
-    
-    return bpy.data.collections.new(collectionName);
 
 def angle(start, end):
     tDot = start.dot(end);#start.x * end.x + start.y * end.y;
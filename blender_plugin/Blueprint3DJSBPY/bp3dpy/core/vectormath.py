@@ -0,0 +1,22 @@
+import os;
+
+# The vector/matrix backend used by bp3dpy.model. Inside Blender this is mathutils,
+# outside of it the mathutils compatible shim in pymathutils is used instead, so the
+# floorplan model can be loaded in plain CPython or in worker processes.
+# Set the environment variable BP3DPY_MATH_BACKEND=python to force the shim
+
+BACKEND_MATHUTILS = 'mathutils';
+BACKEND_PYTHON = 'python';
+
+backend = os.environ.get('BP3DPY_MATH_BACKEND', BACKEND_MATHUTILS);
+if(backend not in (BACKEND_MATHUTILS, BACKEND_PYTHON)):
+    raise ValueError('Unknown BP3DPY_MATH_BACKEND %s, expected %s or %s'%(backend, BACKEND_MATHUTILS, BACKEND_PYTHON));
+
+if(backend == BACKEND_MATHUTILS):
+    try:
+        from mathutils import Vector, Matrix;
+    except ImportError:
+        backend = BACKEND_PYTHON;
+
+if(backend == BACKEND_PYTHON):
+    from Blueprint3DJSBPY.bp3dpy.core.pymathutils import Vector, Matrix;
@@ -0,0 +1,78 @@
+import os;
+import sys;
+import zipfile;
+import argparse;
+from concurrent.futures import ProcessPoolExecutor;
+from Blueprint3DJSBPY.bp3dpy.core.constants import CURVE_QUALITY_PREVIEW, CURVE_QUALITY_RENDER;
+
+# Headless .blueprint3d (zip) -> .glb converter. Runs in plain CPython without Blender,
+# one design per worker process:
+#   python -m Blueprint3DJSBPY.bp3dpy.export.convert designs/ -o out/ -j 8
+
+DESIGN_FILE_NAME = 'design.blueprint3d';
+DESIGN_EXTENSIONS = ('.zip', '.blueprint3d');
+
+def convertDesign(zipfilepath, outputdir, embedTextures=True, curveQuality=CURVE_QUALITY_RENDER):
+    from Blueprint3DJSBPY.bp3dpy.model.model import Model;
+    from Blueprint3DJSBPY.bp3dpy.geometry.surfaces import floorplanSurfaces;
+    from Blueprint3DJSBPY.bp3dpy.export.glb import GLBWriter;
+    from Blueprint3DJSBPY.bp3dpy.geometry.curves import curveTolerance;
+
+    with zipfile.ZipFile(zipfilepath) as zip_file:
+        contents = set(zip_file.namelist());
+        if(not DESIGN_FILE_NAME in contents):
+            raise ValueError('%s does not contain %s'%(zipfilepath, DESIGN_FILE_NAME));
+
+        def __readAsset(relative_path):
+            name = os.path.normpath(relative_path).replace(os.sep, '/');
+            if(not embedTextures or not name in contents):
+                return None;
+            return zip_file.read(name);
+
+        model = Model();
+        model.loadSerializedJSON(zip_file.read(DESIGN_FILE_NAME).decode('utf-8'));
+
+        writer = GLBWriter(__readAsset);
+        for surface in floorplanSurfaces(model.floorplan, curveTolerance(curveQuality)):
+            writer.addSurface(surface);
+
+        glbfilepath = os.path.join(outputdir, os.path.splitext(os.path.basename(zipfilepath))[0] + '.glb');
+        writer.write(glbfilepath);
+    return glbfilepath;
+
+def findDesigns(paths):
+    designs = [];
+    for path in paths:
+        if(os.path.isdir(path)):
+            for name in sorted(os.listdir(path)):
+                if(name.lower().endswith(DESIGN_EXTENSIONS)):
+                    designs.append(os.path.join(path, name));
+        else:
+            designs.append(path);
+    return designs;
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert blueprint-js designs to glTF binary (.glb) without Blender');
+    parser.add_argument('inputs', nargs='+', help='Design zip files or directories containing them');
+    parser.add_argument('-o', '--output', default='.', help='Output directory for the .glb files');
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of worker processes');
+    parser.add_argument('--no-textures', action='store_true', help='Do not embed the texture images');
+    parser.add_argument('--curve-quality', default=CURVE_QUALITY_RENDER.lower(), choices=[CURVE_QUALITY_PREVIEW.lower(), CURVE_QUALITY_RENDER.lower()], help='Tessellation of curved walls');
+    args = parser.parse_args(argv);
+
+    designs = findDesigns(args.inputs);
+    os.makedirs(args.output, exist_ok=True);
+
+    failures = 0;
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [(design, executor.submit(convertDesign, design, args.output, not args.no_textures, args.curve_quality.upper())) for design in designs];
+        for design, future in futures:
+            try:
+                print('%s -> %s'%(design, future.result()));
+            except Exception as e:
+                failures += 1;
+                print('%s FAILED: %s'%(design, e), file=sys.stderr);
+    return 1 if failures else 0;
+
+if __name__ == '__main__':
+    sys.exit(main());
@@ -0,0 +1,179 @@
+import os;
+import json;
+import itertools;
+import struct;
+import mimetypes;
+import numpy as np;
+from Blueprint3DJSBPY.bp3dpy.geometry.surfaces import texturePackKey;
+
+# Minimal glTF 2.0 binary writer for the surfaces of bp3dpy.geometry. The surfaces are
+# gathered per distinct texture pack and written as one mesh with one primitive per
+# material (two when only some of its surfaces have uvs), each with one packed position, uv and index accessor in a single binary
+# buffer. Blender is Z-up and glTF is Y-up, so (x, y, z) -> (x, z, -y)
+
+GLB_MAGIC = 0x46546C67;
+GLB_VERSION = 2;
+CHUNK_JSON = 0x4E4F534A;
+CHUNK_BIN = 0x004E4942;
+
+COMPONENT_FLOAT = 5126;
+COMPONENT_UINT = 5125;
+TARGET_ARRAY_BUFFER = 34962;
+TARGET_ELEMENT_ARRAY_BUFFER = 34963;
+
+def _rgba(hexstring):
+    h = (hexstring or '#FFFFFF').lstrip('#');
+    rgb = tuple(float(int(h[i:i+2], 16)) / 255.0 for i in (0, 2, 4));
+    return [rgb[0], rgb[1], rgb[2], 1.0];
+
+def _pad(data, fill=b'\x00'):
+    return data + (fill * ((4 - (len(data) % 4)) % 4));
+
+
+class GLBWriter():
+    def __init__(self, readAsset=None):
+        # readAsset(relative_path) -> bytes or None, used to embed texture images
+        self.__readAsset = readAsset;
+        self.__buffer = bytearray();
+        self.__bufferViews = [];
+        self.__accessors = [];
+        self.__meshes = [];
+        self.__nodes = [];
+        self.__materials = [];
+        self.__materialsByKey = {};
+        self.__textures = [];
+        self.__images = [];
+        self.__imagesByPath = {};
+        # The surfaces not yet written, by material index and whether they have uvs
+        self.__pending = {};
+
+    def __addBufferView(self, data, target=None):
+        offset = len(self.__buffer);
+        self.__buffer.extend(_pad(data));
+        view = {'buffer': 0, 'byteOffset': offset, 'byteLength': len(data)};
+        if(target):
+            view['target'] = target;
+        self.__bufferViews.append(view);
+        return len(self.__bufferViews) - 1;
+
+    def __addAccessor(self, array, accessorType, componentType, target, minmax=False):
+        view = self.__addBufferView(array.tobytes(), target);
+        accessor = {'bufferView': view, 'componentType': componentType, 'count': len(array), 'type': accessorType};
+        if(minmax):
+            accessor['min'] = array.min(axis=0).tolist();
+            accessor['max'] = array.max(axis=0).tolist();
+        self.__accessors.append(accessor);
+        return len(self.__accessors) - 1;
+
+    def __addImage(self, relativePath):
+        if(relativePath in self.__imagesByPath):
+            return self.__imagesByPath[relativePath];
+        data = self.__readAsset(relativePath) if self.__readAsset else None;
+        index = None;
+        if(data):
+            mimeType = mimetypes.guess_type(relativePath)[0] or 'image/png';
+            self.__images.append({'bufferView': self.__addBufferView(data), 'mimeType': mimeType, 'name': os.path.basename(relativePath)});
+            self.__textures.append({'source': len(self.__images) - 1});
+            index = len(self.__textures) - 1;
+        self.__imagesByPath[relativePath] = index;
+        return index;
+
+    def __addMaterial(self, texturePack):
+        key = texturePackKey(texturePack);
+        if(key in self.__materialsByKey):
+            return self.__materialsByKey[key];
+
+        pbr = {'baseColorFactor': _rgba((texturePack or {}).get('color')), 'metallicFactor': 0.0, 'roughnessFactor': 1.0};
+        material = {'name': 'material-%s'%(key[:8]), 'pbrMetallicRoughness': pbr, 'doubleSided': True};
+        if(texturePack and texturePack.get('colormap')):
+            colorTexture = self.__addImage(texturePack.get('colormap'));
+            if(colorTexture is not None):
+                pbr['baseColorTexture'] = {'index': colorTexture};
+        if(texturePack and texturePack.get('normalmap')):
+            normalTexture = self.__addImage(texturePack.get('normalmap'));
+            if(normalTexture is not None):
+                material['normalTexture'] = {'index': normalTexture};
+
+        self.__materials.append(material);
+        self.__materialsByKey[key] = len(self.__materials) - 1;
+        return self.__materialsByKey[key];
+
+    def addSurface(self, surface):
+        group = (self.__addMaterial(surface.texturePack), bool(surface.uvs));
+        pending = self.__pending.get(group);
+        if(pending is None):
+            pending = self.__pending[group] = {'positions': [], 'uvs': [], 'indices': [], 'vertexCounts': [], 'indexCounts': []};
+        vertices = surface.vertices;
+        start = len(pending['indices']);
+        pending['positions'].extend(vertices);
+        if(surface.uvs):
+            pending['uvs'].extend(surface.scaledUVs());
+        pending['indices'].extend(itertools.chain.from_iterable(surface.triangles()));
+        pending['vertexCounts'].append(len(vertices));
+        pending['indexCounts'].append(len(pending['indices']) - start);
+
+    def __flush(self):
+        # Writes the gathered surfaces, one primitive per group
+        if(not self.__pending):
+            return;
+        if(not self.__meshes):
+            self.__meshes.append({'name': 'blueprint-js', 'primitives': []});
+            self.__nodes.append({'name': 'blueprint-js', 'mesh': 0});
+        primitives = self.__meshes[0]['primitives'];
+        for (material, hasUVs), pending in sorted(self.__pending.items()):
+            if(not pending['indices']):
+                continue;
+            vertices = np.asarray(pending['positions'], dtype=np.float32).reshape(-1, 3);
+            positions = np.empty(vertices.shape, dtype=np.float32);
+            positions[:, 0] = vertices[:, 0];
+            positions[:, 1] = vertices[:, 2];
+            positions[:, 2] = -vertices[:, 1];
+            offsets = np.zeros(len(pending['vertexCounts']), dtype=np.uint32);
+            np.cumsum(pending['vertexCounts'][:-1], out=offsets[1:]);
+            indices = np.asarray(pending['indices'], dtype=np.uint32) + np.repeat(offsets, pending['indexCounts']);
+
+            attributes = {'POSITION': self.__addAccessor(positions, 'VEC3', COMPONENT_FLOAT, TARGET_ARRAY_BUFFER, True)};
+            if(hasUVs):
+                uvs = np.asarray(pending['uvs'], dtype=np.float32).reshape(-1, 2);
+                # glTF puts the texture origin at the top left, Blender at the bottom left
+                uvs[:, 1] = 1.0 - uvs[:, 1];
+                attributes['TEXCOORD_0'] = self.__addAccessor(uvs, 'VEC2', COMPONENT_FLOAT, TARGET_ARRAY_BUFFER);
+
+            primitives.append({
+                'attributes': attributes,
+                'indices': self.__addAccessor(indices, 'SCALAR', COMPONENT_UINT, TARGET_ELEMENT_ARRAY_BUFFER),
+                'material': material,
+            });
+        self.__pending = {};
+
+    def toGLTF(self):
+        self.__flush();
+        gltf = {
+            'asset': {'version': '2.0', 'generator': 'bp3dpy'},
+            'scene': 0,
+            'scenes': [{'name': 'blueprint-js', 'nodes': list(range(len(self.__nodes)))}],
+            'nodes': self.__nodes,
+            'meshes': self.__meshes,
+            'materials': self.__materials,
+            'accessors': self.__accessors,
+            'bufferViews': self.__bufferViews,
+            'buffers': [{'byteLength': len(self.__buffer)}],
+        };
+        if(self.__images):
+            gltf['images'] = self.__images;
+            gltf['textures'] = self.__textures;
+        return gltf;
+
+    def toBytes(self):
+        jsonChunk = _pad(json.dumps(self.toGLTF(), separators=(',', ':')).encode('utf-8'), b' ');
+        binChunk = _pad(bytes(self.__buffer));
+        total = 12 + 8 + len(jsonChunk) + 8 + len(binChunk);
+        header = struct.pack('<III', GLB_MAGIC, GLB_VERSION, total);
+        return b''.join([
+            header,
+            struct.pack('<II', len(jsonChunk), CHUNK_JSON), jsonChunk,
+            struct.pack('<II', len(binChunk), CHUNK_BIN), binChunk]);
+
+    def write(self, filepath):
+        with open(filepath, 'wb') as f:
+            f.write(self.toBytes());
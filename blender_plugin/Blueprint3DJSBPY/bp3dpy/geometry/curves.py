@@ -0,0 +1,78 @@
+import numpy as np;
+from Blueprint3DJSBPY.bp3dpy.core import Dimensioning;
+from Blueprint3DJSBPY.bp3dpy.core.constants import CURVE_QUALITY_RENDER, CURVE_TOLERANCES;
+
+# Adaptive tessellation of the cubic Bezier center lines of curved walls. All the
+# curves of a floorplan are subdivided together, level by level: every piece whose
+# chord error bound is above the tolerance is split in half (de Casteljau) and the
+# others are kept. Tight bends get many segments, gentle ones only a few
+
+CURVE_MAX_DEPTH = 10;
+
+def curveTolerance(quality=CURVE_QUALITY_RENDER):
+    # Chord error in the units of the design, the tolerances are given in cm
+    return max(Dimensioning.cmToMeasureRaw(CURVE_TOLERANCES[quality]), 1e-6);
+
+def bezierPoints(controls, t):
+    # controls (4, 2) and parameters (n,) -> (n, 2)
+    p0, p1, p2, p3 = np.asarray(controls, dtype=np.float64).reshape(4, 2);
+    t = np.asarray(t, dtype=np.float64)[:, None];
+    s = 1.0 - t;
+    return (s * s * s * p0) + (3.0 * s * s * t * p1) + (3.0 * s * t * t * p2) + (t * t * t * p3);
+
+def bezierTangents(controls, t):
+    p0, p1, p2, p3 = np.asarray(controls, dtype=np.float64).reshape(4, 2);
+    t = np.asarray(t, dtype=np.float64)[:, None];
+    s = 1.0 - t;
+    return (3.0 * s * s * (p1 - p0)) + (6.0 * s * t * (p2 - p1)) + (3.0 * t * t * (p3 - p2));
+
+def adaptiveParameters(controls, tolerance, maxDepth=CURVE_MAX_DEPTH):
+    # controls (n, 4, 2) -> one sorted array of parameters in [0, 1] per curve
+    controls = np.asarray(controls, dtype=np.float64).reshape(-1, 4, 2);
+    count = len(controls);
+    curves = np.arange(count);
+    t0, t1 = np.zeros(count), np.ones(count);
+    pieces = controls.copy();
+    acceptedCurves, acceptedEnds = [], [];
+    # The distance of a cubic from its chord is at most sqrt(max(ux^2, vx^2) + max(uy^2, vy^2)) / 4
+    limit = 16.0 * tolerance * tolerance;
+
+    for depth in range(maxDepth + 1):
+        if(not len(curves)):
+            break;
+        p0, p1, p2, p3 = pieces[:, 0], pieces[:, 1], pieces[:, 2], pieces[:, 3];
+        u = (3.0 * p1) - (2.0 * p0) - p3;
+        v = (3.0 * p2) - p0 - (2.0 * p3);
+        error = np.maximum(u * u, v * v).sum(axis=1);
+        flat = (error <= limit) if depth < maxDepth else np.ones(len(curves), dtype=bool);
+        acceptedCurves.append(curves[flat]);
+        acceptedEnds.append(t1[flat]);
+
+        split = ~flat;
+        q0, q1, q2, q3 = p0[split], p1[split], p2[split], p3[split];
+        p01, p12, p23 = (q0 + q1) * 0.5, (q1 + q2) * 0.5, (q2 + q3) * 0.5;
+        p012, p123 = (p01 + p12) * 0.5, (p12 + p23) * 0.5;
+        middle = (p012 + p123) * 0.5;
+        left = np.stack((q0, p01, p012, middle), axis=1);
+        right = np.stack((middle, p123, p23, q3), axis=1);
+        tMiddle = (t0[split] + t1[split]) * 0.5;
+
+        curves = np.concatenate((curves[split], curves[split]));
+        t0, t1 = np.concatenate((t0[split], tMiddle)), np.concatenate((tMiddle, t1[split]));
+        pieces = np.concatenate((left, right));
+
+    curves = np.concatenate(acceptedCurves) if acceptedCurves else np.zeros(0, dtype=np.int64);
+    ends = np.concatenate(acceptedEnds) if acceptedEnds else np.zeros(0);
+    order = np.lexsort((ends, curves));
+    counts = np.bincount(curves, minlength=count);
+    return [np.concatenate(([0.0], piece)) for piece in np.split(ends[order], np.cumsum(counts)[:-1])];
+
+def tessellateWalls(walls, tolerance):
+    # Stores the parameters of every curved wall on the wall, in one batch
+    curved = [wall for wall in walls if wall.isCurved];
+    if(not curved):
+        return 0;
+    controls = np.array([[(p.x, p.y) for p in wall.controlPoints()] for wall in curved], dtype=np.float64);
+    for wall, parameters in zip(curved, adaptiveParameters(controls, tolerance)):
+        wall.curveParameters = parameters;
+    return len(curved);
@@ -0,0 +1,465 @@
+import os;
+import math;
+import json;
+import hashlib;
+import numpy as np;
+from Blueprint3DJSBPY.bp3dpy.core import Dimensioning;
+from Blueprint3DJSBPY.bp3dpy.core.utils import distance;
+from Blueprint3DJSBPY.bp3dpy.core.vectormath import Vector;
+from Blueprint3DJSBPY.bp3dpy.geometry.curves import bezierPoints, bezierTangents, tessellateWalls, curveTolerance;
+from Blueprint3DJSBPY.bp3dpy.geometry.triangulation import triangulate;
+
+# The wall, filler, floor and roof pieces built by HalfEdge3D and Room3D, as plain
+# vertex/face/uv lists that do not depend on bpy. Used by the headless exporters
+
+SURFACE_INTERIOR = 'interior';
+SURFACE_EXTERIOR = 'exterior';
+SURFACE_TOP = 'top';
+SURFACE_BOTTOM = 'bottom';
+SURFACE_START_FILLER = 'start-filler';
+SURFACE_END_FILLER = 'end-filler';
+SURFACE_FLOOR = 'floor';
+SURFACE_ROOF = 'roof';
+SURFACE_REVEAL = 'reveal';
+# Lengths below this are treated as zero when cutting openings
+OPENING_EPSILON = 1e-6;
+
+class Surface():
+    def __init__(self, name, kind, vertices, faces, uvs=None, texturePack=None, dimensions=None, key=None):
+        self.__name = name;
+        self.__key = key or name;
+        self.__kind = kind;
+        self.__vertices = vertices;
+        self.__faces = faces;
+        self.__uvs = uvs;
+        self.__texturePack = texturePack;
+        self.__dimensions = dimensions;
+
+    def normal(self):
+        # Newell's method over the outline of the first face
+        nx = ny = nz = 0.0;
+        face = self.__faces[0];
+        for i, vid in enumerate(face):
+            x1, y1, z1 = self.__vertices[vid];
+            x2, y2, z2 = self.__vertices[face[(i + 1) % len(face)]];
+            nx += (y1 - y2) * (z1 + z2);
+            ny += (z1 - z2) * (x1 + x2);
+            nz += (x1 - x2) * (y1 + y2);
+        length = math.sqrt(nx * nx + ny * ny + nz * nz) or 1.0;
+        return (nx / length, ny / length, nz / length);
+
+    def triangles(self):
+        triangles = [];
+        normal = self.normal() if len(self.__faces) else None;
+        for face in self.__faces:
+            if(len(face) == 3):
+                triangles.append(tuple(face));
+            elif(len(face) == 4):
+                triangles.extend([(face[0], face[1], face[2]), (face[0], face[2], face[3])]);
+            else:
+                points = [projectToPlane(self.__vertices[vid], normal) for vid in face];
+                triangles.extend([(face[a], face[b], face[c]) for a, b, c in triangulate(points)]);
+        return triangles;
+
+    def uvScale(self):
+        if(not self.__texturePack or not self.__dimensions):
+            return 1.0, 1.0;
+        return textureRepeatScale(self.__texturePack, self.__dimensions);
+
+    def scaledUVs(self):
+        # The texture repeat baked into the uvs, materials are shared between surfaces
+        # of different sizes and do not scale the texture coordinates themselves
+        if(not self.__uvs):
+            return self.__uvs;
+        scaleX, scaleY = self.uvScale();
+        return [(u * scaleX, v * scaleY) for u, v in self.__uvs];
+
+    @property
+    def name(self):
+        return self.__name;
+
+    @property
+    def key(self):
+        return self.__key;
+
+    @property
+    def kind(self):
+        return self.__kind;
+
+    @property
+    def vertices(self):
+        return self.__vertices;
+
+    @property
+    def faces(self):
+        return self.__faces;
+
+    @property
+    def uvs(self):
+        return self.__uvs;
+
+    @property
+    def texturePack(self):
+        return self.__texturePack;
+
+    @property
+    def dimensions(self):
+        return self.__dimensions;
+
+
+# The members of a texture pack that are image paths relative to the assets folder
+TEXTURE_MAP_KEYS = ('colormap', 'normalmap', 'roughnessmap', 'metalmap', 'ambientmap');
+# The members that only change the uvs, they are baked in by Surface.scaledUVs
+TEXTURE_UV_KEYS = ('repeat',);
+
+def texturePackKey(texturePack, assets_path=None):
+    # Canonical hash of a texture pack, equal packs share one material whatever their
+    # repeat. With an assets_path the image paths are resolved first, so packs of two
+    # projects with the same relative paths do not share a material of the other project
+    texturePack = {k: v for k, v in (texturePack or {}).items() if not k in TEXTURE_UV_KEYS};
+    if(assets_path is not None):
+        for mapkey in TEXTURE_MAP_KEYS:
+            if(texturePack.get(mapkey)):
+                texturePack[mapkey] = os.path.abspath(os.path.join(assets_path, texturePack[mapkey]));
+    return hashlib.sha1(json.dumps(texturePack, sort_keys=True).encode('utf-8')).hexdigest();
+
+def textureRepeatScale(texturePack, dimensions):
+    repeat = texturePack.get('repeat') or 200;
+    repeat = Dimensioning.cmToMeasureRaw(repeat);
+    return dimensions.x / repeat, dimensions.y / repeat;
+
+def projectToPlane(point, normal):
+    # Drop the dominant axis of the normal
+    ax, ay, az = abs(normal[0]), abs(normal[1]), abs(normal[2]);
+    if(az >= ax and az >= ay):
+        return (point[0], point[1]) if normal[2] >= 0 else (point[1], point[0]);
+    if(ax >= ay):
+        return (point[1], point[2]) if normal[0] >= 0 else (point[2], point[1]);
+    return (point[2], point[0]) if normal[1] >= 0 else (point[0], point[2]);
+
+def _vec3(pos, height=0.0):
+    return (pos.x, pos.y, height);
+
+def _quad(name, kind, points, uvs=None, texturePack=None, dimensions=None, key=None):
+    return Surface(name, kind, points, [(0, 1, 2, 3)], uvs, texturePack, dimensions, key);
+
+def wallKey(wall):
+    # Wall ids are generated on every load, the corner pair identifies a wall across imports
+    return '%s,%s'%(wall.start.id, wall.end.id);
+
+def edgeKey(edge):
+    return '%s-%s'%(wallKey(edge.wall), 'front' if edge.front else 'back');
+
+def _wallUVs(points, start, totalDistance, height):
+    uvs = [];
+    for x, y, z in points:
+        uvs.append((distance(start, Vector((x, y))) / totalDistance, z / height));
+    return uvs;
+
+def _polylineFractions(points):
+    lengths = np.sqrt((np.diff(points, axis=0) ** 2).sum(axis=1));
+    cumulative = np.concatenate(([0.0], np.cumsum(lengths)));
+    return cumulative, cumulative[-1];
+
+def curvedEdgeLines(edge):
+    # The interior and exterior outlines (n, 2) of the half edge of a curved wall, offset
+    # from the tessellated center line by half the thickness, and the fraction of the
+    # center line length at every point. The end points are the miters of the edge,
+    # which follow the end tangents of the curve (see Wall.endTangents)
+    wall = edge.wall;
+    if(wall.curveParameters is None):
+        tessellateWalls([wall], curveTolerance());
+    controls = [(p.x, p.y) for p in wall.controlPoints()];
+    centers = bezierPoints(controls, wall.curveParameters);
+    tangents = bezierTangents(controls, wall.curveParameters);
+    if(not edge.front):
+        centers, tangents = centers[::-1], -tangents[::-1];
+
+    chord = centers[-1] - centers[0];
+    lengths = np.sqrt((tangents ** 2).sum(axis=1));
+    # Cusps have no tangent, the chord direction is used there
+    tangents[lengths < 1e-9] = chord;
+    lengths = np.maximum(np.sqrt((tangents ** 2).sum(axis=1)), 1e-12);
+    normals = np.stack((-tangents[:, 1], tangents[:, 0]), axis=1) / lengths[:, None];
+
+    interiorStart, interiorEnd = edge.interiorStart(), edge.interiorEnd();
+    exteriorStart, exteriorEnd = edge.exteriorStart(), edge.exteriorEnd();
+    start = edge.getStart();
+    side = 1.0 if ((normals[0, 0] * (interiorStart.x - start.x)) + (normals[0, 1] * (interiorStart.y - start.y))) >= 0.0 else -1.0;
+    offsets = normals * (side * wall.thickness * 0.5);
+    interior, exterior = centers + offsets, centers - offsets;
+    interior[0], interior[-1] = (interiorStart.x, interiorStart.y), (interiorEnd.x, interiorEnd.y);
+    exterior[0], exterior[-1] = (exteriorStart.x, exteriorStart.y), (exteriorEnd.x, exteriorEnd.y);
+
+    cumulative, total = _polylineFractions(centers);
+    fractions = cumulative / total if total > 0.0 else np.linspace(0.0, 1.0, len(centers));
+    return interior, exterior, fractions;
+
+def _strip(lower, upper):
+    # Two rows of points joined by quads, wound like the quads of straight walls
+    count = len(lower);
+    return list(lower) + list(upper), [(i, i + 1, count + i + 1, count + i) for i in range(count - 1)];
+
+def _curvedHalfEdgeSurfaces(edge):
+    wall = edge.wall;
+    startElevation, endElevation = edge.getStart().elevation, edge.getEnd().elevation;
+    height = max(wall.startElevation, wall.endElevation);
+    texturePack = edge.getTexture();
+    key = edgeKey(edge);
+    interior, exterior, fractions = curvedEdgeLines(edge);
+    elevations = startElevation + ((endElevation - startElevation) * fractions);
+
+    def __wallStrip(kind, line):
+        bottom = [(x, y, 0.0) for x, y in line.tolist()];
+        top = [(x, y, z) for (x, y), z in zip(line.tolist(), elevations.tolist())];
+        vertices, faces = _strip(bottom, top);
+        cumulative, total = _polylineFractions(line);
+        us = (cumulative / total if total > 0.0 else fractions).tolist();
+        uvs = [(u, 0.0) for u in us] + [(u, z / height) for u, z in zip(us, elevations.tolist())];
+        return Surface('%s-%s'%(kind, wall.id), kind, vertices, faces, uvs, texturePack, Vector((total, height)), '%s-%s'%(kind, key));
+
+    def __filler(kind, vertices, faces):
+        return Surface('%s-%s'%(kind, wall.id), kind, vertices, faces, key='%s-%s'%(kind, key));
+
+    surfaces = [];
+    if(not wall.frontEdge or not wall.backEdge):
+        surfaces.append(__wallStrip(SURFACE_EXTERIOR, exterior));
+    surfaces.append(__wallStrip(SURFACE_INTERIOR, interior));
+
+    surfaces.append(__filler(SURFACE_BOTTOM, *_strip([(x, y, 0.0) for x, y in exterior.tolist()], [(x, y, 0.0) for x, y in interior.tolist()])));
+    surfaces.append(__filler(SURFACE_TOP, *_strip(
+        [(x, y, z) for (x, y), z in zip(exterior.tolist(), elevations.tolist())],
+        [(x, y, z) for (x, y), z in zip(interior.tolist(), elevations.tolist())])));
+
+    (isx, isy), (iex, iey) = interior[0].tolist(), interior[-1].tolist();
+    (esx, esy), (eex, eey) = exterior[0].tolist(), exterior[-1].tolist();
+    surfaces.append(__filler(SURFACE_START_FILLER, [
+        (isx, isy, 0.0), (esx, esy, 0.0), (esx, esy, startElevation), (isx, isy, startElevation)], [(0, 1, 2, 3)]));
+    surfaces.append(__filler(SURFACE_END_FILLER, [
+        (iex, iey, 0.0), (eex, eey, 0.0), (eex, eey, endElevation), (iex, iey, endElevation)], [(0, 1, 2, 3)]));
+    return surfaces;
+
+def lineOpenings(wall, start, end, topElevation):
+    # The windows and doors of the wall as (u0, u1, z0, z1) rectangles on the side of
+    # the wall that runs from start to end, u is the distance from start. One entry per
+    # opening of the wall, None for the ones outside the side
+    length = distance(start, end);
+    openings = [];
+    for item in wall.openings:
+        if(length <= OPENING_EPSILON):
+            openings.append(None);
+            continue;
+        center = item.position;
+        u = (((center.x - start.x) * (end.x - start.x)) + ((center.y - start.y) * (end.y - start.y))) / length;
+        u0, u1 = max(u - (item.width * 0.5), 0.0), min(u + (item.width * 0.5), length);
+        z0, z1 = max(center.z - (item.height * 0.5), 0.0), min(center.z + (item.height * 0.5), topElevation);
+        openings.append((u0, u1, z0, z1) if (u1 - u0 > OPENING_EPSILON and z1 - z0 > OPENING_EPSILON) else None);
+    return openings;
+
+def _linePoint(start, end, u, z):
+    length = distance(start, end);
+    f = u / length if length > 0.0 else 0.0;
+    return (start.x + ((end.x - start.x) * f), start.y + ((end.y - start.y) * f), z);
+
+def openingGrid(start, end, startElevation, endElevation, openings):
+    # The side of a wall split into a grid at the edges of its openings, the cells
+    # inside an opening are left out. All columns share the same rows, so the grid has
+    # no T-junctions. The top row follows the slope of the wall
+    length = distance(start, end);
+    top = min(startElevation, endElevation);
+    us = sorted({0.0, length} | {u for o in openings for u in o[:2] if OPENING_EPSILON < u < length - OPENING_EPSILON});
+    zs = sorted({0.0} | {z for o in openings for z in o[2:] if OPENING_EPSILON < z < top - OPENING_EPSILON});
+    vertices, faces, indices = [], [], {};
+
+    def __vertex(i, j):
+        index = indices.get((i, j));
+        if(index is None):
+            u = us[i];
+            z = zs[j] if j < len(zs) else startElevation + ((endElevation - startElevation) * (u / length));
+            index = indices[(i, j)] = len(vertices);
+            vertices.append(_linePoint(start, end, u, z));
+        return index;
+
+    for i in range(len(us) - 1):
+        uc = (us[i] + us[i + 1]) * 0.5;
+        for j in range(len(zs)):
+            zc = (zs[j] + (zs[j + 1] if j + 1 < len(zs) else top)) * 0.5;
+            if(any(u0 <= uc <= u1 and z0 <= zc <= z1 for u0, u1, z0, z1 in openings)):
+                continue;
+            faces.append((__vertex(i, j), __vertex(i + 1, j), __vertex(i + 1, j + 1), __vertex(i, j + 1)));
+    return vertices, faces;
+
+def _facing(points, direction):
+    # The quad wound so that its normal points along direction
+    (x0, y0, z0), (x1, y1, z1), (x2, y2, z2) = points[0], points[1], points[2];
+    ax, ay, az = x1 - x0, y1 - y0, z1 - z0;
+    bx, by, bz = x2 - x0, y2 - y0, z2 - z0;
+    normal = ((ay * bz) - (az * by), (az * bx) - (ax * bz), (ax * by) - (ay * bx));
+    if(sum(n * d for n, d in zip(normal, direction)) < 0.0):
+        return list(reversed(points));
+    return points;
+
+def revealQuads(interiorStart, interiorEnd, exteriorStart, exteriorEnd, interiorOpenings, exteriorOpenings, topElevation):
+    # The jambs, sill and head of every opening, joining the two sides of the wall
+    quads = [];
+    length = distance(interiorStart, interiorEnd) or 1.0;
+    dx, dy = (interiorEnd.x - interiorStart.x) / length, (interiorEnd.y - interiorStart.y) / length;
+    for interior, exterior in zip(interiorOpenings, exteriorOpenings):
+        if(not interior or not exterior):
+            continue;
+        (iu0, iu1, z0, z1), (eu0, eu1, _, _) = interior, exterior;
+        def __corners(u, eu, z):
+            return _linePoint(interiorStart, interiorEnd, u, z), _linePoint(exteriorStart, exteriorEnd, eu, z);
+        (il0, el0), (il1, el1) = __corners(iu0, eu0, z0), __corners(iu0, eu0, z1);
+        (ir0, er0), (ir1, er1) = __corners(iu1, eu1, z0), __corners(iu1, eu1, z1);
+        quads.append(_facing([il0, el0, el1, il1], (dx, dy, 0.0)));
+        quads.append(_facing([ir0, er0, er1, ir1], (-dx, -dy, 0.0)));
+        if(z0 > OPENING_EPSILON):
+            quads.append(_facing([il0, ir0, er0, el0], (0.0, 0.0, 1.0)));
+        if(z1 < topElevation - OPENING_EPSILON):
+            quads.append(_facing([il1, ir1, er1, el1], (0.0, 0.0, -1.0)));
+    return quads;
+
+def halfEdgeSurfaces(edge):
+    wall = edge.wall;
+    if(wall.isCurved):
+        return _curvedHalfEdgeSurfaces(edge);
+    extStartCorner, extEndCorner = edge.getStart(), edge.getEnd();
+    interiorStart, interiorEnd = edge.interiorStart(), edge.interiorEnd();
+    exteriorStart, exteriorEnd = edge.exteriorStart(), edge.exteriorEnd();
+    startElevation, endElevation = extStartCorner.elevation, extEndCorner.elevation;
+
+    totalDistance = edge.interiorDistance();
+    height = max(wall.startElevation, wall.endElevation);
+    texturePack = edge.getTexture();
+    wallSize = Vector((totalDistance, height));
+    key = edgeKey(edge);
+
+    def __wallQuad(kind, start, end):
+        points = [_vec3(start), _vec3(end), _vec3(end, endElevation), _vec3(start, startElevation)];
+        return _quad('%s-%s'%(kind, wall.id), kind, points, _wallUVs(points, start, totalDistance, height), texturePack, wallSize, '%s-%s'%(kind, key));
+
+    def __filler(kind, points):
+        return _quad('%s-%s'%(kind, wall.id), kind, points, key='%s-%s'%(kind, key));
+
+    surfaces = [];
+    if(len(wall.openings)):
+        surfaces.extend(_openingSides(edge, texturePack, wallSize, key));
+    else:
+        if(not wall.frontEdge or not wall.backEdge):
+            surfaces.append(__wallQuad(SURFACE_EXTERIOR, exteriorStart, exteriorEnd));
+        surfaces.append(__wallQuad(SURFACE_INTERIOR, interiorStart, interiorEnd));
+
+    surfaces.append(__filler(SURFACE_BOTTOM, [
+        _vec3(exteriorStart), _vec3(exteriorEnd), _vec3(interiorEnd), _vec3(interiorStart)]));
+    surfaces.append(__filler(SURFACE_TOP, [
+        _vec3(exteriorStart, startElevation), _vec3(exteriorEnd, endElevation),
+        _vec3(interiorEnd, endElevation), _vec3(interiorStart, startElevation)]));
+    surfaces.append(__filler(SURFACE_START_FILLER, [
+        _vec3(interiorStart), _vec3(exteriorStart), _vec3(exteriorStart, startElevation), _vec3(interiorStart, startElevation)]));
+    surfaces.append(__filler(SURFACE_END_FILLER, [
+        _vec3(interiorEnd), _vec3(exteriorEnd), _vec3(exteriorEnd, endElevation), _vec3(interiorEnd, endElevation)]));
+    return surfaces;
+
+def _openingSides(edge, texturePack, wallSize, key):
+    # The sides of straight walls with windows or doors, as grids around the openings,
+    # and the reveals that close the openings between the two sides of the wall
+    wall = edge.wall;
+    interiorStart, interiorEnd = edge.interiorStart(), edge.interiorEnd();
+    exteriorStart, exteriorEnd = edge.exteriorStart(), edge.exteriorEnd();
+    startElevation, endElevation = edge.getStart().elevation, edge.getEnd().elevation;
+    top = min(startElevation, endElevation);
+    interiorOpenings = lineOpenings(wall, interiorStart, interiorEnd, top);
+    exteriorOpenings = lineOpenings(wall, exteriorStart, exteriorEnd, top);
+
+    def __wallGrid(kind, start, end, openings):
+        vertices, faces = openingGrid(start, end, startElevation, endElevation, [o for o in openings if o]);
+        if(not len(faces)):
+            return None;
+        uvs = _wallUVs(vertices, start, wallSize.x, wallSize.y);
+        return Surface('%s-%s'%(kind, wall.id), kind, vertices, faces, uvs, texturePack, wallSize, '%s-%s'%(kind, key));
+
+    surfaces = [];
+    if(not wall.frontEdge or not wall.backEdge):
+        surfaces.append(__wallGrid(SURFACE_EXTERIOR, exteriorStart, exteriorEnd, exteriorOpenings));
+    surfaces.append(__wallGrid(SURFACE_INTERIOR, interiorStart, interiorEnd, interiorOpenings));
+
+    # The reveals are shared by both sides of the wall, they are built with the front edge
+    if(edge.front or not wall.frontEdge):
+        quads = revealQuads(interiorStart, interiorEnd, exteriorStart, exteriorEnd, interiorOpenings, exteriorOpenings, top);
+        if(len(quads)):
+            vertices = [point for quad in quads for point in quad];
+            faces = [tuple(range(i * 4, (i * 4) + 4)) for i in range(len(quads))];
+            surfaces.append(Surface('%s-%s'%(SURFACE_REVEAL, wall.id), SURFACE_REVEAL, vertices, faces, key='%s-%s'%(SURFACE_REVEAL, key)));
+    return [surface for surface in surfaces if surface];
+
+def roomOutline(room):
+    # The interior corners with elevations, plus the interior points of curved walls
+    outline = [];
+    for edge, corner in zip(room.edges(), room.interiorCorners3D):
+        outline.append((corner.x, corner.y, corner.z));
+        if(edge.wall.isCurved):
+            interior, exterior, fractions = curvedEdgeLines(edge);
+            startElevation, endElevation = edge.getStart().elevation, edge.getEnd().elevation;
+            for (x, y), fraction in zip(interior[1:-1].tolist(), fractions[1:-1].tolist()):
+                outline.append((x, y, startElevation + ((endElevation - startElevation) * fraction)));
+    return outline;
+
+def _pointsInPolygon(points, polygon):
+    # Even odd ray casting of all points against all edges at once
+    px, py = points[:, 0][:, None], points[:, 1][:, None];
+    x1, y1 = polygon[:, 0][None, :], polygon[:, 1][None, :];
+    x2, y2 = np.roll(polygon[:, 0], -1)[None, :], np.roll(polygon[:, 1], -1)[None, :];
+    crosses = (y1 > py) != (y2 > py);
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xs = x1 + ((py - y1) * (x2 - x1) / (y2 - y1));
+    return ((crosses & (px < xs)).sum(axis=1) % 2) == 1;
+
+def roomHoles(rooms):
+    # Rooms lying inside another room without sharing a corner with it (courtyards,
+    # rooms around columns) are cut out of its floor and roof. Only the rooms directly
+    # inside are holes, a room inside a hole is a hole of the hole. One list of (x, y)
+    # outlines per room
+    outlines = [np.array([(x, y) for x, y, z in roomOutline(room)], dtype=np.float64).reshape(-1, 2) for room in rooms];
+    cornerIds = [set(corner.id for corner in room.corners) for room in rooms];
+    bounds = np.array([np.concatenate((outline.min(axis=0), outline.max(axis=0))) if len(outline) else (0.0, 0.0, -1.0, -1.0) for outline in outlines]).reshape(-1, 4);
+
+    inside = [];
+    for i, outline in enumerate(outlines):
+        candidates = np.nonzero((bounds[:, 0] >= bounds[i, 0]) & (bounds[:, 1] >= bounds[i, 1]) & (bounds[:, 2] <= bounds[i, 2]) & (bounds[:, 3] <= bounds[i, 3]))[0];
+        inside.append(set(int(j) for j in candidates if j != i and len(outlines[j]) >= 3 and cornerIds[i].isdisjoint(cornerIds[j]) and _pointsInPolygon(outlines[j], outline).all()));
+
+    holes = [];
+    for i, nested in enumerate(inside):
+        direct = [j for j in sorted(nested) if not any(j in inside[k] for k in nested if k != j)];
+        holes.append([outlines[j].tolist() for j in direct]);
+    return holes;
+
+def roomSurfaces(room, holes=None):
+    # Floor and roof as triangles, the holes are (x, y) outlines cut out of both
+    uuid = room.getUuid();
+    size = room.floorRectangleSize;
+    outline = roomOutline(room);
+    holes = holes or [];
+    faces = triangulate(outline, holes);
+
+    # Rooms are mostly flat, the holes of the roof are put at its mean elevation
+    roofElevation = sum(z for x, y, z in outline) / len(outline) if len(outline) else 0.0;
+    roofPoints = outline + [(x, y, roofElevation) for hole in holes for x, y in hole];
+
+    floorPoints = [(x, y, 0.0) for x, y, z in roofPoints];
+    floorUVs = [((x - floorPoints[0][0]) / size.x, y / size.y) for x, y, z in floorPoints];
+    floor = Surface('floor-%s'%(uuid), SURFACE_FLOOR, floorPoints, faces, floorUVs, room.getTexture(), size);
+
+    roof = Surface('roof-%s'%(uuid), SURFACE_ROOF, roofPoints, faces);
+    return [floor, roof];
+
+def floorplanSurfaces(floorplan, tolerance=None):
+    tessellateWalls(floorplan.walls, tolerance or curveTolerance());
+    surfaces = [];
+    rooms = floorplan.rooms;
+    for room, holes in zip(rooms, roomHoles(rooms)):
+        surfaces.extend(roomSurfaces(room, holes));
+    for edge in floorplan.wallEdges():
+        surfaces.extend(halfEdgeSurfaces(edge));
+    return surfaces;
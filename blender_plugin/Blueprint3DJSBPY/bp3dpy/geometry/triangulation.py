@@ -0,0 +1,648 @@
+import math;
+import numpy as np;
+
+# Polygon triangulation with holes, after the earcut algorithm of Mapbox. The outline
+# is kept as a doubly linked ring, every hole is bridged into it at its leftmost point
+# and ears are clipped off the ring, which is quadratic in the worst case (long combs,
+# many reflex points). Above HASHED_POINTS points the outline and holes are first
+# split into y-monotone pieces instead (see _monotoneTriangulate), which is
+# O(n log n), and the z-order hashed ear clipper is only the fallback.
+# Self intersecting or degenerate outlines still give triangles, through the
+# cleanup passes of the ear clipper (filtering, local intersection curing, splitting)
+
+HASHED_POINTS = 80;
+
+class _Node():
+    __slots__ = ('i', 'x', 'y', 'prev', 'next', 'z', 'prevZ', 'nextZ', 'steiner');
+
+    def __init__(self, i, x, y):
+        self.i = i;
+        self.x = x;
+        self.y = y;
+        self.prev = None;
+        self.next = None;
+        self.z = 0;
+        self.prevZ = None;
+        self.nextZ = None;
+        self.steiner = False;
+
+
+def _signedArea(points, start, end):
+    total = 0.0;
+    j = end - 1;
+    for i in range(start, end):
+        total += (points[j][0] - points[i][0]) * (points[i][1] + points[j][1]);
+        j = i;
+    return total;
+
+def _insertNode(i, x, y, last):
+    p = _Node(i, x, y);
+    if(last is None):
+        p.prev = p;
+        p.next = p;
+    else:
+        p.next = last.next;
+        p.prev = last;
+        last.next.prev = p;
+        last.next = p;
+    return p;
+
+def _removeNode(p):
+    p.next.prev = p.prev;
+    p.prev.next = p.next;
+    if(p.prevZ):
+        p.prevZ.nextZ = p.nextZ;
+    if(p.nextZ):
+        p.nextZ.prevZ = p.prevZ;
+
+def _linkedList(points, start, end, clockwise):
+    last = None;
+    if(clockwise == (_signedArea(points, start, end) > 0)):
+        for i in range(start, end):
+            last = _insertNode(i, points[i][0], points[i][1], last);
+    else:
+        for i in range(end - 1, start - 1, -1):
+            last = _insertNode(i, points[i][0], points[i][1], last);
+    if(last is not None and _equals(last, last.next)):
+        _removeNode(last);
+        last = last.next;
+    return last;
+
+def _area(p, q, r):
+    return ((q.y - p.y) * (r.x - q.x)) - ((q.x - p.x) * (r.y - q.y));
+
+def _equals(p1, p2):
+    return p1.x == p2.x and p1.y == p2.y;
+
+def _sign(value):
+    return 1 if value > 0 else (-1 if value < 0 else 0);
+
+def _onSegment(p, q, r):
+    return min(p.x, r.x) <= q.x <= max(p.x, r.x) and min(p.y, r.y) <= q.y <= max(p.y, r.y);
+
+def _intersects(p1, q1, p2, q2):
+    o1, o2 = _sign(_area(p1, q1, p2)), _sign(_area(p1, q1, q2));
+    o3, o4 = _sign(_area(p2, q2, p1)), _sign(_area(p2, q2, q1));
+    if(o1 != o2 and o3 != o4):
+        return True;
+    if(o1 == 0 and _onSegment(p1, p2, q1)):
+        return True;
+    if(o2 == 0 and _onSegment(p1, q2, q1)):
+        return True;
+    if(o3 == 0 and _onSegment(p2, p1, q2)):
+        return True;
+    if(o4 == 0 and _onSegment(p2, q1, q2)):
+        return True;
+    return False;
+
+def _pointInTriangle(ax, ay, bx, by, cx, cy, px, py):
+    return (((cx - px) * (ay - py)) >= ((ax - px) * (cy - py)) and
+            ((ax - px) * (by - py)) >= ((bx - px) * (ay - py)) and
+            ((bx - px) * (cy - py)) >= ((cx - px) * (by - py)));
+
+def _intersectsPolygon(a, b):
+    p = a;
+    while(True):
+        if(p.i != a.i and p.next.i != a.i and p.i != b.i and p.next.i != b.i and _intersects(p, p.next, a, b)):
+            return True;
+        p = p.next;
+        if(p is a):
+            return False;
+
+def _locallyInside(a, b):
+    if(_area(a.prev, a, a.next) < 0):
+        return _area(a, b, a.next) >= 0 and _area(a, a.prev, b) >= 0;
+    return _area(a, b, a.prev) < 0 or _area(a, a.next, b) < 0;
+
+def _middleInside(a, b):
+    p = a;
+    inside = False;
+    px, py = (a.x + b.x) * 0.5, (a.y + b.y) * 0.5;
+    while(True):
+        if(((p.y > py) != (p.next.y > py)) and p.next.y != p.y and (px < ((p.next.x - p.x) * (py - p.y) / (p.next.y - p.y)) + p.x)):
+            inside = not inside;
+        p = p.next;
+        if(p is a):
+            return inside;
+
+def _isValidDiagonal(a, b):
+    if(a.next.i == b.i or a.prev.i == b.i or _intersectsPolygon(a, b)):
+        return False;
+    if(_locallyInside(a, b) and _locallyInside(b, a) and _middleInside(a, b) and (_area(a.prev, a, b.prev) or _area(a, b.prev, b))):
+        return True;
+    return _equals(a, b) and _area(a.prev, a, a.next) > 0 and _area(b.prev, b, b.next) > 0;
+
+def _splitPolygon(a, b):
+    # Joins a and b with a diagonal, both halves keep their own copies of a and b
+    a2, b2 = _Node(a.i, a.x, a.y), _Node(b.i, b.x, b.y);
+    an, bp = a.next, b.prev;
+    a.next = b;
+    b.prev = a;
+    a2.next = an;
+    an.prev = a2;
+    b2.next = a2;
+    a2.prev = b2;
+    bp.next = b2;
+    b2.prev = bp;
+    return b2;
+
+def _filterPoints(start, end=None):
+    # Drops duplicate and collinear points
+    if(start is None):
+        return start;
+    end = end or start;
+    p = start;
+    while(True):
+        again = False;
+        if(not p.steiner and (_equals(p, p.next) or _area(p.prev, p, p.next) == 0)):
+            _removeNode(p);
+            p = end = p.prev;
+            if(p is p.next):
+                break;
+            again = True;
+        else:
+            p = p.next;
+        if(not again and p is end):
+            break;
+    return end;
+
+def _zOrder(x, y, minX, minY, invSize):
+    # Interleaved bits of the 15 bit grid coordinates
+    x = int((x - minX) * invSize);
+    y = int((y - minY) * invSize);
+    x = (x | (x << 8)) & 0x00FF00FF;
+    x = (x | (x << 4)) & 0x0F0F0F0F;
+    x = (x | (x << 2)) & 0x33333333;
+    x = (x | (x << 1)) & 0x55555555;
+    y = (y | (y << 8)) & 0x00FF00FF;
+    y = (y | (y << 4)) & 0x0F0F0F0F;
+    y = (y | (y << 2)) & 0x33333333;
+    y = (y | (y << 1)) & 0x55555555;
+    return x | (y << 1);
+
+def _indexCurve(start, minX, minY, invSize):
+    nodes = [];
+    p = start;
+    while(True):
+        if(p.z == 0):
+            p.z = _zOrder(p.x, p.y, minX, minY, invSize);
+        nodes.append(p);
+        p = p.next;
+        if(p is start):
+            break;
+    nodes.sort(key=lambda node: node.z);
+    for i, node in enumerate(nodes):
+        node.prevZ = nodes[i - 1] if i > 0 else None;
+        node.nextZ = nodes[i + 1] if i + 1 < len(nodes) else None;
+
+def _isEar(ear):
+    a, b, c = ear.prev, ear, ear.next;
+    if(_area(a, b, c) >= 0):
+        # Reflex
+        return False;
+    ax, bx, cx, ay, by, cy = a.x, b.x, c.x, a.y, b.y, c.y;
+    x0, x1, y0, y1 = min(ax, bx, cx), max(ax, bx, cx), min(ay, by, cy), max(ay, by, cy);
+    p = c.next;
+    while(p is not a):
+        if(x0 <= p.x <= x1 and y0 <= p.y <= y1 and _pointInTriangle(ax, ay, bx, by, cx, cy, p.x, p.y) and _area(p.prev, p, p.next) >= 0):
+            return False;
+        p = p.next;
+    return True;
+
+def _isEarHashed(ear, minX, minY, invSize):
+    a, b, c = ear.prev, ear, ear.next;
+    if(_area(a, b, c) >= 0):
+        return False;
+    ax, bx, cx, ay, by, cy = a.x, b.x, c.x, a.y, b.y, c.y;
+    x0, x1, y0, y1 = min(ax, bx, cx), max(ax, bx, cx), min(ay, by, cy), max(ay, by, cy);
+    minZ, maxZ = _zOrder(x0, y0, minX, minY, invSize), _zOrder(x1, y1, minX, minY, invSize);
+
+    def __blocks(p):
+        return (p is not a and p is not c and x0 <= p.x <= x1 and y0 <= p.y <= y1 and
+                _pointInTriangle(ax, ay, bx, by, cx, cy, p.x, p.y) and _area(p.prev, p, p.next) >= 0);
+
+    # Both directions along the curve from the ear, within the z range of its bounds
+    p, n = ear.prevZ, ear.nextZ;
+    while(p is not None and p.z >= minZ and n is not None and n.z <= maxZ):
+        if(__blocks(p) or __blocks(n)):
+            return False;
+        p, n = p.prevZ, n.nextZ;
+    while(p is not None and p.z >= minZ):
+        if(__blocks(p)):
+            return False;
+        p = p.prevZ;
+    while(n is not None and n.z <= maxZ):
+        if(__blocks(n)):
+            return False;
+        n = n.nextZ;
+    return True;
+
+def _cureLocalIntersections(start, triangles):
+    p = start;
+    while(True):
+        a, b = p.prev, p.next.next;
+        if(not _equals(a, b) and _intersects(a, p, p.next, b) and _locallyInside(a, b) and _locallyInside(b, a)):
+            triangles.append((a.i, p.i, b.i));
+            _removeNode(p);
+            _removeNode(p.next);
+            p = start = b;
+        p = p.next;
+        if(p is start):
+            break;
+    return _filterPoints(p);
+
+def _splitEarcut(start, triangles, minX, minY, invSize):
+    # Splits the ring along a valid diagonal and triangulates both halves
+    a = start;
+    while(True):
+        b = a.next.next;
+        while(b is not a.prev):
+            if(a.i != b.i and _isValidDiagonal(a, b)):
+                c = _splitPolygon(a, b);
+                a = _filterPoints(a, a.next);
+                c = _filterPoints(c, c.next);
+                _earcutLinked(a, triangles, minX, minY, invSize, 0);
+                _earcutLinked(c, triangles, minX, minY, invSize, 0);
+                return;
+            b = b.next;
+        a = a.next;
+        if(a is start):
+            return;
+
+def _earcutLinked(ear, triangles, minX, minY, invSize, passNumber):
+    if(ear is None):
+        return;
+    if(not passNumber and invSize):
+        _indexCurve(ear, minX, minY, invSize);
+
+    stop = ear;
+    while(ear.prev is not ear.next):
+        prev, nxt = ear.prev, ear.next;
+        if(_isEarHashed(ear, minX, minY, invSize) if invSize else _isEar(ear)):
+            triangles.append((prev.i, ear.i, nxt.i));
+            _removeNode(ear);
+            # Skipping the next vertex leads to less sliver triangles
+            ear = stop = nxt.next;
+            continue;
+
+        ear = nxt;
+        if(ear is stop):
+            # No ears left, clean up and try again
+            if(not passNumber):
+                _earcutLinked(_filterPoints(ear), triangles, minX, minY, invSize, 1);
+            elif(passNumber == 1):
+                ear = _cureLocalIntersections(_filterPoints(ear), triangles);
+                _earcutLinked(ear, triangles, minX, minY, invSize, 2);
+            elif(passNumber == 2):
+                _splitEarcut(ear, triangles, minX, minY, invSize);
+            break;
+
+def _leftmost(start):
+    p = leftmost = start;
+    while(True):
+        if(p.x < leftmost.x or (p.x == leftmost.x and p.y < leftmost.y)):
+            leftmost = p;
+        p = p.next;
+        if(p is start):
+            return leftmost;
+
+def _sectorContainsSector(m, p):
+    return _area(m.prev, m, p.prev) < 0 and _area(p.next, m, m.next) < 0;
+
+def _findHoleBridge(hole, outerNode):
+    # The ring point the hole is connected to, seen from the leftmost point of the hole
+    p = outerNode;
+    hx, hy = hole.x, hole.y;
+    qx = float('-inf');
+    m = None;
+    while(True):
+        if(hy <= p.y and hy >= p.next.y and p.next.y != p.y):
+            x = p.x + ((hy - p.y) * (p.next.x - p.x) / (p.next.y - p.y));
+            if(x <= hx and x > qx):
+                qx = x;
+                m = p if p.x < p.next.x else p.next;
+                if(x == hx):
+                    return m;
+        p = p.next;
+        if(p is outerNode):
+            break;
+    if(m is None):
+        return None;
+
+    stop = m;
+    mx, my = m.x, m.y;
+    tanMin = float('inf');
+    p = m;
+    while(True):
+        if(hx >= p.x and p.x >= mx and hx != p.x and
+           _pointInTriangle(hx if hy < my else qx, hy, mx, my, qx if hy < my else hx, hy, p.x, p.y)):
+            tan = abs(hy - p.y) / (hx - p.x);
+            if(_locallyInside(p, hole) and (tan < tanMin or (tan == tanMin and (p.x > m.x or (p.x == m.x and _sectorContainsSector(m, p)))))):
+                m = p;
+                tanMin = tan;
+        p = p.next;
+        if(p is stop):
+            return m;
+
+def _eliminateHoles(points, holeStarts, outerNode):
+    queue = [];
+    for index, start in enumerate(holeStarts):
+        end = holeStarts[index + 1] if index + 1 < len(holeStarts) else len(points);
+        ring = _linkedList(points, start, end, False);
+        if(ring is None):
+            continue;
+        if(ring is ring.next):
+            ring.steiner = True;
+        queue.append(_leftmost(ring));
+    queue.sort(key=lambda node: node.x);
+    for hole in queue:
+        bridge = _findHoleBridge(hole, outerNode);
+        if(bridge is None):
+            continue;
+        bridgeReverse = _splitPolygon(bridge, hole);
+        _filterPoints(bridgeReverse, bridgeReverse.next);
+        outerNode = _filterPoints(bridge, bridge.next);
+    return outerNode;
+
+# Monotone decomposition, used above HASHED_POINTS points. A sweep from the top down
+# adds the diagonals that split the polygon and its holes into y-monotone pieces,
+# every piece is then triangulated in linear time. O(n log n) for simple polygons,
+# anything else (self intersections, overlapping holes) fails the triangle count or
+# area check and goes to the ear clipper
+_START, _END, _SPLIT, _MERGE, _REGULAR = range(5);
+MONOTONE_TOLERANCE = 1e-9;
+
+def _orient(points, a, b, c):
+    # Twice the signed area of abc, positive when counter clockwise
+    ax, ay = points[a];
+    bx, by = points[b];
+    cx, cy = points[c];
+    return ((bx - ax) * (cy - ay)) - ((by - ay) * (cx - ax));
+
+def _ringArea(points, ring):
+    total = 0.0;
+    j = ring[-1];
+    for i in ring:
+        total += (points[j][0] * points[i][1]) - (points[i][0] * points[j][1]);
+        j = i;
+    return total * 0.5;
+
+def _cleanRing(points, start, end):
+    # Drops repeated and collinear points, like _filterPoints does for the ear clipper
+    ring = [];
+    for i in range(start, end):
+        while(len(ring) >= 2 and _orient(points, ring[-2], ring[-1], i) == 0.0):
+            ring.pop();
+        if(not ring or points[ring[-1]] != points[i]):
+            ring.append(i);
+    changed = True;
+    while(changed and len(ring) >= 3):
+        changed = False;
+        if(points[ring[0]] == points[ring[-1]] or _orient(points, ring[-2], ring[-1], ring[0]) == 0.0):
+            ring.pop();
+            changed = True;
+        elif(_orient(points, ring[-1], ring[0], ring[1]) == 0.0):
+            ring.pop(0);
+            changed = True;
+    return ring if len(ring) >= 3 else [];
+
+def _monotoneTriangulate(points, ranges):
+    # ranges: (start, end) of the outline and of every hole in points. Returns counter
+    # clockwise triangles, or None when the result does not cover the polygon exactly
+    nxt, prv = {}, {};
+    expectedArea, kept, rings = 0.0, 0, 0;
+    for k, (start, end) in enumerate(ranges):
+        ring = _cleanRing(points, start, end);
+        area = _ringArea(points, ring) if ring else 0.0;
+        if(area == 0.0):
+            if(k == 0):
+                return [];
+            continue;
+        # The outline counter clockwise and the holes clockwise, the inside is on the left
+        if((area > 0.0) != (k == 0)):
+            ring.reverse();
+        for j, i in enumerate(ring):
+            nxt[i], prv[i] = ring[(j + 1) % len(ring)], ring[j - 1];
+        expectedArea += abs(area) if k == 0 else -abs(area);
+        kept += len(ring);
+        rings += 1;
+
+    def __above(a, b):
+        return points[a][1] > points[b][1] or (points[a][1] == points[b][1] and points[a][0] < points[b][0]);
+
+    order = sorted(nxt, key=lambda i: (-points[i][1], points[i][0]));
+    kinds = {};
+    for v in order:
+        p, n = prv[v], nxt[v];
+        turn = _orient(points, p, v, n);
+        if(__above(v, p) and __above(v, n)):
+            kinds[v] = _START if turn > 0.0 else _SPLIT;
+        elif(__above(p, v) and __above(n, v)):
+            kinds[v] = _END if turn > 0.0 else _MERGE;
+        else:
+            kinds[v] = _REGULAR;
+
+    # The edges (i, nxt[i]) crossed by the sweep line with the inside on their right,
+    # ordered by x. Edges never cross, so the order holds while the line moves down
+    status, helpers, diagonals = [], {}, [];
+    def __x(e, y):
+        (ax, ay), (bx, by) = points[e], points[nxt[e]];
+        if(y == ay or ay == by):
+            return ax;
+        if(y == by):
+            return bx;
+        return ax + ((y - ay) * (bx - ax) / (by - ay));
+    def __bisect(x, y):
+        lo, hi = 0, len(status);
+        while(lo < hi):
+            mid = (lo + hi) // 2;
+            if(__x(status[mid], y) < x):
+                lo = mid + 1;
+            else:
+                hi = mid;
+        return lo;
+    def __insert(e):
+        x, y = points[e];
+        status.insert(__bisect(x, y), e);
+        helpers[e] = e;
+    def __remove(e):
+        x, y = points[nxt[e]];
+        i = __bisect(x, y);
+        while(i < len(status) and status[i] != e):
+            i += 1;
+        del status[i if i < len(status) else status.index(e)];
+    def __leftOf(v):
+        x, y = points[v];
+        lo, hi = 0, len(status);
+        while(lo < hi):
+            mid = (lo + hi) // 2;
+            if(__x(status[mid], y) <= x):
+                lo = mid + 1;
+            else:
+                hi = mid;
+        return status[lo - 1] if lo else None;
+    def __fixUp(v, e):
+        if(kinds[helpers[e]] == _MERGE):
+            diagonals.append((v, helpers[e]));
+
+    try:
+        for v in order:
+            kind = kinds[v];
+            if(kind == _START):
+                __insert(v);
+            elif(kind == _END):
+                __fixUp(v, prv[v]);
+                __remove(prv[v]);
+            elif(kind == _SPLIT):
+                left = __leftOf(v);
+                diagonals.append((v, helpers[left]));
+                helpers[left] = v;
+                __insert(v);
+            elif(kind == _MERGE):
+                __fixUp(v, prv[v]);
+                __remove(prv[v]);
+                left = __leftOf(v);
+                __fixUp(v, left);
+                helpers[left] = v;
+            elif(__above(prv[v], v)):
+                # Going down the left side of the inside
+                __fixUp(v, prv[v]);
+                __remove(prv[v]);
+                __insert(v);
+            else:
+                left = __leftOf(v);
+                __fixUp(v, left);
+                helpers[left] = v;
+    except (ValueError, KeyError, TypeError):
+        return None;
+
+    # The faces of the rings and diagonals, walked with the inside on the left: from
+    # the edge (u, v) on to the neighbour of v just clockwise of u
+    neighbours = {v: [nxt[v], prv[v]] for v in nxt};
+    for a, b in diagonals:
+        neighbours[a].append(b);
+        neighbours[b].append(a);
+    turns = {};
+    for v, around in neighbours.items():
+        vx, vy = points[v];
+        around.sort(key=lambda w: math.atan2(points[w][1] - vy, points[w][0] - vx));
+        turns[v] = {w: around[k - 1] for k, w in enumerate(around)};
+
+    triangles = [];
+    pending = set((v, nxt[v]) for v in nxt);
+    pending.update(diagonals);
+    pending.update((b, a) for a, b in diagonals);
+    while(pending):
+        u, v = pending.pop();
+        face = [u];
+        while(v != face[0]):
+            if(len(face) > kept):
+                return None;
+            face.append(v);
+            u, v = v, turns[v][u];
+            pending.discard((u, v));
+        _triangulateMonotone(points, face, __above, triangles);
+
+    # Overlapping or missing triangles change the covered area
+    covered = sum(_orient(points, a, b, c) for a, b, c in triangles) * 0.5;
+    if(len(triangles) != kept + (2 * (rings - 1)) - 2 or abs(covered - expectedArea) > MONOTONE_TOLERANCE * max(abs(expectedArea), 1.0)):
+        return None;
+    return triangles;
+
+def _triangulateMonotone(points, face, above, triangles):
+    # The stack walk over a y-monotone counter clockwise face, top to bottom
+    count = len(face);
+    if(count < 3):
+        return;
+    top = min(range(count), key=lambda k: (-points[face[k]][1], points[face[k]][0]));
+    bottom = max(range(count), key=lambda k: (-points[face[k]][1], points[face[k]][0]));
+    # Counter clockwise from the top is the left chain down to the bottom
+    left, k = [], top;
+    while(k != bottom):
+        left.append(face[k]);
+        k = (k + 1) % count;
+    right, k = [], top;
+    while(k != bottom):
+        k = (k - 1) % count;
+        if(k != bottom):
+            right.append(face[k]);
+    merged, i, j = [], 0, 0;
+    while(i < len(left) or j < len(right)):
+        if(j >= len(right) or (i < len(left) and above(left[i], right[j]))):
+            merged.append((left[i], True));
+            i += 1;
+        else:
+            merged.append((right[j], False));
+            j += 1;
+    merged.append((face[bottom], None));
+
+    def __emit(a, b, c):
+        triangles.append((a, b, c) if _orient(points, a, b, c) >= 0.0 else (a, c, b));
+
+    stack = [merged[0], merged[1]];
+    for v, side in merged[2:-1]:
+        if(side != stack[-1][1]):
+            # Across to the other chain, a fan to every vertex on the stack
+            previous = stack[-1];
+            while(len(stack) > 1):
+                a = stack.pop()[0];
+                __emit(v, a, stack[-1][0]);
+            stack = [previous, (v, side)];
+        else:
+            last = stack.pop();
+            while(stack):
+                # Left chain vertices go down the boundary, right chain ones go up
+                s = stack[-1][0];
+                turn = _orient(points, s, last[0], v) if side else _orient(points, v, last[0], s);
+                if(turn <= 0.0):
+                    break;
+                __emit(v, last[0], s);
+                last = stack.pop();
+            stack.append(last);
+            stack.append((v, side));
+    v = merged[-1][0];
+    while(len(stack) > 1):
+        a = stack.pop()[0];
+        __emit(v, a, stack[-1][0]);
+
+def triangulate(outline, holes=None):
+    # outline and holes are lists of (x, y, ...) points, only x and y are used. Returns
+    # index triples into the outline points followed by the points of every hole, wound
+    # like the outline
+    points = [(float(p[0]), float(p[1])) for p in outline];
+    holeStarts = [];
+    for hole in holes or []:
+        if(len(hole) >= 3):
+            holeStarts.append(len(points));
+            points.extend((float(p[0]), float(p[1])) for p in hole);
+
+    outerLength = holeStarts[0] if holeStarts else len(points);
+    if(outerLength < 3):
+        return [];
+    if(len(points) > HASHED_POINTS):
+        bounds = [0] + holeStarts + [len(points)];
+        triangles = _monotoneTriangulate(points, list(zip(bounds[:-1], bounds[1:])));
+        if(triangles is not None):
+            if(_signedArea(points, 0, outerLength) < 0):
+                triangles = [(a, c, b) for a, b, c in triangles];
+            return triangles;
+    outerNode = _linkedList(points, 0, outerLength, True);
+    if(outerNode is None or outerNode.next is outerNode.prev):
+        return [];
+    if(holeStarts):
+        outerNode = _eliminateHoles(points, holeStarts, outerNode);
+
+    minX = minY = invSize = 0.0;
+    if(len(points) > HASHED_POINTS):
+        coords = np.asarray(points[:outerLength]);
+        minX, minY = coords.min(axis=0).tolist();
+        size = float((coords.max(axis=0) - coords.min(axis=0)).max());
+        invSize = 32767.0 / size if size else 0.0;
+
+    triangles = [];
+    _earcutLinked(outerNode, triangles, minX, minY, invSize, 0);
+
+    # The rings are walked clockwise, flip back to the winding of the outline
+    if(_signedArea(points, 0, outerLength) < 0):
+        triangles = [(a, c, b) for a, b, c in triangles];
+    return triangles;
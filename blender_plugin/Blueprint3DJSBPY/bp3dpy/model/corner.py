@@ -1,28 +1,49 @@
-from mathutils import Vector;
+from Blueprint3DJSBPY.bp3dpy.core.vectormath import Vector;
 from Blueprint3DJSBPY.bp3dpy.core.utils import uid;
+from Blueprint3DJSBPY.bp3dpy.model.store import FloorplanStore;
 
 class Corner():
+    __slots__ = ('__id', '__floorplan', '__store', '__index', '__wallStarts', '__wallEnds', '__attachedRooms');
+
     def __init__(self, floorplan, x, y, elevation, idd=None):
         self.__id = idd or uid();
         self.__floorplan = floorplan;
-        self.__x = x;
-        self.__y = y;
-        self.__elevation = elevation;
-        self.__co = Vector((x, y));
-        self.__co3 = Vector((x, y, self.__elevation));
+        self.__store = floorplan.store if floorplan else FloorplanStore();
+        self.__index = self.__store.addCorner(self, x, y, elevation);
 
         self.__wallStarts = [];
         self.__wallEnds = [];
 
         self.__attachedRooms = [];
+
+    @classmethod
+    def fromStore(cls, floorplan, index, idd):
+        # A corner whose columns are already in the store, see Floorplan.loadCompiled
+        corner = cls.__new__(cls);
+        corner.__id = idd;
+        corner.__floorplan = floorplan;
+        corner.__store = floorplan.store;
+        corner.__index = index;
+        corner.__wallStarts = [];
+        corner.__wallEnds = [];
+        corner.__attachedRooms = [];
+        return corner;
     
     def wallTo(self, corner):
+        # The floorplan index only has the walls of loadFloorplan and loadCompiled,
+        # walls created otherwise are found on the corner itself
+        wall = self.__floorplan.wallByCorners(self.__id, corner.id) if self.__floorplan else None;
+        if(wall):
+            return wall;
         for wall in self.__wallStarts:
             if(wall.getEnd() == corner):
                 return wall;
         return None;
     
     def wallFrom(self, corner):
+        wall = self.__floorplan.wallByCorners(corner.id, self.__id) if self.__floorplan else None;
+        if(wall):
+            return wall;
         for wall in self.__wallEnds:
             if(wall.getStart() == corner):
                 return wall;
@@ -38,6 +59,10 @@ class Corner():
         if(room):
             self.__attachedRooms.append(room);
 
+    def __clearMiterCaches(self):
+        for wall in self.__wallStarts + self.__wallEnds:
+            wall.clearMiterCache();
+
     @property
     def id(self):
         return self.__id;
@@ -46,55 +71,58 @@ class Corner():
     def floorplan(self):
         return self.__floorplan;
         
+    @property
+    def store(self):
+        return self.__store;
+
+    @property
+    def index(self):
+        return self.__index;
+
     @property
     def x (self):
-        return self.__x;
+        return self.__store.cornerXs[self.__index];
     
     @x.setter
     def x(self, value):
-        self.__x = value;
-        self.__co = Vector((value, self.__co.y));
-        self.__co3 = Vector((value, self.__co.y, self.__elevation));
+        self.__store.cornerXs[self.__index] = value;
+        self.__clearMiterCaches();
 
     @property
     def y (self):
-        return self.__y;
+        return self.__store.cornerYs[self.__index];
     
     @y.setter
     def y(self, value):
-        self.__y = value;
-        self.__co = Vector((self.__co.x, value));
-        self.__co3 = Vector((self.__co.x, value, self.__elevation));
+        self.__store.cornerYs[self.__index] = value;
+        self.__clearMiterCaches();
     
     @property
     def elevation (self):
-        return self.__elevation;
+        return self.__store.cornerElevations[self.__index];
     
     @elevation.setter
     def elevation(self, value):
-        self.__elevation = value;
-        self.__co3 = Vector((self.__co.x, self.__co.y, value));
+        self.__store.cornerElevations[self.__index] = value;
 
 
     @property
     def co(self):
-        return self.__co;
+        return Vector((self.x, self.y));
 
     @co.setter
     def co(self, coords):
-        self.__x = coords.x;
-        self.__y = coords.y;
-        self.__co = Vector((coords.x, coords.y));
-        self.__co3 = Vector((coords.x, coords.y, self.__co3.z));
+        self.__store.cornerXs[self.__index] = coords.x;
+        self.__store.cornerYs[self.__index] = coords.y;
+        self.__clearMiterCaches();
 
     @property
     def co3(self):
-        return self.__co3;
+        return Vector((self.x, self.y, self.elevation));
 
     @co3.setter
     def co3(self, coords):
-        self.__x = coords.x;
-        self.__y = coords.y;
-        self.__elevation = coords.z;
-        self.__co = Vector((coords.x, coords.y));
-        self.__co3 = Vector((coords.x, coords.y, coords.z));
+        self.__store.cornerXs[self.__index] = coords.x;
+        self.__store.cornerYs[self.__index] = coords.y;
+        self.__store.cornerElevations[self.__index] = coords.z;
+        self.__clearMiterCaches();
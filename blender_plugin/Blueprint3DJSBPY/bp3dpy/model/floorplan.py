@@ -1,4 +1,6 @@
-from Blueprint3DJSBPY.bp3dpy.core.constants import dimInch, dimFeetAndInch, dimMeter, dimCentiMeter, dimMilliMeter;
+import json;
+import numpy as np;
+from Blueprint3DJSBPY.bp3dpy.core.constants import dimInch, dimFeetAndInch, dimMeter, dimCentiMeter, dimMilliMeter, WallTypes;
 from Blueprint3DJSBPY.bp3dpy.core import Configuration;
 from Blueprint3DJSBPY.bp3dpy.core.Configuration import configDimUnit;
 from Blueprint3DJSBPY.bp3dpy.core import Dimensioning;
@@ -6,79 +8,214 @@ from Blueprint3DJSBPY.bp3dpy.core import Dimensioning;
 from Blueprint3DJSBPY.bp3dpy.model.corner import Corner;
 from Blueprint3DJSBPY.bp3dpy.model.wall import Wall;
 from Blueprint3DJSBPY.bp3dpy.model.room import Room;
+from Blueprint3DJSBPY.bp3dpy.model.store import FloorplanStore;
+from Blueprint3DJSBPY.bp3dpy.model.miters import edgeMiters;
+from Blueprint3DJSBPY.bp3dpy.model.roomfinder import findRooms, roomUuid, DEFAULT_ROOM_NAME;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import NULL_PROFILER;
 
 class Floorplan():
-    def __init__(self):
+    def __init__(self, profiler=None):
+        self.__profiler = profiler or NULL_PROFILER;
+        self.__store = FloorplanStore();
         self.__walls = [];
         self.__corners = [];
         self.__rooms = [];
         self.__floorTextures = {};
+        self.__units = None;
+        # (startCornerId, endCornerId) -> Wall
+        self.__wallsByCorners = {};
     
     def reset(self):
+        self.__store = FloorplanStore();
         self.__corners = [];
         self.__walls = [];
         self.__rooms = [];
         self.__floorTextures = {};
+        self.__units = None;
+        self.__wallsByCorners = {};
+
+    def __applyUnits(self, currentUnit):
+        self.__units = currentUnit;
+        print('SET UNIT SYSTEM TO ', currentUnit);
+        if(currentUnit == dimInch):
+            Configuration.setValue(configDimUnit, dimInch);
+        elif(currentUnit == dimFeetAndInch):
+            Configuration.setValue(configDimUnit, dimFeetAndInch);
+        elif(currentUnit == dimMeter):
+            Configuration.setValue(configDimUnit, dimMeter);
+        elif(currentUnit == dimCentiMeter):
+            Configuration.setValue(configDimUnit, dimCentiMeter);
+        elif(currentUnit == dimMilliMeter):
+            Configuration.setValue(configDimUnit, dimMilliMeter);
+        else:
+            Configuration.setValue(configDimUnit, dimCentiMeter);
 
     def loadFloorplan(self, floorplan):
         self.reset();
 
         if(floorplan is None):
             return False;
-        if(not floorplan.get('corners') or not floorplan.get('walls') or not floorplan.get('rooms')):
+        if(not floorplan.get('corners') or not floorplan.get('walls')):
             return False;
         
         if(floorplan.get('units')):
-            currentUnit = floorplan.get('units');
-            print('SET UNIT SYSTEM TO ', currentUnit);
-            if(currentUnit == dimInch):
-                Configuration.setValue(configDimUnit, dimInch);
-            elif(currentUnit == dimFeetAndInch):
-                Configuration.setValue(configDimUnit, dimFeetAndInch);
-            elif(currentUnit == dimMeter):
-                Configuration.setValue(configDimUnit, dimMeter);
-            elif(currentUnit == dimCentiMeter):
-                Configuration.setValue(configDimUnit, dimCentiMeter);
-            elif(currentUnit == dimMilliMeter):
-                Configuration.setValue(configDimUnit, dimMilliMeter);
-            else:
-                Configuration.setValue(configDimUnit, dimCentiMeter);
+            self.__applyUnits(floorplan.get('units'));
         
         corners = floorplan.get('corners');
         cornersById = {};
 
-        for k in corners.keys():
-            cornerData = corners[k];
-            # x, y, elevation = Dimensioning.cmFromMeasureRaw(cornerData.get('x')), Dimensioning.cmFromMeasureRaw(cornerData.get('y')), Dimensioning.cmFromMeasureRaw(cornerData.get('elevation'));
-            x, y, elevation = cornerData.get('x'), cornerData.get('y'), cornerData.get('elevation');
-            corner = Corner(self, x, y, elevation, k);
-            cornersById[corner.id] = corner;
-            self.__corners.append(corner);
+        with self.__profiler.span('corners'):
+            for k in corners.keys():
+                cornerData = corners[k];
+                # x, y, elevation = Dimensioning.cmFromMeasureRaw(cornerData.get('x')), Dimensioning.cmFromMeasureRaw(cornerData.get('y')), Dimensioning.cmFromMeasureRaw(cornerData.get('elevation'));
+                x, y, elevation = cornerData.get('x'), cornerData.get('y'), cornerData.get('elevation');
+                corner = Corner(self, x, y, elevation, k);
+                cornersById[corner.id] = corner;
+                self.__corners.append(corner);
+        self.__profiler.count('corners', len(self.__corners));
 
         walls = floorplan.get('walls');
 
-        for wallData in walls:
-            startCorner, endCorner = cornersById[wallData.get('corner1')], cornersById[wallData.get('corner2')];
-            frontTexture, backTexture = wallData.get('frontTexture'), wallData.get('backTexture');
-            thickness = wallData.get('thickness');
-            # thickness = 0.2;#Testing purposes
-            wall = Wall(thickness, startCorner, endCorner);
-            wall.frontTexture = frontTexture;
-            wall.backTexture = backTexture;
-            self.__walls.append(wall);
+        with self.__profiler.span('walls'):
+            for wallData in walls:
+                startCorner, endCorner = cornersById[wallData.get('corner1')], cornersById[wallData.get('corner2')];
+                frontTexture, backTexture = wallData.get('frontTexture'), wallData.get('backTexture');
+                thickness = wallData.get('thickness');
+                # thickness = 0.2;#Testing purposes
+                wall = Wall(thickness, startCorner, endCorner);
+                wall.frontTexture = frontTexture;
+                wall.backTexture = backTexture;
+                if(wallData.get('wallType') == WallTypes.CURVED.name and wallData.get('a') and wallData.get('b')):
+                    # blueprint-js saves the control points in cm, unlike the corners
+                    a, b = wallData.get('a'), wallData.get('b');
+                    wall.setCurve((Dimensioning.cmToMeasureRaw(a.get('x')), Dimensioning.cmToMeasureRaw(a.get('y'))), (Dimensioning.cmToMeasureRaw(b.get('x')), Dimensioning.cmToMeasureRaw(b.get('y'))));
+                self.__walls.append(wall);
+                self.__wallsByCorners.setdefault((startCorner.id, endCorner.id), wall);
+        self.__profiler.count('walls', len(self.__walls));
         
-        rooms = floorplan.get('rooms');
-        roomTextures = floorplan.get('newFloorTextures');
-        for roomKey in rooms:
-            cornerIdKeys = roomKey.split(',');
-            roomCorners = [cornersById[ckey] for ckey in cornerIdKeys];
-            roomName = rooms[roomKey].get('name');
-            room = Room(roomName, self, roomCorners);
-            roomTexture = roomTextures.get(room.getUuid());
-            self.__rooms.append(room);
-            if(roomTexture):
-                self.__floorTextures[room.getUuid()] = roomTexture;
+        # The rooms are found from the walls, the saved rooms only give their names.
+        # Saved rooms that are no longer a cycle of the walls are stale and left out
+        rooms = floorplan.get('rooms') or {};
+        roomsByUuid = {roomUuid(roomKey.split(',')): roomData for roomKey, roomData in rooms.items()};
+        roomTextures = floorplan.get('newFloorTextures') or {};
+        with self.__profiler.span('rooms'):
+            for roomCorners in findRooms(self.__corners, self.__walls):
+                roomData = roomsByUuid.pop(roomUuid([corner.id for corner in roomCorners]), None) or {};
+                room = Room(roomData.get('name') or DEFAULT_ROOM_NAME, self, roomCorners);
+                roomTexture = roomTextures.get(room.getUuid());
+                self.__rooms.append(room);
+                if(roomTexture):
+                    self.__floorTextures[room.getUuid()] = roomTexture;
+        self.__profiler.count('rooms', len(self.__rooms));
+        self.__profiler.count('stale rooms', len(roomsByUuid));
+
+        with self.__profiler.span('miters'):
+            self.updateMiters();
+
+    def compile(self):
+        # The loaded floorplan as flat NumPy arrays: the store columns, corner ids, the
+        # corners, walls, edges and interior corners of every room and an interned table
+        # of texture packs. loadCompiled restores it without any geometry computation
+        textures, textureIndices = [], {};
+        def __intern(texturePack):
+            if(texturePack is None):
+                return -1;
+            key = json.dumps(texturePack, sort_keys=True);
+            if(not key in textureIndices):
+                textureIndices[key] = len(textures);
+                textures.append(key);
+            return textureIndices[key];
+
+        arrays = self.__store.compile();
+        arrays['units'] = np.array(self.__units or '');
+        arrays['cornerIds'] = np.array([corner.id for corner in self.__corners], dtype=str);
+        arrays['wallIds'] = np.array([wall.id for wall in self.__walls], dtype=str);
+        arrays['wallFrontTextures'] = np.array([__intern(wall.frontTexture) for wall in self.__walls], dtype=np.int64);
+        arrays['wallBackTextures'] = np.array([__intern(wall.backTexture) for wall in self.__walls], dtype=np.int64);
+        arrays['wallCurved'] = np.array([wall.isCurved for wall in self.__walls], dtype=np.int8);
+        arrays['wallCurves'] = np.array([(wall.a.x, wall.a.y, wall.b.x, wall.b.y) if wall.isCurved else (0.0, 0.0, 0.0, 0.0) for wall in self.__walls], dtype=np.float64).reshape(-1, 4);
+
+        roomCorners, roomWalls, roomEdges, roomInteriors, roomTextures = [], [], [], [], [];
+        for room in self.__rooms:
+            roomCorners.append([corner.index for corner in room.corners]);
+            roomWalls.append([wall.index for wall in room.walls]);
+            roomEdges.append([edge.index for edge in room.edges()]);
+            roomInteriors.extend((v.x, v.y, v.z) for v in room.interiorCorners3D);
+            roomTextures.append(__intern(self.__floorTextures.get(room.getUuid())));
+        for name, lists in (('roomCorners', roomCorners), ('roomWalls', roomWalls), ('roomEdges', roomEdges)):
+            arrays[name] = np.array([index for indices in lists for index in indices], dtype=np.int64);
+            arrays[name + 'Offsets'] = np.cumsum([0] + [len(indices) for indices in lists], dtype=np.int64);
+        arrays['roomInteriorCorners'] = np.array(roomInteriors, dtype=np.float64).reshape(-1, 3);
+        arrays['roomTextures'] = np.array(roomTextures, dtype=np.int64);
+        arrays['roomNames'] = np.array(json.dumps([room.name for room in self.__rooms]));
+        arrays['textures'] = np.array(textures, dtype=str);
+        return arrays;
+
+    def loadCompiled(self, arrays):
+        self.reset();
+        if(str(arrays['units'])):
+            self.__applyUnits(str(arrays['units']));
+        store = self.__store;
+        store.loadCompiled(arrays);
+        textures = [json.loads(texture) for texture in arrays['textures'].tolist()];
+
+        with self.__profiler.span('corners'):
+            self.__corners = [Corner.fromStore(self, index, idd) for index, idd in enumerate(arrays['cornerIds'].tolist())];
+        self.__profiler.count('corners', len(self.__corners));
+
+        with self.__profiler.span('walls'):
+            wallData = zip(arrays['wallIds'].tolist(), arrays['wallStarts'].tolist(), arrays['wallEnds'].tolist(), arrays['wallFrontTextures'].tolist(), arrays['wallBackTextures'].tolist());
+            curved, curves = arrays['wallCurved'].tolist(), arrays['wallCurves'].tolist();
+            for index, (idd, start, end, frontTexture, backTexture) in enumerate(wallData):
+                startCorner, endCorner = self.__corners[start], self.__corners[end];
+                wall = Wall.fromStore(store, index, startCorner, endCorner, idd);
+                wall.frontTexture = textures[frontTexture] if frontTexture != -1 else None;
+                wall.backTexture = textures[backTexture] if backTexture != -1 else None;
+                if(curved[index]):
+                    wall.setCurve(curves[index][0:2], curves[index][2:4]);
+                self.__walls.append(wall);
+                self.__wallsByCorners.setdefault((startCorner.id, endCorner.id), wall);
+        self.__profiler.count('walls', len(self.__walls));
+
+        with self.__profiler.span('rooms'):
+            edges = [None] * len(arrays['edgeWalls']);
+            names = json.loads(str(arrays['roomNames']));
+            cornerOffsets, wallOffsets, edgeOffsets = arrays['roomCornersOffsets'].tolist(), arrays['roomWallsOffsets'].tolist(), arrays['roomEdgesOffsets'].tolist();
+            roomCorners, roomWalls, roomEdges = arrays['roomCorners'].tolist(), arrays['roomWalls'].tolist(), arrays['roomEdges'].tolist();
+            interiors = arrays['roomInteriorCorners'].tolist();
+            for index, name in enumerate(names):
+                corners = [self.__corners[c] for c in roomCorners[cornerOffsets[index]:cornerOffsets[index+1]]];
+                walls = [self.__walls[w] for w in roomWalls[wallOffsets[index]:wallOffsets[index+1]]];
+                edgeIndices = roomEdges[edgeOffsets[index]:edgeOffsets[index+1]];
+                room = Room.fromStore(name, self, corners, walls, edgeIndices, interiors[edgeOffsets[index]:edgeOffsets[index+1]], edges);
+                self.__rooms.append(room);
+                roomTexture = int(arrays['roomTextures'][index]);
+                if(roomTexture != -1):
+                    self.__floorTextures[room.getUuid()] = textures[roomTexture];
+            store.setEntities(self.__corners, self.__walls, edges);
+        self.__profiler.count('rooms', len(self.__rooms));
+        return True;
+
+    def updateMiters(self):
+        if(not len(self.__store.edges)):
+            return;
+        starts, ends, thicknesses, prevs, nexts = self.__store.edgeArrays();
+        # Curved walls meet their neighbours along their end tangents, not their chord
+        startDirections, endDirections = ends - starts, ends - starts;
+        for wall in self.__walls:
+            if(not wall.isCurved):
+                continue;
+            for edge in (wall.frontEdge, wall.backEdge):
+                if(edge):
+                    startDirection, endDirection = edge.startDirection(), edge.endDirection();
+                    startDirections[edge.index] = (startDirection.x, startDirection.y);
+                    endDirections[edge.index] = (endDirection.x, endDirection.y);
+        startMiters, endMiters = edgeMiters(starts, ends, thicknesses, prevs, nexts, startDirections, endDirections);
+        self.__store.setEdgeMiters(startMiters, endMiters);
     
+    def wallByCorners(self, startId, endId):
+        return self.__wallsByCorners.get((startId, endId));
+
     def getFloorTexture(self, uuid):
         if(uuid in self.__floorTextures.keys()):
             floorTexture = self.__floorTextures[uuid];
@@ -95,6 +232,10 @@ class Floorplan():
                 edges.append(wall.backEdge);
         return edges;
 
+    @property
+    def store(self):
+        return self.__store;
+
     @property
     def corners(self):
         return self.__corners;
@@ -107,6 +248,10 @@ class Floorplan():
     def rooms(self):
         return self.__rooms;
     
+    @property
+    def units(self):
+        return self.__units;
+
     @property
     def floorTextures(self):
         return self.__floorTextures;
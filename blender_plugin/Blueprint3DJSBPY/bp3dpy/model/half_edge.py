@@ -1,25 +1,29 @@
 import math;
-from mathutils import Vector, Matrix;
+from Blueprint3DJSBPY.bp3dpy.core.vectormath import Vector, Matrix;
 from Blueprint3DJSBPY.bp3dpy.core.utils import angle2pi, distance;
 
 class HalfEdge():
+    __slots__ = ('__room', '__store', '__index');
+
     def __init__(self, room, wall, front):
         self.__room = room;
-        self.__wall = wall;
-        self.__next = None;
-        self.__prev = None;
-        
-        self.__interiorTransform = Matrix();
-        self.__invInteriorTransform = Matrix();
-        self.__exteriorTransform = Matrix();
-        self.__invExteriorTransform = Matrix();
+        self.__store = wall.store;
+        # The links to the wall, prev/next edges and the miters at both corners live in the store
+        self.__index = self.__store.addEdge(self, wall.index, front or False);
 
-        self.__front = front or False;
-
-        if(self.__front):
-            self.__wall.frontEdge = self;
+        if(front):
+            wall.frontEdge = self;
         else:
-            self.__wall.backEdge = self;
+            wall.backEdge = self;
+
+    @classmethod
+    def fromStore(cls, room, store, index):
+        # An edge whose links and miters are already in the store, see Floorplan.loadCompiled
+        edge = cls.__new__(cls);
+        edge.__room = room;
+        edge.__store = store;
+        edge.__index = index;
+        return edge;
     
     def computeTransforms(self, start, end):
         v1 = start;
@@ -33,62 +37,49 @@ class HalfEdge():
         return transform, transform.inverted();
 
     def getStart(self):
-        if(self.__front):
-            return self.__wall.start;
+        if(self.front):
+            return self.wall.start;
         else:
-            return self.__wall.end;
+            return self.wall.end;
 
     def getEnd(self):
-        if(self.__front):
-            return self.__wall.end;
+        if(self.front):
+            return self.wall.end;
         else:
-            return self.__wall.start;
+            return self.wall.start;
 
     def getOppositeEdge(self):
-        if(self.__front):
-            return self.__wall.backEdge;
+        if(self.front):
+            return self.wall.backEdge;
         else:
-            return self.__wall.frontEdge;
+            return self.wall.frontEdge;
+
+    def startDirection(self):
+        # The direction the edge leaves its start corner, the tangent for curved walls
+        startTangent, endTangent = self.wall.endTangents();
+        return startTangent if self.front else -endTangent;
+
+    def endDirection(self):
+        # The direction the edge arrives at its end corner
+        startTangent, endTangent = self.wall.endTangents();
+        return endTangent if self.front else -startTangent;
 
     def halfAngleVector(self, v1, v2):
-        v1startX = v1startY = v1endX = v1endY = v2startX = v2startY = v2endX = v2endY = 0.0;
-
-        # make the best of things if we dont have prev or next
-        if (not v1):
-            v1startX = v2.getStart().x - (v2.getEnd().x - v2.getStart().x);
-            v1startY = v2.getStart().y - (v2.getEnd().y - v2.getStart().y);
-            v1endX = v2.getStart().x;
-            v1endY = v2.getStart().y;
-        else:
-            v1startX = v1.getStart().x;
-            v1startY = v1.getStart().y;
-            v1endX = v1.getEnd().x;
-            v1endY = v1.getEnd().y;
-
-        if (not v2):
-            v2startX = v1.getEnd().x;
-            v2startY = v1.getEnd().y;
-            v2endX = v1.getEnd().x + (v1.getEnd().x - v1.getStart().x);
-            v2endY = v1.getEnd().y + (v1.getEnd().y - v1.getStart().y);
-        else:
-            v2startX = v2.getStart().x;
-            v2startY = v2.getStart().y;
-            v2endX = v2.getEnd().x;
-            v2endY = v2.getEnd().y;
+        # make the best of things if we dont have prev or next, the missing edge
+        # continues the existing one
+        d1 = v1.endDirection() if v1 else v2.startDirection();
+        d2 = v2.startDirection() if v2 else v1.endDirection();
 
         # // CCW angle between edges
-        theta = angle2pi(Vector((v1startX - v1endX, v1startY - v1endY)), Vector((v2endX - v1endX, v2endY - v1endY)));
+        theta = angle2pi(Vector((-d1.x, -d1.y)), Vector((d2.x, d2.y)));
 
         # // cosine and sine of half angle
         cs = math.cos(theta / 2.0);
         sn = math.sin(theta / 2.0);
 
         # // rotate v2
-        v2dx = v2endX - v2startX;
-        v2dy = v2endY - v2startY;
-        
-        vx = v2dx * cs - v2dy * sn;
-        vy = v2dx * sn + v2dy * cs;
+        vx = d2.x * cs - d2.y * sn;
+        vy = d2.x * sn + d2.y * cs;
 
         # // normalize
         mag = distance(Vector((0, 0)), Vector((vx, vy)));
@@ -107,8 +98,8 @@ class HalfEdge():
         u, v, w, axis = None, None, None, None;
         dot = 0.0;
 
-        u = (v1.getEnd().co - v1.getStart().co).normalized();
-        v = (v2.getEnd().co - v2.getStart().co).normalized();
+        u = v1.endDirection().normalized();
+        v = v2.startDirection().normalized();
 
         u = u * v2.wall.thickness;
         v = v * v1.wall.thickness;
@@ -149,29 +140,42 @@ class HalfEdge():
         return w;
 
     def getTexture(self):
-        if(self.__front):
-            return self.__wall.frontTexture;
-        return self.__wall.backTexture;
+        if(self.front):
+            return self.wall.frontTexture;
+        return self.wall.backTexture;
+    
+    def startMiter(self):
+        store, index = self.__store, self.__index;
+        if(not store.edgeStartMiterValid[index]):
+            miter = self.interiorPointByEdges(self.prev, self);
+            store.setStartMiter(index, miter.x, miter.y);
+        return Vector((store.edgeStartMiterXs[index], store.edgeStartMiterYs[index]));
+
+    def endMiter(self):
+        store, index = self.__store, self.__index;
+        if(not store.edgeEndMiterValid[index]):
+            miter = self.interiorPointByEdges(self, self.next);
+            store.setEndMiter(index, miter.x, miter.y);
+        return Vector((store.edgeEndMiterXs[index], store.edgeEndMiterYs[index]));
+
+    def setMiters(self, startMiter, endMiter):
+        self.__store.setStartMiter(self.__index, startMiter.x, startMiter.y);
+        self.__store.setEndMiter(self.__index, endMiter.x, endMiter.y);
+
+    def clearMiterCache(self):
+        self.__store.clearEdgeMiters(self.__index);
     
     def interiorStart(self):
-        vec = self.interiorPointByEdges(self.prev, self);
-        vec = vec * 0.5;
-        return self.getStart().co + vec;
+        return self.getStart().co + (self.startMiter() * 0.5);
 
     def interiorEnd(self):
-        vec = self.interiorPointByEdges(self, self.next);
-        vec = vec * 0.5;
-        return self.getEnd().co + vec;
+        return self.getEnd().co + (self.endMiter() * 0.5);
     
     def exteriorStart(self):
-        vec = self.interiorPointByEdges(self.prev, self);
-        vec = vec * -0.5;
-        return self.getStart().co + vec;
+        return self.getStart().co + (self.startMiter() * -0.5);
     
     def exteriorEnd(self):
-        vec = self.interiorPointByEdges(self, self.next);
-        vec = vec * -0.5;
-        return self.getEnd().co + vec;
+        return self.getEnd().co + (self.endMiter() * -0.5);
 
 
     def interiorCenter(self):
@@ -186,16 +190,24 @@ class HalfEdge():
     def exteriorDistance(self):
         return distance(self.exteriorStart(), self.exteriorEnd());
 
-    def corners():
+    def corners(self):
         return [self.interiorStart(), self.interiorEnd(), self.exteriorEnd(), self.exteriorStart()];
 
     @property
     def isFront(self):
-        return self.__front;
+        return self.front;
 
     @property
     def front(self):
-        return self.__front;
+        return bool(self.__store.edgeFronts[self.__index]);
+
+    @property
+    def store(self):
+        return self.__store;
+
+    @property
+    def index(self):
+        return self.__index;
 
     @property
     def room(self):
@@ -203,20 +215,22 @@ class HalfEdge():
     
     @property
     def wall(self):
-        return self.__wall;
+        return self.__store.wall(self.__store.edgeWalls[self.__index]);
     
     @property
     def next(self):
-        return self.__next;
+        return self.__store.edge(self.__store.edgeNexts[self.__index]);
     
     @next.setter
     def next(self, edge):
-        self.__next = edge;
+        self.__store.edgeNexts[self.__index] = edge.index if edge else -1;
+        self.__store.edgeEndMiterValid[self.__index] = 0;
     
     @property
     def prev(self):
-        return self.__prev;
+        return self.__store.edge(self.__store.edgePrevs[self.__index]);
     
     @prev.setter
     def prev(self, edge):
-        self.__prev = edge;
\ No newline at end of file
+        self.__store.edgePrevs[self.__index] = edge.index if edge else -1;
+        self.__store.edgeStartMiterValid[self.__index] = 0;
\ No newline at end of file
@@ -0,0 +1,128 @@
+import math;
+import numpy as np;
+
+# Batch versions of HalfEdge.halfAngleVector and HalfEdge.interiorPointByEdges.
+# Every argument is an array with one row per edge pair (v1, v2), where v1 ends at
+# the corner shared with the start of v2. The scalar methods remain the reference,
+# these functions reproduce them (including their degenerate cases) for a whole floorplan
+
+def _normalized(vectors):
+    lengths = np.sqrt((vectors[:, 0] * vectors[:, 0]) + (vectors[:, 1] * vectors[:, 1]));
+    safe = np.where(lengths > 0.0, lengths, 1.0);
+    return np.where((lengths > 0.0)[:, None], vectors / safe[:, None], 0.0);
+
+def _cross(u, v):
+    return (u[:, 0] * v[:, 1]) - (u[:, 1] * v[:, 0]);
+
+def angles2pi(starts, ends):
+    tDot = (starts[:, 0] * ends[:, 0]) + (starts[:, 1] * ends[:, 1]);
+    tDet = (starts[:, 0] * ends[:, 1]) - (starts[:, 1] * ends[:, 0]);
+    theta = -np.arctan2(tDet, tDot);
+    return np.where(theta < 0, theta + (2.0 * math.pi), theta);
+
+def halfAngleVectors(v1Starts, v1Ends, v2Starts, v2Ends, thicknesses):
+    # CCW angle between edges
+    theta = angles2pi(v1Starts - v1Ends, v2Ends - v1Ends);
+    # cosine and sine of half angle
+    cs = np.cos(theta / 2.0);
+    sn = np.sin(theta / 2.0);
+    # rotate v2
+    v2d = v2Ends - v2Starts;
+    vx = (v2d[:, 0] * cs) - (v2d[:, 1] * sn);
+    vy = (v2d[:, 0] * sn) + (v2d[:, 1] * cs);
+    # normalize
+    mag = np.sqrt((vx * vx) + (vy * vy));
+    desiredMag = (thicknesses * 0.5) / sn;
+    scalar = desiredMag / mag;
+    return np.stack((vx * scalar, vy * scalar), axis=1);
+
+def interiorPointsByEdges(v1Starts, v1Ends, v1Thicknesses, v2Starts, v2Ends, v2Thicknesses, hasV1, hasV2):
+    count = len(hasV1);
+    result = np.zeros((count, 2));
+
+    # make the best of things if we dont have prev or next, the missing edge is
+    # extrapolated from the existing one and the thickness is that of the existing edge
+    missing = ~(hasV1 & hasV2);
+    if(np.any(missing)):
+        noV1 = missing & ~hasV1;
+        noV2 = missing & ~hasV2;
+        m1s, m1e = v1Starts[missing].copy(), v1Ends[missing].copy();
+        m2s, m2e = v2Starts[missing].copy(), v2Ends[missing].copy();
+        thicknesses = np.where(noV1, v2Thicknesses, v1Thicknesses)[missing];
+        n1, n2 = noV1[missing], noV2[missing];
+
+        m1s[n1] = m2s[n1] - (m2e[n1] - m2s[n1]);
+        m1e[n1] = m2s[n1];
+        m2s[n2] = m1e[n2];
+        m2e[n2] = m1e[n2] + (m1e[n2] - m1s[n2]);
+
+        result[missing] = halfAngleVectors(m1s, m1e, m2s, m2e, thicknesses) * 2.0;
+
+    full = ~missing;
+    if(not np.any(full)):
+        return result;
+
+    u = _normalized(v1Ends[full] - v1Starts[full]) * v2Thicknesses[full][:, None];
+    v = _normalized(v2Ends[full] - v2Starts[full]) * v1Thicknesses[full][:, None];
+
+    axisZ = np.sign(_cross(_normalized(u), _normalized(v)));
+    v = np.where((axisZ < 0)[:, None], -v, v);
+    u = np.where((axisZ < 0)[:, None], u, -u);
+
+    dot = np.einsum('ij,ij->i', _normalized(u), _normalized(v));
+    obtuse = dot < 0.0;
+    if(np.any(obtuse)):
+        offsetTheta = np.arccos(np.clip(dot[obtuse], -1.0, 1.0)) - (math.pi * 0.5);
+        uo, vo = u[obtuse], v[obtuse];
+        rotationZ = axisZ[obtuse];
+
+        # Nearly anti-parallel edges, nudge u to get a usable rotation axis
+        antiParallel = dot[obtuse] < (1e-6 - 1.0);
+        if(np.any(antiParallel)):
+            uo[antiParallel] += 1e-2;
+            rotationZ[antiParallel] = -np.sign(_cross(_normalized(uo[antiParallel]), _normalized(vo[antiParallel])));
+
+        # Rotation about (0, 0, rotationZ). A zero axis leaves v as it is
+        cs = np.where(rotationZ == 0, 1.0, np.cos(offsetTheta));
+        sn = np.where(rotationZ == 0, 0.0, np.sin(offsetTheta)) * rotationZ;
+        rotated = np.stack(((vo[:, 0] * cs) - (vo[:, 1] * sn), (vo[:, 0] * sn) + (vo[:, 1] * cs)), axis=1);
+        u[obtuse] = uo;
+        v[obtuse] = rotated;
+
+    result[full] = u + v;
+    return result;
+
+def edgeMiters(starts, ends, thicknesses, prevs, nexts, startDirections=None, endDirections=None):
+    # starts, ends: (N, 2) corner coordinates of every half-edge in traversal order
+    # thicknesses: (N,) wall thickness of every half-edge
+    # prevs, nexts: (N,) index of the previous/next half-edge or -1 when there is none
+    # startDirections, endDirections: (N, 2) directions of every half-edge leaving its
+    # start and arriving at its end, the chord when not given (see HalfEdge.startDirection)
+    # Returns the (startMiters, endMiters) of all half-edges as (N, 2) arrays
+    count = len(starts);
+    if(startDirections is None):
+        startDirections = ends - starts;
+    if(endDirections is None):
+        endDirections = ends - starts;
+    hasPrev, hasNext = prevs >= 0, nexts >= 0;
+    prevIndices = np.where(hasPrev, prevs, np.arange(count));
+
+    # The start miter of an edge is the miter of the pair (prev, edge). Only the
+    # directions at the corner matter, so both are straight edges through the corner
+    startMiters = interiorPointsByEdges(
+        starts - endDirections[prevIndices], starts, thicknesses[prevIndices],
+        starts, starts + startDirections, thicknesses,
+        hasPrev, np.ones(count, dtype=bool));
+
+    # which is also the end miter of prev. Only the edges without a next need the pair (edge, None)
+    endMiters = np.zeros((count, 2));
+    endMiters[hasNext] = startMiters[nexts[hasNext]];
+    if(not np.all(hasNext)):
+        lonely = ~hasNext;
+        lonelyCount = np.count_nonzero(lonely);
+        endMiters[lonely] = interiorPointsByEdges(
+            ends[lonely] - endDirections[lonely], ends[lonely], thicknesses[lonely],
+            ends[lonely], ends[lonely], thicknesses[lonely],
+            np.ones(lonelyCount, dtype=bool), np.zeros(lonelyCount, dtype=bool));
+
+    return startMiters, endMiters;
@@ -1,21 +1,78 @@
 import os;
 import json;
+import numpy as np;
 from Blueprint3DJSBPY.bp3dpy.model.floorplan import Floorplan;
+from Blueprint3DJSBPY.bp3dpy.model.roomitem import RoomItem, itemModel;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import NULL_PROFILER;
+from Blueprint3DJSBPY.bp3dpy.core.designcache import DesignCache, designHash, CACHE_DIR_ENVIRONMENT;
 
 class Model():
-    def __init__(self):
-        self.__floorplan = Floorplan();
+    def __init__(self, profiler=None, cachedir=None):
+        self.__profiler = profiler or NULL_PROFILER;
+        self.__floorplan = Floorplan(self.__profiler);
         self.__roomItems = [];
+        # Compiled designs are cached when a cache directory is given or set in the environment
+        cachedir = cachedir or os.environ.get(CACHE_DIR_ENVIRONMENT);
+        self.__cache = DesignCache(cachedir) if cachedir else None;
     
     def loadSerialized(self, jsonfilepath):
-        f = open(os.path.abspath(jsonfilepath));
-        data = json.load(f);        
-        self.newDesign(data.get('floorplan'), data.get('items'));
+        f = open(os.path.abspath(jsonfilepath), 'rb');
+        data = f.read();
         f.close();
+        self.__loadSerializedData(data);
+
+    def loadSerializedJSON(self, jsonstring):
+        self.__loadSerializedData(jsonstring);
+
+    def __loadSerializedData(self, data):
+        key = None;
+        if(self.__cache):
+            key = designHash(data);
+            with self.__profiler.span('cache'):
+                arrays = self.__cache.load(key);
+            if(arrays is not None):
+                # A cache hit skips the json and all the geometry
+                self.__profiler.count('cache hits');
+                items = json.loads(str(arrays.pop('items')));
+                with self.__profiler.span('floorplan'):
+                    self.__floorplan.loadCompiled(arrays);
+                self.__loadItems(items);
+                return;
+            self.__profiler.count('cache misses');
+
+        with self.__profiler.span('decode'):
+            design = json.loads(data);
+        items = design.get('items') or [];
+        self.newDesign(design.get('floorplanner') or design.get('floorplan'), items);
+
+        if(key):
+            with self.__profiler.span('cache'):
+                arrays = self.__floorplan.compile();
+                arrays['items'] = np.array(json.dumps(items));
+                self.__cache.save(key, arrays);
 
     def newDesign(self, floorplan, items):
+        with self.__profiler.span('floorplan'):
+            self.__floorplan.loadFloorplan(floorplan);
+        self.__loadItems(items);
+
+    def __loadItems(self, items):
+        # After the floorplan, the units of the design apply to the items as well
         self.__roomItems = [];
-        self.__floorplan.loadFloorplan(floorplan);
+        occurrences = {};
+        with self.__profiler.span('items'):
+            for metadata in items or []:
+                model = itemModel(metadata);
+                occurrences[model] = occurrences.get(model, -1) + 1;
+                item = RoomItem(metadata, occurrences[model]);
+                self.__roomItems.append(item);
+                cornerIds = item.wallCornerIds() if item.isInWall else None;
+                if(not cornerIds):
+                    continue;
+                wall = self.__floorplan.wallByCorners(*cornerIds) or self.__floorplan.wallByCorners(cornerIds[1], cornerIds[0]);
+                if(wall):
+                    wall.addOpening(item);
+        self.__profiler.count('items', len(self.__roomItems));
     
     def reset(self):
         self.__floorplan.reset();
@@ -26,6 +83,10 @@ class Model():
     def floorplan(self):
         return self.__floorplan;
     
+    @property
+    def profiler(self):
+        return self.__profiler;
+    
     @property
     def roomItems(self):
         return self.__roomItems;
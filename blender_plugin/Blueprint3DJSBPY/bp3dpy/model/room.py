@@ -1,5 +1,5 @@
 from Blueprint3DJSBPY.bp3dpy.model.half_edge import HalfEdge;
-from mathutils import Vector;
+from Blueprint3DJSBPY.bp3dpy.core.vectormath import Vector;
 
 class Room():
     def __init__(self, name, floorplan, corners):
@@ -12,17 +12,46 @@ class Room():
         self.__edgePointer = None;
 
         self.__floorRectangleSize = None;
+        self.__compiledInteriorCorners = None;
 
+        # The interior corners are computed on first access, this lets the floorplan
+        # compute the miters of all rooms in one batch before they are needed
         self.updateWalls();
-        self.updateInteriorCorners();
 
         for corner in self.__corners:
             corner.attachRoom(self);    
 
+    @classmethod
+    def fromStore(cls, name, floorplan, corners, walls, edgeIndices, interiorCorners3D, edges):
+        # A room from the compiled design cache (see Floorplan.loadCompiled). Its half edges
+        # are already linked in the store, they are created here in edgeIndices order and
+        # put in edges at their store index. The interior corners are not recomputed
+        room = cls.__new__(cls);
+        room.__name = name;
+        room.__floorplan = floorplan;
+        room.__corners = corners;
+        room.__walls = walls;
+        room.__edgePointer = None;
+        for index in edgeIndices:
+            edges[index] = HalfEdge.fromStore(room, floorplan.store, index);
+            room.__edgePointer = room.__edgePointer or edges[index];
+
+        room.__interiorCorners = [];
+        room.__interiorCorners3D = [];
+        room.__floorRectangleSize = None;
+        room.__compiledInteriorCorners = interiorCorners3D;
+
+        for wall in walls:
+            wall.addRoom(room);
+        for corner in corners:
+            corner.attachRoom(room);
+        return room;
+
     def updateWalls(self):
         prevEdge = None;
         firstEdge = None;
         self.__walls = [];
+        wallSet = set();
 
         for i, firstCorner in enumerate(self.__corners):
             secondCorner = self.__corners[(i+1) % len(self.__corners)];
@@ -39,11 +68,13 @@ class Room():
             else:
                 print('corners arent connected by a wall, uh oh');
 
-            if(wallTo and not wallTo in self.__walls):
+            if(wallTo and not wallTo in wallSet):
+                wallSet.add(wallTo);
                 self.__walls.append(wallTo);
                 wallTo.addRoom(self);
             
-            if(wallFrom and not wallFrom in self.__walls):
+            if(wallFrom and not wallFrom in wallSet):
+                wallSet.add(wallFrom);
                 self.__walls.append(wallFrom);
                 wallFrom.addRoom(self);
 
@@ -63,6 +94,17 @@ class Room():
     def updateInteriorCorners(self):
         minB, maxB = Vector((1e10, 1e10)), Vector((-1e10, -1e10));
         self.__interiorCorners = [];
+        self.__interiorCorners3D = [];
+        if(self.__compiledInteriorCorners is not None):
+            # Restored from the design cache on first access, instead of walking the miters
+            for x, y, z in self.__compiledInteriorCorners:
+                minB.x, minB.y = min(x, minB.x), min(y, minB.y);
+                maxB.x, maxB.y = max(maxB.x, x), max(maxB.y, y);
+                self.__interiorCorners.append(Vector((x, y)));
+                self.__interiorCorners3D.append(Vector((x, y, z)));
+            self.__compiledInteriorCorners = None;
+            self.__floorRectangleSize = maxB - minB;
+            return;
         edge = self.__edgePointer;
         iterateWhile = True;
         while(iterateWhile):
@@ -93,8 +135,32 @@ class Room():
         tex = self.__floorplan.getFloorTexture(uuid);
         return tex;
 
+    def edges(self):
+        edges = [];
+        edge = self.__edgePointer;
+        while(edge):
+            edges.append(edge);
+            edge = edge.next;
+            if(edge == self.__edgePointer):
+                break;
+        return edges;
+
+    @property
+    def name(self):
+        return self.__name;
+
+    @property
+    def corners(self):
+        return self.__corners;
+
+    @property
+    def walls(self):
+        return self.__walls;
+
     @property
     def floorRectangleSize(self):
+        if(self.__floorRectangleSize is None):
+            self.updateInteriorCorners();
         return self.__floorRectangleSize;
 
     @property
@@ -103,10 +169,14 @@ class Room():
 
     @property
     def interiorCorners(self):
+        if(self.__floorRectangleSize is None):
+            self.updateInteriorCorners();
         return self.__interiorCorners;
     
     @property
     def interiorCorners3D(self):
+        if(self.__floorRectangleSize is None):
+            self.updateInteriorCorners();
         return self.__interiorCorners3D;
 
     
\ No newline at end of file
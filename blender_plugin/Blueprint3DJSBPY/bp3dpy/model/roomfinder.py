@@ -0,0 +1,87 @@
+import numpy as np;
+
+# Rooms from the wall graph. Every wall gives two directed edges, the edges leaving a
+# corner are sorted by angle and the face left of an edge u -> v continues with the
+# edge leaving v right after v -> u in clockwise order. Walking these successors
+# visits every face of the planar graph once, in O(E log E) for the sort and O(E)
+# for the walk. Bounded faces come out counter clockwise, like the rooms saved by
+# blueprint-js, the outer face of every connected part comes out clockwise.
+# Walls with the same face on both sides (dangling or bridging walls) belong to no
+# room, they are dropped and the faces are walked again
+
+DEFAULT_ROOM_NAME = 'A New Room';
+
+def roomUuid(cornerIds):
+    # Same as Room.getUuid, independent of the start corner and direction of a cycle
+    return ','.join(sorted(cornerIds));
+
+def _faces(points, starts, ends):
+    # Successor permutation of the directed edges and the face of every edge
+    count = len(starts);
+    twins = np.concatenate((np.arange(count, 2 * count), np.arange(count)));
+    origins = np.concatenate((starts, ends));
+    targets = np.concatenate((ends, starts));
+    delta = points[targets] - points[origins];
+    angles = np.arctan2(delta[:, 1], delta[:, 0]);
+
+    # Edges grouped by origin corner, counter clockwise within a group
+    order = np.lexsort((angles, origins));
+    position = np.empty(len(order), dtype=np.int64);
+    position[order] = np.arange(len(order));
+    groupStarts = np.searchsorted(origins[order], origins[order], side='left');
+    groupSizes = np.bincount(origins, minlength=len(points))[origins[order]];
+    firstOfGroup = np.empty(len(order), dtype=np.int64);
+    firstOfGroup[order] = groupStarts;
+    sizeOfGroup = np.empty(len(order), dtype=np.int64);
+    sizeOfGroup[order] = groupSizes;
+
+    # The edge before the twin in the counter clockwise order of the twin's origin
+    rank = position[twins] - firstOfGroup[twins];
+    successors = order[firstOfGroup[twins] + ((rank - 1) % sizeOfGroup[twins])];
+
+    faces = np.full(len(order), -1, dtype=np.int64);
+    cycles = [];
+    for edge in range(len(order)):
+        if(faces[edge] != -1):
+            continue;
+        cycle = [];
+        while(faces[edge] == -1):
+            faces[edge] = len(cycles);
+            cycle.append(edge);
+            edge = successors[edge];
+        cycles.append(cycle);
+    return origins, twins, faces, cycles;
+
+def findRooms(corners, walls):
+    # Lists of corners, one per room, counter clockwise
+    index = {corner.id: i for i, corner in enumerate(corners)};
+    pairs = set();
+    for wall in walls:
+        start, end = index.get(wall.getStart().id), index.get(wall.getEnd().id);
+        if(start is None or end is None or start == end):
+            continue;
+        # Duplicate walls between the same corners are one edge of the graph
+        pairs.add((min(start, end), max(start, end)));
+    if(not pairs):
+        return [];
+
+    points = np.array([(corner.x, corner.y) for corner in corners], dtype=np.float64).reshape(-1, 2);
+    pairs = np.array(sorted(pairs), dtype=np.int64);
+    origins, twins, faces, cycles = _faces(points, pairs[:, 0], pairs[:, 1]);
+
+    count = len(pairs);
+    inRooms = faces[:count] != faces[count:];
+    if(not inRooms.all()):
+        pairs = pairs[inRooms];
+        if(not len(pairs)):
+            return [];
+        origins, twins, faces, cycles = _faces(points, pairs[:, 0], pairs[:, 1]);
+
+    rooms = [];
+    for cycle in cycles:
+        cornerIndices = origins[cycle];
+        polygon = points[cornerIndices];
+        area = np.sum((polygon[:, 0] * np.roll(polygon[:, 1], -1)) - (np.roll(polygon[:, 0], -1) * polygon[:, 1]));
+        if(len(cycle) >= 3 and area > 0):
+            rooms.append([corners[i] for i in cornerIndices.tolist()]);
+    return rooms;
@@ -0,0 +1,129 @@
+import math;
+from Blueprint3DJSBPY.bp3dpy.core import Dimensioning;
+from Blueprint3DJSBPY.bp3dpy.core.utils import uid;
+from Blueprint3DJSBPY.bp3dpy.core.vectormath import Vector;
+from Blueprint3DJSBPY.bp3dpy.core.constants import IN_WALL_ITEM_TYPES;
+
+# An item of the design (furniture, windows, doors). The web app saves the positions
+# and sizes in cm, in three.js axes where y is up and z is the y of the floorplan
+
+# three.js axes to floorplan axes, and glTF axes to the axes the Blender glTF importer
+# uses for the imported models (x, -z, y)
+THREE_TO_FLOORPLAN = ((1.0, 0.0, 0.0), (0.0, 0.0, 1.0), (0.0, 1.0, 0.0));
+IMPORTED_TO_GLTF = ((1.0, 0.0, 0.0), (0.0, 0.0, 1.0), (0.0, -1.0, 0.0));
+
+def _multiply(a, b):
+    return tuple(tuple(sum(a[i][k] * b[k][j] for k in range(3)) for j in range(3)) for i in range(3));
+
+def _eulerXYZ(x, y, z):
+    # three.js Euler angles in the default XYZ order, Rx Ry Rz
+    cx, sx, cy, sy, cz, sz = math.cos(x), math.sin(x), math.cos(y), math.sin(y), math.cos(z), math.sin(z);
+    rx = ((1.0, 0.0, 0.0), (0.0, cx, -sx), (0.0, sx, cx));
+    ry = ((cy, 0.0, sy), (0.0, 1.0, 0.0), (-sy, 0.0, cy));
+    rz = ((cz, -sz, 0.0), (sz, cz, 0.0), (0.0, 0.0, 1.0));
+    return _multiply(_multiply(rx, ry), rz);
+
+def itemModel(metadata):
+    # What an item shows, items of the same model are told apart by their order
+    return metadata.get('modelURL') or metadata.get('itemName') or 'Item';
+
+class RoomItem():
+    def __init__(self, metadata, occurrence=0):
+        self.__metadata = metadata;
+        self.__id = metadata.get('id') or uid();
+        # Saved ids are often missing or shared (a window and a door of the same
+        # design), the model and the how many-th item of that model identify an item
+        # across imports
+        self.__key = '%s#%d'%(itemModel(metadata), occurrence);
+        self.__itemType = int(metadata.get('itemType') or 0);
+        x, y, z = [Dimensioning.cmToMeasureRaw(v) for v in (metadata.get('position') or (0.0, 0.0, 0.0))];
+        self.__position = Vector((x, z, y));
+        self.__size = Vector([Dimensioning.cmToMeasureRaw(v) for v in (metadata.get('size') or (0.0, 0.0, 0.0))]);
+        self.__rotation = Vector(metadata.get('rotation') or (0.0, 0.0, 0.0));
+        self.__scale = Vector(metadata.get('scale') or (1.0, 1.0, 1.0));
+        self.__wall = None;
+
+    def transform(self):
+        # 4x4 row major matrix placing a model imported by the Blender glTF importer
+        # (still in cm) like the web app places it, in floorplan axes and design units
+        unitScale = Dimensioning.cmToMeasureRaw(100.0) / 100.0;
+        sx, sy, sz = [s * unitScale for s in self.__scale];
+        scale = ((sx, 0.0, 0.0), (0.0, sy, 0.0), (0.0, 0.0, sz));
+        linear = _multiply(_multiply(_multiply(THREE_TO_FLOORPLAN, _eulerXYZ(*self.__rotation)), scale), IMPORTED_TO_GLTF);
+        return [list(linear[i]) + [self.__position[i]] for i in range(3)] + [[0.0, 0.0, 0.0, 1.0]];
+
+    def wallCornerIds(self):
+        # In wall items refer to their wall by the ids of its corners
+        wallId = self.__metadata.get('wall');
+        if(not wallId):
+            return None;
+        cornerIds = wallId.split(',');
+        if(len(cornerIds) != 2):
+            return None;
+        return cornerIds[0], cornerIds[1];
+
+    @property
+    def id(self):
+        return self.__id;
+
+    @property
+    def key(self):
+        return self.__key;
+
+    @property
+    def name(self):
+        return self.__metadata.get('itemName') or 'Item';
+
+    @property
+    def itemType(self):
+        return self.__itemType;
+
+    @property
+    def isInWall(self):
+        return self.__itemType in IN_WALL_ITEM_TYPES;
+
+    @property
+    def metadata(self):
+        return self.__metadata;
+
+    @property
+    def modelURL(self):
+        return self.__metadata.get('modelURL');
+
+    @property
+    def position(self):
+        # x, y on the floorplan and the elevation of the center of the item
+        return self.__position;
+
+    @property
+    def size(self):
+        # width, height and depth
+        return self.__size;
+
+    @property
+    def rotation(self):
+        return self.__rotation;
+
+    @property
+    def scale(self):
+        return self.__scale;
+
+    @property
+    def width(self):
+        return self.__size.x * self.__scale.x;
+
+    @property
+    def height(self):
+        return self.__size.y * self.__scale.y;
+
+    @property
+    def wallSide(self):
+        return self.__metadata.get('wallSide') or 'front';
+
+    @property
+    def wall(self):
+        return self.__wall;
+
+    @wall.setter
+    def wall(self, wall):
+        self.__wall = wall;
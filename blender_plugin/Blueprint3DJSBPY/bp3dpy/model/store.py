@@ -0,0 +1,261 @@
+from array import array;
+import numpy as np;
+
+# Struct-of-arrays storage for the floorplan graph. Corner, Wall and HalfEdge are thin
+# __slots__ views that only keep their index into these columns. Links between entities
+# are indices (-1 for none), so whole floorplans can be handed to NumPy in one go
+
+NO_INDEX = -1;
+
+def _toNumpy(column, dtype):
+    if(not len(column)):
+        return np.zeros(0, dtype=dtype);
+    return np.frombuffer(column, dtype=dtype).copy();
+
+def _fromNumpy(values, typecode, dtype):
+    return array(typecode, np.ascontiguousarray(values, dtype=dtype).tobytes());
+
+class FloorplanStore():
+    def __init__(self):
+        self.reset();
+
+    def reset(self):
+        self.__corners = [];
+        self.__cornerXs = array('d');
+        self.__cornerYs = array('d');
+        self.__cornerElevations = array('d');
+
+        self.__walls = [];
+        self.__wallStarts = array('q');
+        self.__wallEnds = array('q');
+        self.__wallThicknesses = array('d');
+        self.__wallFrontEdges = array('q');
+        self.__wallBackEdges = array('q');
+
+        self.__edges = [];
+        self.__edgeWalls = array('q');
+        self.__edgeFronts = array('b');
+        self.__edgePrevs = array('q');
+        self.__edgeNexts = array('q');
+        self.__edgeStartMiterXs = array('d');
+        self.__edgeStartMiterYs = array('d');
+        self.__edgeEndMiterXs = array('d');
+        self.__edgeEndMiterYs = array('d');
+        self.__edgeStartMiterValid = array('b');
+        self.__edgeEndMiterValid = array('b');
+
+    def addCorner(self, corner, x, y, elevation):
+        self.__corners.append(corner);
+        self.__cornerXs.append(x);
+        self.__cornerYs.append(y);
+        self.__cornerElevations.append(elevation or 0.0);
+        return len(self.__corners) - 1;
+
+    def addWall(self, wall, startIndex, endIndex, thickness):
+        self.__walls.append(wall);
+        self.__wallStarts.append(startIndex);
+        self.__wallEnds.append(endIndex);
+        self.__wallThicknesses.append(thickness);
+        self.__wallFrontEdges.append(NO_INDEX);
+        self.__wallBackEdges.append(NO_INDEX);
+        return len(self.__walls) - 1;
+
+    def addEdge(self, edge, wallIndex, front):
+        self.__edges.append(edge);
+        self.__edgeWalls.append(wallIndex);
+        self.__edgeFronts.append(1 if front else 0);
+        self.__edgePrevs.append(NO_INDEX);
+        self.__edgeNexts.append(NO_INDEX);
+        self.__edgeStartMiterXs.append(0.0);
+        self.__edgeStartMiterYs.append(0.0);
+        self.__edgeEndMiterXs.append(0.0);
+        self.__edgeEndMiterYs.append(0.0);
+        self.__edgeStartMiterValid.append(0);
+        self.__edgeEndMiterValid.append(0);
+        return len(self.__edges) - 1;
+
+    def corner(self, index):
+        return self.__corners[index] if index != NO_INDEX else None;
+
+    def wall(self, index):
+        return self.__walls[index] if index != NO_INDEX else None;
+
+    def edge(self, index):
+        return self.__edges[index] if index != NO_INDEX else None;
+
+    def setStartMiter(self, index, x, y):
+        # The start miter of an edge is the end miter of its previous edge
+        self.__edgeStartMiterXs[index], self.__edgeStartMiterYs[index] = x, y;
+        self.__edgeStartMiterValid[index] = 1;
+        prev = self.__edgePrevs[index];
+        if(prev != NO_INDEX):
+            self.__edgeEndMiterXs[prev], self.__edgeEndMiterYs[prev] = x, y;
+            self.__edgeEndMiterValid[prev] = 1;
+
+    def setEndMiter(self, index, x, y):
+        self.__edgeEndMiterXs[index], self.__edgeEndMiterYs[index] = x, y;
+        self.__edgeEndMiterValid[index] = 1;
+        nxt = self.__edgeNexts[index];
+        if(nxt != NO_INDEX):
+            self.__edgeStartMiterXs[nxt], self.__edgeStartMiterYs[nxt] = x, y;
+            self.__edgeStartMiterValid[nxt] = 1;
+
+    def clearEdgeMiters(self, index):
+        self.__edgeStartMiterValid[index] = 0;
+        self.__edgeEndMiterValid[index] = 0;
+        prev, nxt = self.__edgePrevs[index], self.__edgeNexts[index];
+        if(prev != NO_INDEX):
+            self.__edgeEndMiterValid[prev] = 0;
+        if(nxt != NO_INDEX):
+            self.__edgeStartMiterValid[nxt] = 0;
+
+    def cornerArrays(self):
+        return np.stack((_toNumpy(self.__cornerXs, np.float64), _toNumpy(self.__cornerYs, np.float64)), axis=1), _toNumpy(self.__cornerElevations, np.float64);
+
+    def wallArrays(self):
+        return _toNumpy(self.__wallStarts, np.int64), _toNumpy(self.__wallEnds, np.int64), _toNumpy(self.__wallThicknesses, np.float64);
+
+    def edgeArrays(self):
+        # Start/end coordinates, thicknesses and prev/next indices of all half-edges
+        coordinates, elevations = self.cornerArrays();
+        wallStarts, wallEnds, wallThicknesses = self.wallArrays();
+        edgeWalls = _toNumpy(self.__edgeWalls, np.int64);
+        fronts = _toNumpy(self.__edgeFronts, np.int8).astype(bool);
+        startCorners = np.where(fronts, wallStarts[edgeWalls], wallEnds[edgeWalls]);
+        endCorners = np.where(fronts, wallEnds[edgeWalls], wallStarts[edgeWalls]);
+        return coordinates[startCorners], coordinates[endCorners], wallThicknesses[edgeWalls], _toNumpy(self.__edgePrevs, np.int64), _toNumpy(self.__edgeNexts, np.int64);
+
+    def setEdgeMiters(self, startMiters, endMiters):
+        count = len(self.__edges);
+        self.__edgeStartMiterXs = _fromNumpy(startMiters[:, 0], 'd', np.float64);
+        self.__edgeStartMiterYs = _fromNumpy(startMiters[:, 1], 'd', np.float64);
+        self.__edgeEndMiterXs = _fromNumpy(endMiters[:, 0], 'd', np.float64);
+        self.__edgeEndMiterYs = _fromNumpy(endMiters[:, 1], 'd', np.float64);
+        self.__edgeStartMiterValid = array('b', [1]) * count;
+        self.__edgeEndMiterValid = array('b', [1]) * count;
+
+    def compile(self):
+        # All the columns as NumPy arrays, see loadCompiled
+        return {
+            'cornerXs': _toNumpy(self.__cornerXs, np.float64), 'cornerYs': _toNumpy(self.__cornerYs, np.float64),
+            'cornerElevations': _toNumpy(self.__cornerElevations, np.float64),
+            'wallStarts': _toNumpy(self.__wallStarts, np.int64), 'wallEnds': _toNumpy(self.__wallEnds, np.int64),
+            'wallThicknesses': _toNumpy(self.__wallThicknesses, np.float64),
+            'wallFrontEdges': _toNumpy(self.__wallFrontEdges, np.int64), 'wallBackEdges': _toNumpy(self.__wallBackEdges, np.int64),
+            'edgeWalls': _toNumpy(self.__edgeWalls, np.int64), 'edgeFronts': _toNumpy(self.__edgeFronts, np.int8),
+            'edgePrevs': _toNumpy(self.__edgePrevs, np.int64), 'edgeNexts': _toNumpy(self.__edgeNexts, np.int64),
+            'edgeStartMiterXs': _toNumpy(self.__edgeStartMiterXs, np.float64), 'edgeStartMiterYs': _toNumpy(self.__edgeStartMiterYs, np.float64),
+            'edgeEndMiterXs': _toNumpy(self.__edgeEndMiterXs, np.float64), 'edgeEndMiterYs': _toNumpy(self.__edgeEndMiterYs, np.float64),
+            'edgeStartMiterValid': _toNumpy(self.__edgeStartMiterValid, np.int8), 'edgeEndMiterValid': _toNumpy(self.__edgeEndMiterValid, np.int8),
+        };
+
+    def loadCompiled(self, arrays):
+        # Columns from compile(), the entities are attached afterwards with setEntities
+        self.reset();
+        self.__cornerXs = _fromNumpy(arrays['cornerXs'], 'd', np.float64);
+        self.__cornerYs = _fromNumpy(arrays['cornerYs'], 'd', np.float64);
+        self.__cornerElevations = _fromNumpy(arrays['cornerElevations'], 'd', np.float64);
+        self.__wallStarts = _fromNumpy(arrays['wallStarts'], 'q', np.int64);
+        self.__wallEnds = _fromNumpy(arrays['wallEnds'], 'q', np.int64);
+        self.__wallThicknesses = _fromNumpy(arrays['wallThicknesses'], 'd', np.float64);
+        self.__wallFrontEdges = _fromNumpy(arrays['wallFrontEdges'], 'q', np.int64);
+        self.__wallBackEdges = _fromNumpy(arrays['wallBackEdges'], 'q', np.int64);
+        self.__edgeWalls = _fromNumpy(arrays['edgeWalls'], 'q', np.int64);
+        self.__edgeFronts = _fromNumpy(arrays['edgeFronts'], 'b', np.int8);
+        self.__edgePrevs = _fromNumpy(arrays['edgePrevs'], 'q', np.int64);
+        self.__edgeNexts = _fromNumpy(arrays['edgeNexts'], 'q', np.int64);
+        self.__edgeStartMiterXs = _fromNumpy(arrays['edgeStartMiterXs'], 'd', np.float64);
+        self.__edgeStartMiterYs = _fromNumpy(arrays['edgeStartMiterYs'], 'd', np.float64);
+        self.__edgeEndMiterXs = _fromNumpy(arrays['edgeEndMiterXs'], 'd', np.float64);
+        self.__edgeEndMiterYs = _fromNumpy(arrays['edgeEndMiterYs'], 'd', np.float64);
+        self.__edgeStartMiterValid = _fromNumpy(arrays['edgeStartMiterValid'], 'b', np.int8);
+        self.__edgeEndMiterValid = _fromNumpy(arrays['edgeEndMiterValid'], 'b', np.int8);
+
+    def setEntities(self, corners, walls, edges):
+        self.__corners = corners;
+        self.__walls = walls;
+        self.__edges = edges;
+
+    @property
+    def corners(self):
+        return self.__corners;
+
+    @property
+    def walls(self):
+        return self.__walls;
+
+    @property
+    def edges(self):
+        return self.__edges;
+
+    @property
+    def cornerXs(self):
+        return self.__cornerXs;
+
+    @property
+    def cornerYs(self):
+        return self.__cornerYs;
+
+    @property
+    def cornerElevations(self):
+        return self.__cornerElevations;
+
+    @property
+    def wallStarts(self):
+        return self.__wallStarts;
+
+    @property
+    def wallEnds(self):
+        return self.__wallEnds;
+
+    @property
+    def wallThicknesses(self):
+        return self.__wallThicknesses;
+
+    @property
+    def wallFrontEdges(self):
+        return self.__wallFrontEdges;
+
+    @property
+    def wallBackEdges(self):
+        return self.__wallBackEdges;
+
+    @property
+    def edgeWalls(self):
+        return self.__edgeWalls;
+
+    @property
+    def edgeFronts(self):
+        return self.__edgeFronts;
+
+    @property
+    def edgePrevs(self):
+        return self.__edgePrevs;
+
+    @property
+    def edgeNexts(self):
+        return self.__edgeNexts;
+
+    @property
+    def edgeStartMiterXs(self):
+        return self.__edgeStartMiterXs;
+
+    @property
+    def edgeStartMiterYs(self):
+        return self.__edgeStartMiterYs;
+
+    @property
+    def edgeEndMiterXs(self):
+        return self.__edgeEndMiterXs;
+
+    @property
+    def edgeEndMiterYs(self):
+        return self.__edgeEndMiterYs;
+
+    @property
+    def edgeStartMiterValid(self):
+        return self.__edgeStartMiterValid;
+
+    @property
+    def edgeEndMiterValid(self):
+        return self.__edgeEndMiterValid;
@@ -1,29 +1,90 @@
 from Blueprint3DJSBPY.bp3dpy.core.utils import uid;
+from Blueprint3DJSBPY.bp3dpy.core.constants import WallTypes;
+from Blueprint3DJSBPY.bp3dpy.core.vectormath import Vector;
 
 class Wall():
+    __slots__ = ('__name', '__id', '__store', '__index', '__attachedRooms', '__frontTexture', '__backTexture', '__wallType', '__a', '__b', '__curveParameters', '__openings');
+
     def __init__(self, thickness, startCorner, endCorner, idd=None):
 
         self.__name = 'Wall';
-        self.__thickness = thickness;
-        self.__start = startCorner;
-        self.__end = endCorner;
+        self.__store = startCorner.store;
+        self.__index = self.__store.addWall(self, startCorner.index, endCorner.index, thickness);
 
         self.__id = idd or uid();
 
-        self.__start.attachStart(self);
-        self.__end.attachEnd(self);
-
-        self.__frontEdge = None;
-        self.__backEdge = None;
+        startCorner.attachStart(self);
+        endCorner.attachEnd(self);
 
         self.__attachedRooms = [];
 
         self.__frontTexture = None;
         self.__backTexture = None;
+        self.__openings = [];
+        self.__initCurve();
+
+    def __initCurve(self):
+        # The bezier control points of curved walls, the curve goes start, a, b, end
+        self.__wallType = WallTypes.STRAIGHT;
+        self.__a = None;
+        self.__b = None;
+        self.__curveParameters = None;
+
+    @classmethod
+    def fromStore(cls, store, index, startCorner, endCorner, idd=None):
+        # A wall whose columns are already in the store, see Floorplan.loadCompiled
+        wall = cls.__new__(cls);
+        wall.__name = 'Wall';
+        wall.__store = store;
+        wall.__index = index;
+        wall.__id = idd or uid();
+        startCorner.attachStart(wall);
+        endCorner.attachEnd(wall);
+        wall.__attachedRooms = [];
+        wall.__frontTexture = None;
+        wall.__backTexture = None;
+        wall.__openings = [];
+        wall.__initCurve();
+        return wall;
     
     def addRoom(self, room):
         self.__attachedRooms.append(room);
 
+    def clearMiterCache(self):
+        if(self.frontEdge):
+            self.frontEdge.clearMiterCache();
+        if(self.backEdge):
+            self.backEdge.clearMiterCache();
+
+    def setCurve(self, a, b):
+        self.__wallType = WallTypes.CURVED;
+        self.__a = Vector((a[0], a[1]));
+        self.__b = Vector((b[0], b[1]));
+        self.__curveParameters = None;
+
+    def addOpening(self, item):
+        # Windows and doors in this wall, see lineOpenings and _openingSides in bp3dpy.geometry.surfaces
+        self.__openings.append(item);
+        item.wall = self;
+
+    def controlPoints(self):
+        return [self.start.co, self.__a, self.__b, self.end.co];
+
+    def endTangents(self):
+        # The directions of the wall leaving its start and arriving at its end, the miters
+        # are computed from these. The bezier tangents at t=0 and t=1 for curved walls
+        start, end = self.start.co, self.end.co;
+        chord = end - start;
+        if(not self.isCurved):
+            return chord, chord;
+        startTangent, endTangent = self.__a - start, end - self.__b;
+        # A control point on its corner has no tangent there, the next one gives it
+        if(startTangent.length < 1e-9):
+            startTangent = self.__b - start;
+        if(endTangent.length < 1e-9):
+            endTangent = end - self.__a;
+        return (startTangent if startTangent.length >= 1e-9 else chord), (endTangent if endTangent.length >= 1e-9 else chord);
+
     def getStart(self):
         return self.start;
     
@@ -41,37 +102,46 @@ class Wall():
     def id(self):
         return self.__id;
 
+    @property
+    def store(self):
+        return self.__store;
+
+    @property
+    def index(self):
+        return self.__index;
+
     @property
     def thickness(self):
-        return self.__thickness;
+        return self.__store.wallThicknesses[self.__index];
     
     @thickness.setter
     def thickness(self, value):
-        self.__thickness = value;
+        self.__store.wallThicknesses[self.__index] = value;
+        self.clearMiterCache();
 
     @property
     def start(self):
-        return self.__start;
+        return self.__store.corner(self.__store.wallStarts[self.__index]);
     
     @property
     def end(self):
-        return self.__end;
+        return self.__store.corner(self.__store.wallEnds[self.__index]);
     
     @property
     def frontEdge(self):
-        return self.__frontEdge;
+        return self.__store.edge(self.__store.wallFrontEdges[self.__index]);
     
     @frontEdge.setter
     def frontEdge(self, edge):
-        self.__frontEdge = edge;
+        self.__store.wallFrontEdges[self.__index] = edge.index if edge else -1;
     
     @property
     def backEdge(self):
-        return self.__backEdge;
+        return self.__store.edge(self.__store.wallBackEdges[self.__index]);
 
     @backEdge.setter
     def backEdge(self, edge):
-        self.__backEdge = edge;
+        self.__store.wallBackEdges[self.__index] = edge.index if edge else -1;
 
     @property
     def frontTexture(self):
@@ -89,6 +159,35 @@ class Wall():
     def backTexture(self, texture):
         self.__backTexture = texture;
 
+    @property
+    def wallType(self):
+        return self.__wallType;
+
+    @property
+    def isCurved(self):
+        return self.__wallType == WallTypes.CURVED;
+
+    @property
+    def a(self):
+        return self.__a;
+
+    @property
+    def b(self):
+        return self.__b;
+
+    @property
+    def openings(self):
+        return self.__openings;
+
+    @property
+    def curveParameters(self):
+        # Tessellation of the curve, see bp3dpy.geometry.curves.tessellateWalls
+        return self.__curveParameters;
+
+    @curveParameters.setter
+    def curveParameters(self, parameters):
+        self.__curveParameters = parameters;
+
     @property
     def startElevation(self):
         if (self.start):
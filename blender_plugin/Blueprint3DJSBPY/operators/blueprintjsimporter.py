@@ -1,53 +1,187 @@
 import bpy;
 import os;
-import zipfile;
+import threading;
 
-from Blueprint3DJSBPY.bp3dpy.core.utils import newCollection;
+from Blueprint3DJSBPY.bp3dpy.blender.blenderutils import getCollection;
 from Blueprint3DJSBPY.bp3dpy.model.model import Model;
+from Blueprint3DJSBPY.bp3dpy.core.designarchive import DesignArchive;
+from Blueprint3DJSBPY.bp3dpy.core.instrumentation import Profiler;
 from Blueprint3DJSBPY.bp3dpy.blender.blenderscene import BlenderSceneViewer;
 
+# Seconds of Blender object creation per timer tick, the UI stays responsive in between
+BUILD_TIME_SLICE = 0.05;
+TIMER_INTERVAL = 0.02;
+# Compiled designs (see bp3dpy.core.designcache), next to the extracted assets
+DESIGN_CACHE_DIR = '.bp3djs-cache';
+
 class BlueprintJSImporterOperator(bpy.types.Operator):
     bl_idname = "bp3djs.blueprintjsimporter"
     bl_label = "BlueprintJSImporter"
     bl_options = {'REGISTER', 'UNDO'};#, 'REDO'
 
-    def __processZipFile(self, context):       
-
-        model = Model();
-        
+    def __paths(self, context):
         blend_file_path = bpy.path.abspath(bpy.data.filepath);
         blend_file_dir = os.path.dirname(blend_file_path);
         zip_file_path = bpy.path.abspath(context.scene.bp3djs_project_file);
         zip_file_purename = os.path.basename(zip_file_path)[:-4];
 
         zip_extract_path = os.path.abspath(os.path.join(blend_file_dir, zip_file_purename));
+        return zip_file_path, zip_extract_path;
 
+    def __loadDesign(self, zip_file_path, zip_extract_path, profiler, cancelled=None):
+        # Everything up to the Blender object creation, no bpy calls so it can run on a worker thread
         if(not os.path.exists(zip_file_path)):
             return None;
-        zip_file = zipfile.ZipFile(zip_file_path);
-        zip_file_contents = zip_file.namelist();
-        
-        if(not 'design.blueprint3d' in zip_file_contents):
-            return None;
+        with profiler.span('load'):
+            archive = DesignArchive(zip_file_path, profiler);
+            
+            if(not archive.isValid()):
+                archive.close();
+                return None;
 
-        zip_file.extractall(zip_extract_path);
+            # Only the textures and models used by the design, unchanged files are kept
+            model = Model(profiler, os.path.join(zip_extract_path, DESIGN_CACHE_DIR));
+            model.loadSerializedJSON(archive.readDesignJSON());
+            if(not (cancelled and cancelled.is_set())):
+                archive.extractReferenced(zip_extract_path);
+            archive.close();
+        return model;
 
-        design_json_file = os.path.abspath(os.path.join(zip_extract_path, 'design.blueprint3d'));        
-        model.loadSerialized(design_json_file);
+    def __reportProfile(self, context, profiler):
+        # Shown in the panel, printed to the console and written as json if a profile file is set
+        report = profiler.report();
+        context.window_manager.bp3djs_import_report = '\n'.join(report);
+        print('BP3DJS IMPORT PROFILE :::\n%s'%('\n'.join(report)));
+        if(context.scene.bp3djs_profile_file):
+            profiler.dump(bpy.path.abspath(context.scene.bp3djs_profile_file));
 
+    def __getCollection(self, scene):
         # collection = bpy.data.collections.get('blueprint-js');
         # if(collection):
         #     # context.scene.collection.children.unlink(collection);
         #     bpy.data.collections.remove(collection, do_unlink=True, do_id_user=True, do_ui_user=True);
         # collection = bpy.data.collections.new('blueprint-js');
 
-        collection = newCollection('blueprint-js');
-        context.scene.collection.children.link(collection);
+        collection = getCollection('blueprint-js', scene.collection);
         # collection.name = 'blueprint-js';
+        return collection;
+
+    def __processZipFile(self, context):
+        zip_file_path, zip_extract_path = self.__paths(context);
+        profiler = Profiler();
+        model = self.__loadDesign(zip_file_path, zip_extract_path, profiler);
+        if(not model):
+            return None;
+
+        blenderscene = BlenderSceneViewer(context, model, context.scene, None, zip_extract_path, context.scene.bp3djs_mesh_mode, False, profiler, context.scene.bp3djs_curve_quality);
+        blenderscene.plan();
+        blenderscene.prepare(self.__getCollection(context.scene));
+        blenderscene.buildNext();
+        blenderscene.finish();
+        self.__reportProfile(context, profiler);
+        return blenderscene;
+
+    def __worker(self, meshMode, curveQuality, zip_file_path, zip_extract_path):
+        # Only plain values, the context of invoke is not valid on another thread
+        try:
+            model = self.__loadDesign(zip_file_path, zip_extract_path, self._profiler, self._cancelled);
+            if(model and not self._cancelled.is_set()):
+                # The scene and collections are looked up on the main thread, in prepare
+                self._viewer = BlenderSceneViewer(None, model, None, None, zip_extract_path, meshMode, False, self._profiler, curveQuality);
+                self._viewer.plan();
+            self._loaded = model is not None;
+        except Exception as e:
+            self._error = e;
+        finally:
+            self._done.set();
+
+    def __setProgress(self, context, progress, status):
+        wm = context.window_manager;
+        wm.bp3djs_import_progress = progress * 100.0;
+        wm.bp3djs_import_status = status;
+        wm.progress_update(int(progress * 100.0));
+        for area in context.screen.areas:
+            if(area.type == 'VIEW_3D'):
+                area.tag_redraw();
+
+    def __finishModal(self, context):
+        wm = context.window_manager;
+        wm.event_timer_remove(self._timer);
+        wm.progress_end();
+        wm.bp3djs_import_running = False;
+        wm.bp3djs_import_status = '';
+
+    def invoke(self, context, event):
+        if(not bpy.data.is_saved):
+            self.report({'WARNING'}, 'The .blend file needs to be saved first before importing the bluprint-js project');
+            return {'CANCELLED'};
+
+        zip_file_path, zip_extract_path = self.__paths(context);
+        # The model and geometry are computed on a worker thread, the objects are then
+        # created from the timer in slices of BUILD_TIME_SLICE seconds. Esc cancels and
+        # removes what was built, the previous import stays as it was
+        self._viewer = None;
+        self._loaded = False;
+        self._error = None;
+        self._prepared = False;
+        self._sceneName = context.scene.name;
+        self._profiler = Profiler();
+        self._done = threading.Event();
+        self._cancelled = threading.Event();
+        workerArgs = (context.scene.bp3djs_mesh_mode, context.scene.bp3djs_curve_quality, zip_file_path, zip_extract_path);
+        self._thread = threading.Thread(target=self.__worker, args=workerArgs, daemon=True);
+        self._thread.start();
+
+        wm = context.window_manager;
+        wm.bp3djs_import_running = True;
+        wm.bp3djs_import_report = '';
+        wm.progress_begin(0, 100);
+        self.__setProgress(context, 0.0, 'Reading design');
+        self._timer = wm.event_timer_add(TIMER_INTERVAL, window=context.window);
+        wm.modal_handler_add(self);
+        return {'RUNNING_MODAL'};
+
+    def modal(self, context, event):
+        if(event.type == 'ESC'):
+            self._cancelled.set();
+            if(self._prepared):
+                self._viewer.cancel();
+            self.__finishModal(context);
+            self.report({'WARNING'}, 'Blueprint3D import cancelled');
+            return {'CANCELLED'};
+
+        if(event.type != 'TIMER'):
+            return {'PASS_THROUGH'};
+
+        if(not self._done.is_set()):
+            return {'RUNNING_MODAL'};
+
+        if(self._error or not self._loaded):
+            self.__finishModal(context);
+            if(self._error):
+                self.report({'ERROR'}, 'Blueprint3D import failed: %s'%(self._error));
+            else:
+                self.report({'ERROR'}, 'Invalid zip file or does not exist. Check the path and try again');
+            return {'CANCELLED'};
+
+        if(not self._prepared):
+            scene = bpy.data.scenes.get(self._sceneName);
+            if(not scene):
+                self.__finishModal(context);
+                self.report({'ERROR'}, 'Blueprint3D import failed: the scene %s no longer exists'%(self._sceneName));
+                return {'CANCELLED'};
+            self._viewer.prepare(self.__getCollection(scene), scene);
+            self._prepared = True;
 
-        blenderscene = BlenderSceneViewer(context, model, context.scene, collection, zip_extract_path);
+        finished = self._viewer.buildNext(BUILD_TIME_SLICE);
+        self.__setProgress(context, self._viewer.progress, 'Building objects');
+        if(not finished):
+            return {'RUNNING_MODAL'};
 
-        return zip_file;
+        self._viewer.finish();
+        self.__finishModal(context);
+        self.__reportProfile(context, self._profiler);
+        return {'FINISHED'};
 
     def execute(self, context):
         if(not bpy.data.is_saved):
@@ -19,7 +19,30 @@ class Blueprint3DJSPanel(bpy.types.Panel):
         row = box.row();
         row.prop(context.scene, 'bp3djs_project_file');
 
+        row = box.row();
+        row.prop(context.scene, 'bp3djs_mesh_mode');
+
+        row = box.row();
+        row.prop(context.scene, 'bp3djs_curve_quality');
+
+        row = box.row();
+        row.prop(context.scene, 'bp3djs_profile_file');
+
         row = box.row();
         row.operator(BlueprintJSImporterOperator.bl_idname);
 
+        wm = context.window_manager;
+        if(wm.bp3djs_import_running):
+            row = box.row();
+            row.label(text='%s (Esc to cancel)'%(wm.bp3djs_import_status));
+            row = box.row();
+            row.enabled = False;
+            row.prop(wm, 'bp3djs_import_progress', slider=True);
+        elif(wm.bp3djs_import_report):
+            report = layout.box();
+            report.label(text='Last Import');
+            column = report.column(align=True);
+            for line in wm.bp3djs_import_report.split('\n'):
+                column.label(text=line);
+        
         
\ No newline at end of file
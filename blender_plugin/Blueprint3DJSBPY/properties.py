@@ -1,7 +1,29 @@
 import bpy;
+from Blueprint3DJSBPY.bp3dpy.core.constants import MESH_MODE_SURFACE, MESH_MODE_WALL, MESH_MODE_COLLECTION, CURVE_QUALITY_PREVIEW, CURVE_QUALITY_RENDER;
 
 def register():
     bpy.types.Scene.bp3djs_project_file = bpy.props.StringProperty(name="Blueprint3D JS Zip", subtype="FILE_PATH", default="//project.zip");
+    bpy.types.Scene.bp3djs_mesh_mode = bpy.props.EnumProperty(name="Meshes", default=MESH_MODE_SURFACE, items=[
+        (MESH_MODE_SURFACE, "Per Surface", "One object for every wall side, filler, floor and roof"),
+        (MESH_MODE_WALL, "Per Wall/Room", "One object for every wall and every room, with a material slot per surface"),
+        (MESH_MODE_COLLECTION, "Per Collection", "One object for all walls and one for all rooms, with a material slot per surface"),
+    ]);
+    bpy.types.Scene.bp3djs_curve_quality = bpy.props.EnumProperty(name="Curves", default=CURVE_QUALITY_RENDER, items=[
+        (CURVE_QUALITY_PREVIEW, "Preview", "Few segments on curved walls, for fast viewport imports"),
+        (CURVE_QUALITY_RENDER, "Render", "Curved walls follow the curve within a millimeter, for final renders"),
+    ]);
+    bpy.types.Scene.bp3djs_profile_file = bpy.props.StringProperty(name="Profile JSON", subtype="FILE_PATH", default="");
+    bpy.types.WindowManager.bp3djs_import_running = bpy.props.BoolProperty(name="Importing", default=False);
+    bpy.types.WindowManager.bp3djs_import_progress = bpy.props.FloatProperty(name="Progress", subtype="PERCENTAGE", min=0.0, max=100.0, default=0.0);
+    bpy.types.WindowManager.bp3djs_import_status = bpy.props.StringProperty(name="Status", default="");
+    bpy.types.WindowManager.bp3djs_import_report = bpy.props.StringProperty(name="Report", default="");
 
 def unregister():
-    del bpy.types.Scene.bp3djs_project_file;
\ No newline at end of file
+    del bpy.types.Scene.bp3djs_project_file;
+    del bpy.types.Scene.bp3djs_mesh_mode;
+    del bpy.types.Scene.bp3djs_curve_quality;
+    del bpy.types.Scene.bp3djs_profile_file;
+    del bpy.types.WindowManager.bp3djs_import_running;
+    del bpy.types.WindowManager.bp3djs_import_progress;
+    del bpy.types.WindowManager.bp3djs_import_status;
+    del bpy.types.WindowManager.bp3djs_import_report;
\ No newline at end of file
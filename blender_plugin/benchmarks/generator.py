@@ -0,0 +1,212 @@
+import os;
+import sys;
+import json;
+import math;
+import zipfile;
+import argparse;
+
+# Synthetic blueprint-js designs for benchmarking the bp3dpy pipeline. Every design is
+# a plain serialized blueprint3d dict (the 'floorplanner' and 'items' keys) like the
+# ones saved by the web editor, rooms are keyed by their corner ids in CCW order.
+#   python -m benchmarks.generator grid 20000 -o grid.blueprint3d
+#   python -m benchmarks.generator grid --columns 100 --rows 50 -o grid.blueprint3d
+
+WALL_HEIGHT = 250.0;
+WALL_THICKNESS = 10.0;
+WALL_TEXTURES = [
+    {'color': '#FFFFFF', 'repeat': 300, 'colormap': 'textures/Wall/Plaster/Color.jpg', 'normalmap': 'textures/Wall/Plaster/Normal.jpg'},
+    {'color': '#E8E0D0', 'repeat': 200, 'colormap': 'textures/Wall/Brick/Color.jpg', 'normalmap': 'textures/Wall/Brick/Normal.jpg'},
+    {'color': '#D0D8E8', 'repeat': 150, 'colormap': 'textures/Wall/Tiles/Color.jpg'},
+];
+FLOOR_TEXTURES = [
+    {'color': '#FFFFFF', 'repeat': 300, 'colormap': 'textures/Floor/Wood/Color.jpg', 'normalmap': 'textures/Floor/Wood/Normal.jpg'},
+    {'color': '#C8C8C8', 'repeat': 100, 'colormap': 'textures/Floor/Marble/Color.jpg'},
+];
+
+class SyntheticDesign():
+    def __init__(self, units='cm'):
+        self.__units = units;
+        self.__corners = {};
+        self.__walls = [];
+        self.__rooms = {};
+        self.__floorTextures = {};
+        self.__wallsByCorners = set();
+
+    def addCorner(self, x, y, elevation=WALL_HEIGHT):
+        cornerId = 'c%d'%(len(self.__corners));
+        self.__corners[cornerId] = {'x': float(x), 'y': float(y), 'elevation': float(elevation)};
+        return cornerId;
+
+    def addWall(self, corner1, corner2, curvature=0.0, thickness=WALL_THICKNESS):
+        # curvature offsets the two bezier control points sideways by a fraction of the wall length
+        if((corner1, corner2) in self.__wallsByCorners or (corner2, corner1) in self.__wallsByCorners):
+            return;
+        self.__wallsByCorners.add((corner1, corner2));
+        c1, c2 = self.__corners[corner1], self.__corners[corner2];
+        dx, dy = c2['x'] - c1['x'], c2['y'] - c1['y'];
+        index = len(self.__walls);
+        wall = {
+            'corner1': corner1, 'corner2': corner2,
+            'frontTexture': WALL_TEXTURES[index % len(WALL_TEXTURES)],
+            'backTexture': WALL_TEXTURES[(index + 1) % len(WALL_TEXTURES)],
+            'wallType': 'CURVED' if curvature else 'STRAIGHT',
+            'a': {'x': c1['x'] + dx / 3.0 - dy * curvature, 'y': c1['y'] + dy / 3.0 + dx * curvature},
+            'b': {'x': c1['x'] + 2.0 * dx / 3.0 - dy * curvature, 'y': c1['y'] + 2.0 * dy / 3.0 + dx * curvature},
+            'thickness': thickness,
+        };
+        self.__walls.append(wall);
+
+    def addRoom(self, cornerIds, name=None):
+        # Corners are stored in CCW order, the same as the web editor does
+        xs = [self.__corners[c]['x'] for c in cornerIds];
+        ys = [self.__corners[c]['y'] for c in cornerIds];
+        area = sum(xs[i] * ys[(i+1) % len(xs)] - xs[(i+1) % len(xs)] * ys[i] for i in range(len(xs)));
+        if(area < 0):
+            cornerIds = list(reversed(cornerIds));
+        roomKey = ','.join(cornerIds);
+        self.__rooms[roomKey] = {'name': name or 'Room %d'%(len(self.__rooms))};
+        self.__floorTextures[roomKey] = FLOOR_TEXTURES[len(self.__floorTextures) % len(FLOOR_TEXTURES)];
+        return roomKey;
+
+    def toDict(self):
+        floorplanner = {
+            'version': '2.0.1a',
+            'corners': self.__corners,
+            'walls': self.__walls,
+            'rooms': self.__rooms,
+            'wallTextures': [],
+            'floorTextures': {},
+            'newFloorTextures': self.__floorTextures,
+            'carbonSheet': {},
+            'units': self.__units,
+        };
+        return {'floorplanner': floorplanner, 'items': []};
+
+    @property
+    def wallCount(self):
+        return len(self.__walls);
+
+
+def _elevation(x, y, slope):
+    # slope is the rise in elevation per unit of distance along x + y
+    return WALL_HEIGHT + slope * (x + y);
+
+def gridDesign(columns, rows, cell=400.0, slope=0.0, curvature=0.0):
+    # columns x rows square rooms sharing their walls, about 2 * columns * rows walls.
+    # Only the outer walls are curved so the rooms stay closed polygons
+    design = SyntheticDesign();
+    ids = [[design.addCorner(i * cell, j * cell, _elevation(i * cell, j * cell, slope)) for i in range(columns + 1)] for j in range(rows + 1)];
+    for j in range(rows + 1):
+        for i in range(columns):
+            outer = j == 0 or j == rows;
+            design.addWall(ids[j][i], ids[j][i+1], curvature if outer else 0.0);
+    for j in range(rows):
+        for i in range(columns + 1):
+            outer = i == 0 or i == columns;
+            design.addWall(ids[j][i], ids[j+1][i], curvature if outer else 0.0);
+    for j in range(rows):
+        for i in range(columns):
+            design.addRoom([ids[j][i], ids[j][i+1], ids[j+1][i+1], ids[j+1][i]]);
+    return design;
+
+def corridorDesign(length, width=1, cell=400.0, slope=0.0, curvature=0.0):
+    # A long strip of rooms, the worst case for the per room corner walk
+    return gridDesign(length, width, cell, slope, curvature);
+
+def starDesign(spokes, radius=1000.0, slope=0.0, curvature=0.0):
+    # Triangular rooms around one hub corner, the worst case for the miters at a corner
+    design = SyntheticDesign();
+    hub = design.addCorner(0.0, 0.0, _elevation(0.0, 0.0, slope));
+    ring = [];
+    for i in range(spokes):
+        theta = 2.0 * math.pi * i / spokes;
+        x, y = radius * math.cos(theta), radius * math.sin(theta);
+        ring.append(design.addCorner(x, y, _elevation(x, y, slope)));
+    for i in range(spokes):
+        design.addWall(hub, ring[i]);
+        design.addWall(ring[i], ring[(i+1) % spokes], curvature);
+    for i in range(spokes):
+        design.addRoom([hub, ring[i], ring[(i+1) % spokes]]);
+    return design;
+
+def combDesign(teeth, cell=400.0, slope=0.0, curvature=0.0):
+    # One room whose outline has about 4 * teeth walls and a reflex corner for every
+    # tooth, the worst case for the floor triangulation
+    design = SyntheticDesign();
+    width, depth = (2 * teeth - 1) * cell, 2.0 * cell;
+    outline = [(0.0, 0.0), (width, 0.0)];
+    for i in reversed(range(teeth)):
+        left = 2 * i * cell;
+        right = left + cell;
+        if(i < teeth - 1):
+            outline.append((right, cell));
+        outline.extend([(right, cell + depth), (left, cell + depth)]);
+        if(i > 0):
+            outline.append((left, cell));
+    ids = [design.addCorner(x, y, _elevation(x, y, slope)) for x, y in outline];
+    for i in range(len(ids)):
+        design.addWall(ids[i], ids[(i+1) % len(ids)], curvature);
+    design.addRoom(ids);
+    return design;
+
+def gridSizeForWalls(walls):
+    # Square grid side with about the requested number of walls
+    return max(1, int(round((-1.0 + math.sqrt(1.0 + 2.0 * walls)) / 2.0)));
+
+SHAPES = {
+    'grid': lambda walls, slope, curvature: gridDesign(gridSizeForWalls(walls), gridSizeForWalls(walls), slope=slope, curvature=curvature),
+    'corridor': lambda walls, slope, curvature: corridorDesign(max(1, (walls - 1) // 3), slope=slope, curvature=curvature),
+    'star': lambda walls, slope, curvature: starDesign(max(3, walls // 2), slope=slope, curvature=curvature),
+    'comb': lambda walls, slope, curvature: combDesign(max(1, walls // 4), slope=slope, curvature=curvature),
+};
+
+def designForWalls(shape, walls, slope=0.0, curvature=0.0):
+    return SHAPES[shape](walls, slope, curvature);
+
+def designForSize(shape, columns, rows, slope=0.0, curvature=0.0):
+    # An explicit columns x rows grid, or a corridor columns rooms long and rows rooms wide
+    if(shape == 'corridor'):
+        return corridorDesign(columns, rows, slope=slope, curvature=curvature);
+    return gridDesign(columns, rows, slope=slope, curvature=curvature);
+
+def writeDesign(design, filepath):
+    # .blueprint3d files are zips with the design json as design.blueprint3d, .json is written plain
+    data = json.dumps(design.toDict());
+    if(filepath.lower().endswith('.json')):
+        with open(filepath, 'w') as f:
+            f.write(data);
+    else:
+        with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr('design.blueprint3d', data);
+    return filepath;
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic blueprint-js designs');
+    parser.add_argument('shape', choices=sorted(SHAPES.keys()));
+    parser.add_argument('walls', type=int, nargs='?', help='Approximate number of walls');
+    parser.add_argument('--columns', type=int, help='Rooms along x of a grid or corridor, instead of walls');
+    parser.add_argument('--rows', type=int, help='Rooms along y of a grid or corridor, instead of walls');
+    parser.add_argument('-o', '--output', required=True, help='Output .blueprint3d (zip) or .json file');
+    parser.add_argument('--slope', type=float, default=0.0, help='Corner elevation rise per unit of x + y');
+    parser.add_argument('--curvature', type=float, default=0.0, help='Sideways offset of the control points of curved walls');
+    args = parser.parse_args(argv);
+
+    if(args.columns or args.rows):
+        if(args.shape not in ('grid', 'corridor')):
+            parser.error('--columns and --rows apply to grid and corridor only');
+        if(args.walls is not None):
+            parser.error('give either walls or --columns and --rows');
+        columns = args.columns or args.rows;
+        rows = args.rows or (1 if args.shape == 'corridor' else columns);
+        design = designForSize(args.shape, max(1, columns), max(1, rows), args.slope, args.curvature);
+    elif(args.walls is None):
+        parser.error('walls or --columns and --rows are required');
+    else:
+        design = designForWalls(args.shape, args.walls, args.slope, args.curvature);
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True);
+    writeDesign(design, args.output);
+    print('%s: %d walls'%(args.output, design.wallCount));
+    return 0;
+
+if __name__ == '__main__':
+    sys.exit(main());
@@ -0,0 +1,215 @@
+import os;
+import sys;
+import json;
+import time;
+import platform;
+import argparse;
+import tracemalloc;
+
+# Benchmarks the bp3dpy pipeline phase by phase on synthetic designs, from a few walls
+# up to 100k. Wall time is the best of --repeat runs, memory is the tracemalloc peak of
+# a separate run (tracing slows everything down, so it is never timed).
+#   python -m benchmarks.run --sizes 10 100 1000 10000
+#   python -m benchmarks.run --save-baselines        record the current numbers
+#   python -m benchmarks.run                         compare with them, exit 1 on regressions
+# Inside Blender the mesh building phases run as well:
+#   blender -b -P benchmarks/run.py -- --sizes 100 1000
+
+if(__package__ in (None, '')):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))));
+
+from benchmarks.generator import designForWalls;
+
+try:
+    import bpy;
+except ImportError:
+    bpy = None;
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json');
+DEFAULT_SIZES = [10, 100, 1000, 10000];
+# name -> (shape, slope, curvature)
+CASES = {
+    'grid': ('grid', 0.0, 0.0),
+    'corridor': ('corridor', 0.0, 0.0),
+    'star': ('star', 0.0, 0.0),
+    'comb': ('comb', 0.0, 0.0),
+    'sloped': ('grid', 0.05, 0.0),
+    'curved': ('grid', 0.0, 0.15),
+};
+# Phases shorter than this are timer noise and never reported as regressions
+MIN_SECONDS = 0.005;
+MIN_BYTES = 1 << 16;
+
+def _phases(data):
+    # Generator of (phase name, callable), each callable runs on the state left by the previous ones
+    from Blueprint3DJSBPY.bp3dpy.model.model import Model;
+    from Blueprint3DJSBPY.bp3dpy.geometry.surfaces import floorplanSurfaces;
+    from Blueprint3DJSBPY.bp3dpy.export.glb import GLBWriter;
+
+    state = {};
+    def __decode():
+        state['design'] = json.loads(data);
+    def __load():
+        # Corners, walls, rooms and the first miter pass
+        model = Model();
+        design = state['design'];
+        model.newDesign(design.get('floorplanner') or design.get('floorplan'), design.get('items'));
+        state['model'] = model;
+    def __miters():
+        state['model'].floorplan.updateMiters();
+    def __interior():
+        for room in state['model'].floorplan.rooms:
+            room.updateInteriorCorners();
+    def __surfaces():
+        state['surfaces'] = list(floorplanSurfaces(state['model'].floorplan));
+    def __glb():
+        writer = GLBWriter();
+        for surface in state['surfaces']:
+            writer.addSurface(surface);
+        writer.toBytes();
+
+    phases = [('decode', __decode), ('load', __load), ('miters', __miters), ('interior', __interior), ('surfaces', __surfaces), ('glb', __glb)];
+
+    if(bpy):
+        from Blueprint3DJSBPY.bp3dpy.blender.blenderscene import BlenderSceneViewer;
+        def __plan():
+            collection = bpy.data.collections.new('bp3djs-benchmark');
+            bpy.context.scene.collection.children.link(collection);
+            state['collection'] = collection;
+            state['viewer'] = BlenderSceneViewer(bpy.context, state['model'], bpy.context.scene, collection, '', immediate=False);
+            state['viewer'].plan();
+        def __build():
+            viewer = state['viewer'];
+            viewer.prepare();
+            viewer.buildNext();
+            viewer.finish();
+        def __cleanup():
+            collection = state['collection'];
+            for child in list(collection.children_recursive) + [collection]:
+                for obj in list(child.objects):
+                    bpy.data.objects.remove(obj, do_unlink=True);
+                bpy.data.collections.remove(child);
+            for mesh in [mesh for mesh in bpy.data.meshes if mesh.users == 0]:
+                bpy.data.meshes.remove(mesh);
+        phases.extend([('plan', __plan), ('build', __build), (None, __cleanup)]);
+    return phases;
+
+def _quiet(fn):
+    # loadFloorplan prints the unit system of every design
+    stdout = sys.stdout;
+    sys.stdout = open(os.devnull, 'w');
+    try:
+        return fn();
+    finally:
+        sys.stdout.close();
+        sys.stdout = stdout;
+
+def timeDesign(data, repeat):
+    best = {};
+    for i in range(repeat):
+        for name, fn in _phases(data):
+            started = time.perf_counter();
+            _quiet(fn);
+            elapsed = time.perf_counter() - started;
+            if(name):
+                best[name] = min(best.get(name, elapsed), elapsed);
+    return best;
+
+def memoryDesign(data):
+    peaks = {};
+    phases = _phases(data);
+    tracemalloc.start();
+    try:
+        for name, fn in phases:
+            tracemalloc.reset_peak();
+            before = tracemalloc.get_traced_memory()[0];
+            _quiet(fn);
+            if(name):
+                peaks[name] = tracemalloc.get_traced_memory()[1] - before;
+    finally:
+        tracemalloc.stop();
+    return peaks;
+
+def runCase(caseName, walls, repeat):
+    shape, slope, curvature = CASES[caseName];
+    design = designForWalls(shape, walls, slope, curvature);
+    data = json.dumps(design.toDict());
+    seconds = timeDesign(data, repeat);
+    peaks = memoryDesign(data);
+    return {'walls': design.wallCount, 'seconds': seconds, 'peak_bytes': peaks};
+
+def compare(results, baselines, tolerance):
+    # Returns the list of (case, phase, metric, baseline, current) that got worse than tolerance times the baseline
+    regressions = [];
+    for case, result in results.items():
+        baseline = baselines.get(case);
+        if(not baseline):
+            continue;
+        for metric, floor in (('seconds', MIN_SECONDS), ('peak_bytes', MIN_BYTES)):
+            for phase, current in result[metric].items():
+                previous = baseline.get(metric, {}).get(phase);
+                if(previous is None or max(previous, current) < floor):
+                    continue;
+                if(current > max(previous, floor) * tolerance):
+                    regressions.append((case, phase, metric, previous, current));
+    return regressions;
+
+def _formatBytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if(abs(n) < 1024.0 or unit == 'GB'):
+            return '%.1f %s'%(n, unit);
+        n /= 1024.0;
+
+def printResult(case, result):
+    print('%-16s %7d walls'%(case, result['walls']));
+    for phase, seconds in result['seconds'].items():
+        print('    %-10s %10.4f s %12s'%(phase, seconds, _formatBytes(result['peak_bytes'].get(phase, 0))));
+
+def main(argv=None):
+    if(argv is None):
+        # Blender passes its own arguments, ours follow the --
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:];
+    parser = argparse.ArgumentParser(description='Benchmark the bp3dpy pipeline on synthetic designs');
+    parser.add_argument('--cases', nargs='+', default=sorted(CASES.keys()), choices=sorted(CASES.keys()));
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='Approximate wall counts, up to 100000');
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per design, the best one is kept');
+    parser.add_argument('--baselines', default=BASELINES_FILE, help='Baselines json file');
+    parser.add_argument('--save-baselines', action='store_true', help='Store the results as the new baselines');
+    parser.add_argument('--tolerance', type=float, default=1.5, help='Allowed slowdown or memory growth factor over the baselines');
+    parser.add_argument('-o', '--output', help='Also write the results to this json file');
+    args = parser.parse_args(argv);
+
+    results = {};
+    for caseName in args.cases:
+        for walls in args.sizes:
+            case = '%s-%d'%(caseName, walls);
+            results[case] = runCase(caseName, walls, max(1, args.repeat));
+            printResult(case, results[case]);
+
+    environment = {'python': platform.python_version(), 'machine': platform.machine(), 'blender': bool(bpy)};
+    if(args.output):
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment, 'results': results}, f, indent=2);
+
+    if(args.save_baselines):
+        baselines = {};
+        if(os.path.isfile(args.baselines)):
+            with open(args.baselines) as f:
+                baselines = json.load(f).get('results', {});
+        baselines.update(results);
+        with open(args.baselines, 'w') as f:
+            json.dump({'environment': environment, 'results': baselines}, f, indent=2, sort_keys=True);
+        print('Baselines saved to %s'%(args.baselines));
+        return 0;
+
+    if(not os.path.isfile(args.baselines)):
+        print('No baselines at %s, run with --save-baselines to record them'%(args.baselines));
+        return 0;
+    with open(args.baselines) as f:
+        regressions = compare(results, json.load(f).get('results', {}), args.tolerance);
+    for case, phase, metric, previous, current in regressions:
+        print('REGRESSION %s %s %s: %s -> %s'%(case, phase, metric, previous, current), file=sys.stderr);
+    return 1 if regressions else 0;
+
+if __name__ == '__main__':
+    sys.exit(main());
@@ -0,0 +1,166 @@
+import os;
+import json;
+import mmap;
+import struct;
+import base64;
+from concurrent.futures import ProcessPoolExecutor;
+
+# Metadata of a glTF model read without loading its geometry. Only the JSON chunk of a
+# .glb is parsed, the bounds come from the min and max that glTF requires on every
+# POSITION accessor. All lengths are in the units of the model, meters for glTF
+
+GLB_MAGIC = b'glTF';
+GLB_HEADER = struct.Struct('<4sII');
+GLB_CHUNK_HEADER = struct.Struct('<I4s');
+GLB_JSON_CHUNK = b'JSON';
+
+# Primitive modes, the default mode is TRIANGLES
+MODE_TRIANGLES, MODE_TRIANGLE_STRIP, MODE_TRIANGLE_FAN = 4, 5, 6;
+
+IDENTITY = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0));
+
+def readGLBJSON(filepath):
+    # The JSON chunk of a .glb, memory mapped so the binary chunk is never read
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version, length = GLB_HEADER.unpack_from(data, 0);
+            if(magic != GLB_MAGIC or version != 2):
+                raise ValueError('%s is not a glTF 2.0 binary'%(filepath));
+            chunk_length, chunk_type = GLB_CHUNK_HEADER.unpack_from(data, GLB_HEADER.size);
+            if(chunk_type != GLB_JSON_CHUNK):
+                raise ValueError('%s does not start with a JSON chunk'%(filepath));
+            start = GLB_HEADER.size + GLB_CHUNK_HEADER.size;
+            return json.loads(data[start:start + chunk_length].decode('utf-8'));
+
+def readGLTFJSON(filepath):
+    if(filepath.lower().endswith('.glb')):
+        return readGLBJSON(filepath);
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f);
+
+def multiply(a, b):
+    return tuple(tuple(sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)) for i in range(4));
+
+def nodeMatrix(node):
+    if(node.get('matrix')):
+        # glTF matrices are column major
+        m = node['matrix'];
+        return tuple(tuple(m[j * 4 + i] for j in range(4)) for i in range(4));
+    tx, ty, tz = node.get('translation') or (0.0, 0.0, 0.0);
+    qx, qy, qz, qw = node.get('rotation') or (0.0, 0.0, 0.0, 1.0);
+    sx, sy, sz = node.get('scale') or (1.0, 1.0, 1.0);
+    rotation = (
+        (1 - 2 * (qy * qy + qz * qz), 2 * (qx * qy - qz * qw), 2 * (qx * qz + qy * qw)),
+        (2 * (qx * qy + qz * qw), 1 - 2 * (qx * qx + qz * qz), 2 * (qy * qz - qx * qw)),
+        (2 * (qx * qz - qy * qw), 2 * (qy * qz + qx * qw), 1 - 2 * (qx * qx + qy * qy)),
+    );
+    return (
+        (rotation[0][0] * sx, rotation[0][1] * sy, rotation[0][2] * sz, tx),
+        (rotation[1][0] * sx, rotation[1][1] * sy, rotation[1][2] * sz, ty),
+        (rotation[2][0] * sx, rotation[2][1] * sy, rotation[2][2] * sz, tz),
+        (0.0, 0.0, 0.0, 1.0),
+    );
+
+def transformBox(matrix, bmin, bmax):
+    # The box around the eight transformed corners of an axis aligned box
+    tmin, tmax = [], [];
+    for i in range(3):
+        low = high = matrix[i][3];
+        for j in range(3):
+            a, b = matrix[i][j] * bmin[j], matrix[i][j] * bmax[j];
+            low += min(a, b);
+            high += max(a, b);
+        tmin.append(low);
+        tmax.append(high);
+    return tmin, tmax;
+
+def primitiveTriangles(gltf, primitive, vertex_count):
+    mode = primitive.get('mode', MODE_TRIANGLES);
+    count = vertex_count;
+    if(primitive.get('indices') is not None):
+        count = gltf['accessors'][primitive['indices']].get('count', 0);
+    if(mode == MODE_TRIANGLES):
+        return count // 3;
+    if(mode in (MODE_TRIANGLE_STRIP, MODE_TRIANGLE_FAN)):
+        return max(count - 2, 0);
+    # Points and lines
+    return 0;
+
+def imageBytes(gltf, directory):
+    # Bytes of the images in the file, in a buffer view or a data uri. Images in
+    # separate files count as well when the file is next to the model
+    total = 0;
+    buffer_views = gltf.get('bufferViews') or [];
+    for image in gltf.get('images') or []:
+        if(image.get('bufferView') is not None):
+            total += buffer_views[image['bufferView']].get('byteLength', 0);
+        elif(image.get('uri', '').startswith('data:')):
+            total += len(base64.b64decode(image['uri'].split(',', 1)[1]));
+        elif(image.get('uri')):
+            image_path = os.path.join(directory, image['uri']);
+            if(os.path.isfile(image_path)):
+                total += os.path.getsize(image_path);
+    return total;
+
+def gltfMetadata(gltf, directory=''):
+    accessors = gltf.get('accessors') or [];
+    meshes = gltf.get('meshes') or [];
+    nodes = gltf.get('nodes') or [];
+    scenes = gltf.get('scenes') or [];
+    bmin, bmax = [float('inf')] * 3, [float('-inf')] * 3;
+    vertices, triangles = 0, 0;
+
+    def __visit(index, parent):
+        nonlocal vertices, triangles;
+        node = nodes[index];
+        matrix = multiply(parent, nodeMatrix(node));
+        if(node.get('mesh') is not None):
+            for primitive in meshes[node['mesh']].get('primitives') or []:
+                position = primitive.get('attributes', {}).get('POSITION');
+                if(position is None):
+                    continue;
+                accessor = accessors[position];
+                vertex_count = accessor.get('count', 0);
+                vertices += vertex_count;
+                triangles += primitiveTriangles(gltf, primitive, vertex_count);
+                if(accessor.get('min') and accessor.get('max')):
+                    pmin, pmax = transformBox(matrix, accessor['min'], accessor['max']);
+                    for i in range(3):
+                        bmin[i], bmax[i] = min(bmin[i], pmin[i]), max(bmax[i], pmax[i]);
+        for child in node.get('children') or []:
+            __visit(child, matrix);
+
+    if(scenes):
+        roots = scenes[gltf.get('scene', 0)].get('nodes') or [];
+    else:
+        # Without scenes every node that is no child of another node is a root
+        children = {child for node in nodes for child in node.get('children') or []};
+        roots = [index for index in range(len(nodes)) if index not in children];
+    for index in roots:
+        __visit(index, IDENTITY);
+
+    bounds = None;
+    if(bmin[0] <= bmax[0]):
+        bounds = {'min': bmin, 'max': bmax, 'size': [bmax[i] - bmin[i] for i in range(3)]};
+    return {
+        'bounds': bounds,
+        'vertices': vertices,
+        'triangles': triangles,
+        'materials': len(gltf.get('materials') or []),
+        'imageBytes': imageBytes(gltf, directory),
+    };
+
+def readMetadata(filepath):
+    # None when the file is no readable glTF, the inventory item is still exported
+    try:
+        return gltfMetadata(readGLTFJSON(filepath), os.path.dirname(filepath));
+    except (OSError, ValueError, KeyError, IndexError, TypeError, struct.error) as error:
+        print('NO METADATA FOR %s ::: %s'%(filepath, error));
+        return None;
+
+def readCatalogMetadata(filepaths, workers=None):
+    # Metadata of every file, in the order of filepaths
+    if(not filepaths):
+        return [];
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(readMetadata, filepaths, chunksize=max(1, len(filepaths) // 256)));
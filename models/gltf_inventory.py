@@ -1,13 +1,22 @@
+import io;
 import os;
 from shutil import copyfile;
 import json;
-import numpy as np;
-from scipy.interpolate.interpolate_wrapper import logarithmic
-import matplotlib.cm as cm;
-from matplotlib.cm import get_cmap;
-import matplotlib.colors as clrs;
+import hashlib;
+from concurrent.futures import ProcessPoolExecutor;
 
-from PIL import Image, ImageOps;
+from PIL import Image;
+
+from glb_metadata import readCatalogMetadata;
+from inventory_index import writeIndex, writeIfChanged;
+from thumbnail_atlas import writeAtlases;
+
+# The size of the thumbnails shown in the inventory of the app page
+THUMBNAIL_SIZE = (300, 225);
+# Remembers the source file of every resized thumbnail, so unchanged thumbnails are skipped
+THUMBNAIL_MANIFEST = 'manifest.json';
+# Remembers the source and content of every exported file, so unchanged files are not copied again
+BUILD_MANIFEST = 'inventory_manifest.json';
 
 def getFilesFromDirectory(directorypath, extension=['.obj'], *, exclusions=[], recursive=False):
     found_files = [];
@@ -32,25 +41,28 @@ def createDir(pathdir):
         os.makedirs(pathdir);
     return os.path.abspath(pathdir);
 
-def findEquivalent(filename, thumbs):
+def indexThumbnails(thumbs):
+    # Thumbnail maps by purename, the first thumbnail of a name wins
+    thumbs_by_name = {};
     for thumbmap in thumbs:
-        thumbname = thumbmap['purename'];
-        if(thumbname == filename):
-            return thumbmap;
+        thumbs_by_name.setdefault(thumbmap['purename'], thumbmap);
+    return thumbs_by_name;
 
-    return None;
-
-def createJSONJS(jsonitems, export_to_file, mformat='gltf'):
+def createJSONItems(jsonitems, mformat='gltf'):
     json_items = [];
 
-    for (mname, mtype, mpath, tpath) in jsonitems:
+    for (mname, mtype, mpath, tpath, metadata) in jsonitems:
         json_item = {'name':mname.capitalize(), 'image': tpath, 'model': mpath, 'type':mtype, 'format':mformat};
+        # Bounds, vertex and triangle counts, material count and embedded image bytes
+        if(metadata):
+            json_item['metadata'] = metadata;
         json_items.append(json_item);
+    return json_items;
 
+def createJSONJS(json_items, export_to_file):
     js_snippet_f = open(os.path.abspath("./js_snippet_inventory.js"), "r");
     js_lines = js_snippet_f.readlines();
     js_snippet_f.close();
-    f = open(os.path.abspath(export_to_file), 'w');
 
     line1 = '$(document).ready(function() {';
     line2 = '\tvar items = ' + json.dumps(json_items);
@@ -65,13 +77,55 @@ def createJSONJS(jsonitems, export_to_file, mformat='gltf'):
 #     line10 = '\t\titemsDiv.append(html);';
 #     line11 = '\t};';
     line12 = '});';
-    f.writelines('\n'.join([line1, line2]+js_lines+[line12]));
-#     f.writelines('\n'.join([line1, line2, line3, line4, line5, line6, line7, line8, line9, line10, line11, line12]));
-    f.close();
+    content = '\n'.join([line1, line2]+js_lines+[line12]);
+#     content = '\n'.join([line1, line2, line3, line4, line5, line6, line7, line8, line9, line10, line11, line12]);
+    return writeIfChanged(os.path.abspath(export_to_file), content);
+
+def exportFile(source_path, export_path, entries, exported, by_hash):
+    # Copies source_path to export_path unless the export is already up to date. A
+    # source with the same content as a file exported before in this run is hard
+    # linked to it
+    stat = os.stat(source_path);
+    previous = entries.get(export_path);
+    entry = {'source': source_path, 'size': stat.st_size, 'mtime': stat.st_mtime_ns};
+    if(previous and previous.get('source') == source_path and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime_ns and os.path.exists(export_path)):
+        entry['hash'], action = previous.get('hash'), 'skipped';
+    else:
+        entry['hash'] = fileHash(source_path);
+        if(previous and previous.get('hash') == entry['hash'] and os.path.exists(export_path)):
+            action = 'skipped';
+        else:
+            # Always through a temporary file, writing into a hard linked export would
+            # change every other export sharing its content
+            temp_path = export_path + '.tmp';
+            if(os.path.exists(temp_path)):
+                os.remove(temp_path);
+            action = 'copied';
+            linked_path = by_hash.get(entry['hash']);
+            if(linked_path and os.path.exists(linked_path)):
+                try:
+                    os.link(linked_path, temp_path);
+                    action = 'linked';
+                except OSError:
+                    pass;
+            if(action == 'copied'):
+                copyfile(source_path, temp_path);
+            os.replace(temp_path, export_path);
+    by_hash.setdefault(entry['hash'], export_path);
+    exported[export_path] = entry;
+    return entry, action;
 
 
 def createItemsJSON(gltf_files, thumbnails, objfiles=None):
     json_gltf_items = [];
+    thumbs_by_name = indexThumbnails(thumbnails);
+    manifest_path = os.path.join(export_path_root, 'models', BUILD_MANIFEST);
+    entries = readManifest(manifest_path).get('files', {});
+    # The files exported or confirmed up to date in this run by their content hash, the
+    # targets of the hard links. Exports of a previous run may still be rewritten
+    by_hash = {};
+    exported = {};
+    actions = {'skipped': 0, 'copied': 0, 'linked': 0};
 
     for gltf_map in gltf_files:
 
@@ -79,9 +133,9 @@ def createItemsJSON(gltf_files, thumbnails, objfiles=None):
         gltf_name = gltf_map['purename'];
         gltf_type = os.path.basename(os.path.dirname(os.path.realpath(gltf_file_path)));
 
-        thumbnail_map = findEquivalent(gltf_name, thumbnails);
+        thumbnail_map = thumbs_by_name.get(gltf_name);
         if(not thumbnail_map):
-            thumbnail_map = findEquivalent("nopreview", thumbnails);
+            thumbnail_map = thumbs_by_name.get("nopreview");
         try:
             thumbnail_path = thumbnail_map['filepath'];
 
@@ -91,51 +145,153 @@ def createItemsJSON(gltf_files, thumbnails, objfiles=None):
             export_thumb_path = os.path.join(export_dir_thumbnails, thumbnail_map['filename']);
             export_thumb_r_path = os.path.relpath(export_thumb_path, start=export_path_root);
 
-            copyfile(gltf_file_path, export_gltf_path);
-            copyfile(thumbnail_path, export_thumb_path);
+            for source_path, export_path in ((gltf_file_path, export_gltf_path), (thumbnail_path, export_thumb_path)):
+                if(export_path in exported):
+                    continue;
+                _, action = exportFile(source_path, export_path, entries, exported, by_hash);
+                actions[action] += 1;
 
-            json_gltf_items.append((gltf_name, gltf_type, export_gltf_r_path, export_thumb_r_path));
+            json_gltf_items.append((gltf_name, gltf_type, export_gltf_r_path, export_thumb_r_path, gltf_file_path, export_gltf_path));
         except TypeError:
             print('NO THUMBNAIL FOR %s SO SKIPPING THIS INVENTORY ITEM'%(gltf_name));
             pass;
 
 
-    createJSONJS(json_gltf_items, export_path_gltf_json);
-
-
-def resizeImages(imagefilesmap):
-    thumbnails_resized = createDir(os.path.abspath('./thumbnails_resized/'));
-
-    ow, oh = 300, 225;
+    # The metadata of a model is read again only when its content changed
+    pending = [];
+    for (_, _, _, _, gltf_file_path, export_gltf_path) in json_gltf_items:
+        entry, previous = exported[export_gltf_path], entries.get(export_gltf_path);
+        if(previous and previous.get('hash') == entry['hash'] and 'metadata' in previous):
+            entry['metadata'] = previous['metadata'];
+        elif(not 'metadata' in entry):
+            entry['metadata'] = None;
+            pending.append((gltf_file_path, entry));
+    for (_, entry), metadata in zip(pending, readCatalogMetadata([gltf_file_path for (gltf_file_path, _) in pending])):
+        entry['metadata'] = metadata;
+    json_gltf_items = [(mname, mtype, mpath, tpath, exported[export_gltf_path]['metadata']) for (mname, mtype, mpath, tpath, _, export_gltf_path) in json_gltf_items];
+
+    # Exports of models or thumbnails no longer in the inventory
+    for export_path in set(entries) - set(exported):
+        if(os.path.exists(export_path)):
+            os.remove(export_path);
+
+    writeManifest(manifest_path, {'files': exported});
+    json_items = createJSONItems(json_gltf_items, in_format);
+    print('EXPORTED %d ITEMS, %d COPIED, %d LINKED, %d UNCHANGED, %d MODELS READ'%(len(json_gltf_items), actions['copied'], actions['linked'], actions['skipped'], len(pending)));
+    if('atlas' in export_formats):
+        # Before the items are written, the atlases add the place of every thumbnail to its item
+        hashes = {export_path: entry['hash'] for export_path, entry in exported.items()};
+        print('ATLASES UPDATED ::: %d'%(writeAtlases(json_items, export_dir_atlases, export_path_root, hashes)));
+    if('js' in export_formats and createJSONJS(json_items, export_path_gltf_json)):
+        print('ITEMS JS UPDATED');
+    if('index' in export_formats):
+        print('INDEX FILES UPDATED ::: %d'%(writeIndex(json_items, export_dir_index)));
+
+
+def fileHash(filepath=None, data=None):
+    if(data is not None):
+        return hashlib.sha1(data).hexdigest();
+    sha = hashlib.sha1();
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk);
+    return sha.hexdigest();
+
+def fitThumbnail(in_img, need_size=THUMBNAIL_SIZE):
+    ow, oh = need_size;
     cx, cy = int(ow*0.5), int(oh*0.5);
     white = (255, 255, 255);
-    need_size = (ow, oh);
+
+    w, h = in_img.size;
+    rw, rh = w, h;
+    wbyhratio = float(w) / float(h);
+    if(w > h):
+        rw, rh = ow, ow / wbyhratio;
+    if(h > w):
+        rw, rh = oh * wbyhratio, oh;
+    rw, rh = max(int(rw), 1), max(int(rh), 1);
+    # Large downscales first shrink by an integer factor with a box filter, which is
+    # much cheaper than a lanczos over the full image and gives the same result
+    factor = min(w // rw, h // rh) // 2;
+    if(factor > 1):
+        in_img = in_img.reduce(factor);
+    in_img = in_img.resize((rw, rh), Image.LANCZOS);
+
+    w, h = in_img.size;
+    out_img = Image.new("RGBA", (ow, oh), white);
+    l, t = int(cx - (w*0.5)), int(cy - (h * 0.5));
+    out_img.paste(in_img, (l, t));
+    return out_img;
+
+def resizeImage(im_path, out_path, previous_hash=None, need_size=THUMBNAIL_SIZE):
+    # Runs in a worker process. The source is read once, hashed and only decoded when
+    # its content differs from the source of the existing resized thumbnail
+    with open(im_path, 'rb') as f:
+        data = f.read();
+    im_hash = fileHash(data=data);
+    if(im_hash == previous_hash and os.path.exists(out_path)):
+        return im_hash, False;
+
+    in_img = Image.open(io.BytesIO(data));
+    # JPEG sources are decoded at the smallest scale still larger than the thumbnail
+    in_img.draft('RGB', need_size);
+    out_img = fitThumbnail(in_img, need_size);
+    out_img.save(out_path);
+    return im_hash, True;
+
+def readManifest(manifest_path):
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f);
+    except (OSError, ValueError):
+        return {};
+
+def writeManifest(manifest_path, manifest):
+    temp_path = manifest_path + '.tmp';
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=1);
+    os.replace(temp_path, manifest_path);
+
+def resizeImages(imagefilesmap, workers=None):
+    thumbnails_resized = createDir(os.path.abspath('./thumbnails_resized/'));
+    manifest_path = os.path.join(thumbnails_resized, THUMBNAIL_MANIFEST);
+    manifest = readManifest(manifest_path);
+    # A different thumbnail size makes every resized thumbnail stale
+    entries = manifest.get('thumbnails', {}) if manifest.get('size') == list(THUMBNAIL_SIZE) else {};
+    new_entries = {};
+    pending = [];
 
     for im_map in imagefilesmap:
         im_path = im_map['filepath'];
         im_purename = im_map['purename'];
-        in_img = Image.open(im_path);
-        w, h = in_img.size;
-        rw, rh = w, h;
-        wbyhratio = float(w) / float(h);
-        if(w > h):
-            rw, rh = ow, ow / wbyhratio;
-        if(h > w):
-            rw, rh = oh * wbyhratio, oh;
-        in_img = in_img.resize((int(rw), int(rh)), Image.ANTIALIAS);
-
-        w, h = in_img.size;
-        out_img = Image.new("RGBA", (ow, oh), white);
         out_path = os.path.join(thumbnails_resized, '%s.png'%(im_purename));
-        l, t = int(cx - (w*0.5)), int(cy - (h * 0.5));
-        out_img.paste(in_img, (l, t));
-        out_img.save(out_path);
-
-        #~ print(out_path.split('.'));
-        #~ if(len(out_path.split('.')) > 2):
-            #~ print('PURENAME ::: ', im_purename);
-            #~ print('OUTPATH ::: ', out_path);
-            #~ raise IndexError;
+        stat = os.stat(im_path);
+        entry = {'source': im_path, 'size': stat.st_size, 'mtime': stat.st_mtime_ns};
+        previous = entries.get(im_purename);
+        if(previous and previous.get('source') == im_path and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime_ns and os.path.exists(out_path)):
+            new_entries[im_purename] = previous;
+            continue;
+        # Touched but maybe not changed, the worker compares the content hash
+        previous_hash = previous.get('hash') if previous and previous.get('source') == im_path else None;
+        pending.append((im_purename, entry, im_path, out_path, previous_hash));
+
+    resized = 0;
+    if(pending):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(resizeImage, im_path, out_path, previous_hash) for (_, _, im_path, out_path, previous_hash) in pending];
+            for (im_purename, entry, _, _, _), future in zip(pending, futures):
+                entry['hash'], written = future.result();
+                new_entries[im_purename] = entry;
+                resized += int(written);
+
+    # Resized thumbnails whose source is gone would still be listed in the inventory
+    for im_purename in set(entries) - set(new_entries):
+        stale_path = os.path.join(thumbnails_resized, '%s.png'%(im_purename));
+        if(os.path.exists(stale_path)):
+            os.remove(stale_path);
+
+    writeManifest(manifest_path, {'size': list(THUMBNAIL_SIZE), 'thumbnails': new_entries});
+    print('RESIZED %d OF %d THUMBNAILS'%(resized, len(new_entries)));
 
     thumbail_resized_files =  getFilesFromDirectory(thumbnails_resized, extension=['.png']);
     return thumbnails_resized, thumbail_resized_files;
@@ -158,21 +314,32 @@ export_path_root = os.path.abspath('../build/');
 # Right now the framework supports original project's json and GLTF format. More import formats need to be added
 # But this is a huge discussion, should we keep it standard to GLTF or support multiple formats?
 export_path_gltf_json = os.path.abspath('../build/js/items_%s.js'%(in_format));
+# The sharded index with a page of items per file and a search index over the names. The app
+# can load only the pages it shows instead of every item in items.js
+export_dir_index = os.path.abspath('../build/models/index/');
+# Sprite sheets with the thumbnails of each category, the items get the place of their thumbnail in them
+export_dir_atlases = os.path.abspath('../build/models/atlases/');
+# What should be exported? 'js' is the items.js above, 'index' is the sharded index and 'atlas' the sprite sheets
+export_formats = ['js', 'index', 'atlas'];
 
 # Path where all the meshes will be exported inside the build folder. This is where Blueprint-js will load the meshs(furnitures) from
-export_dir_gltf = createDir(os.path.abspath('../build/models/%s/'%(in_format)));
+export_dir_gltf = os.path.abspath('../build/models/%s/'%(in_format));
 # Path where all the thumbnails will be exported inside the build folder. This is where the inventory page displays the thumbnails of each furniture
-export_dir_thumbnails = createDir(os.path.abspath('../build/models/thumbnails_new/'));
+export_dir_thumbnails = os.path.abspath('../build/models/thumbnails_new/');
 
-# Now get all the GLTF files from the input_gltf_meshes location
-gltf_mesh_files = getFilesFromDirectory(input_gltf_meshes, extension=['.%s'%(in_format_extension), '.gltf'], recursive=True);
-# Sort the dictionary of gltf_file_maps alphabetically
-gltf_mesh_files = sorted(gltf_mesh_files, key=lambda k: k['purename']);
+if __name__ == "__main__":
+    # Everything below runs only as a script, the resize workers import this module again
+    createDir(export_dir_gltf);
+    createDir(export_dir_thumbnails);
 
-# Now Resizing of images is a compulsory process. This way the user has less worries.
-#thumbail_files =  getFilesFromDirectory(input_thumbnails, extension=['.png']);
-input_thumbnails, thumbnail_files = resizeImages(getFilesFromDirectory(input_original_thumbnails, extension=['.png']));
+    # Now get all the GLTF files from the input_gltf_meshes location
+    gltf_mesh_files = getFilesFromDirectory(input_gltf_meshes, extension=['.%s'%(in_format_extension), '.gltf'], recursive=True);
+    # Sort the dictionary of gltf_file_maps alphabetically
+    gltf_mesh_files = sorted(gltf_mesh_files, key=lambda k: k['purename']);
+
+    # Now Resizing of images is a compulsory process. This way the user has less worries.
+    #thumbail_files =  getFilesFromDirectory(input_thumbnails, extension=['.png']);
+    input_thumbnails, thumbnail_files = resizeImages(getFilesFromDirectory(input_original_thumbnails, extension=['.png']));
 
-if __name__ == "__main__":
     # Create the json files with all the inputs gathered so far and export the necessary files and folders
     createItemsJSON(gltf_mesh_files, thumbnail_files);
@@ -0,0 +1,99 @@
+import os;
+import re;
+import json;
+import hashlib;
+
+# The inventory as a sharded index the app can load piece by piece. Items are grouped
+# in one shard per category (the directory of the model) and every shard is split in
+# pages of INDEX_PAGE_SIZE items:
+#   index.json                  categories with their item count and pages
+#   <category>/<page>.json      the items of one page
+#   search.json                 sorted name tokens, for a prefix search by bisection
+# A file is only written when its content changed, so a change in one category only
+# rewrites the pages of that category and the search index
+
+INDEX_VERSION = 1;
+INDEX_PAGE_SIZE = 100;
+INDEX_FILE = 'index.json';
+SEARCH_FILE = 'search.json';
+
+# Words of an item name, camel case and digits split: 'KitchenTable2' -> kitchen, table, 2
+TOKEN_PATTERN = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+');
+
+def compactJSON(data):
+    return json.dumps(data, separators=(',', ':'));
+
+def writeIfChanged(filepath, content):
+    # Rewriting an unchanged file would only make the browser and git see a change
+    try:
+        with open(filepath, 'r') as f:
+            if(f.read() == content):
+                return False;
+    except OSError:
+        pass;
+    directory = os.path.dirname(filepath);
+    if(not os.path.exists(directory)):
+        os.makedirs(directory);
+    with open(filepath, 'w') as f:
+        f.write(content);
+    return True;
+
+def nameTokens(name):
+    return sorted({token.lower() for token in TOKEN_PATTERN.findall(name)});
+
+def createIndex(json_items, page_size=INDEX_PAGE_SIZE):
+    # The content of every file of the index by its path relative to the index directory
+    categories = {};
+    for json_item in json_items:
+        categories.setdefault(json_item['type'], []).append(json_item);
+
+    files = {};
+    index_categories = [];
+    # Item references for the search, the position of an item in its category
+    references = [];
+    postings = {};
+    for category_index, category in enumerate(sorted(categories)):
+        items = categories[category];
+        pages = [];
+        for page, start in enumerate(range(0, len(items), page_size)):
+            page_path = '%s/%04d.json'%(category, page);
+            content = compactJSON(items[start:start + page_size]);
+            files[page_path] = content;
+            pages.append({'url': page_path, 'hash': hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]});
+        index_categories.append({'name': category, 'count': len(items), 'pages': pages});
+
+        for position, json_item in enumerate(items):
+            # The model file keeps the camel case that the capitalized name lost
+            model_name = os.path.splitext(os.path.basename(json_item['model']))[0];
+            for token in nameTokens('%s %s'%(json_item['name'], model_name)):
+                postings.setdefault(token, []).append(len(references));
+            references.append([category_index, position]);
+
+    tokens = sorted(postings);
+    files[SEARCH_FILE] = compactJSON({'tokens': tokens, 'postings': [postings[token] for token in tokens], 'items': references});
+    files[INDEX_FILE] = compactJSON({
+        'version': INDEX_VERSION,
+        'pageSize': page_size,
+        'count': len(json_items),
+        'categories': index_categories,
+        'search': SEARCH_FILE,
+        'searchHash': hashlib.sha1(files[SEARCH_FILE].encode('utf-8')).hexdigest()[:16],
+    });
+    return files;
+
+def writeIndex(json_items, index_dir, page_size=INDEX_PAGE_SIZE):
+    # Writes the changed files of the index and removes pages of the previous index
+    # that are gone. Returns the number of files written
+    files = createIndex(json_items, page_size);
+    written = 0;
+    for relative_path, content in files.items():
+        written += int(writeIfChanged(os.path.join(index_dir, relative_path), content));
+
+    for root, directories, filenames in os.walk(index_dir, topdown=False):
+        for filename in filenames:
+            filepath = os.path.join(root, filename);
+            if(filename.endswith('.json') and not os.path.relpath(filepath, index_dir).replace(os.sep, '/') in files):
+                os.remove(filepath);
+        if(root != index_dir and not os.listdir(root)):
+            os.rmdir(root);
+    return written;
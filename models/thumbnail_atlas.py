@@ -0,0 +1,164 @@
+import os;
+import json;
+import hashlib;
+from concurrent.futures import ProcessPoolExecutor;
+
+from PIL import Image, features;
+
+# Sprite sheets of the exported thumbnails, a few per category, so the inventory page
+# loads a handful of images instead of one per item. The thumbnails of a category are
+# packed with a skyline packer into atlases of ATLAS_SIZE and every item gets the
+# rectangle and uv coordinates of its thumbnail. An atlas is only drawn again when the
+# thumbnails packed into it or their places changed
+
+ATLAS_SIZE = (2048, 2048);
+ATLAS_MANIFEST = 'atlas_manifest.json';
+# Lossless WebP is much smaller than PNG for these flat thumbnails, PNG when Pillow lacks WebP
+ATLAS_FORMAT = 'webp' if features.check('webp') else 'png';
+
+class SkylinePacker():
+    # Bottom left skyline packing, the skyline is a list of [x, y, width] segments
+    # covering the width of the atlas from left to right
+    def __init__(self, width, height):
+        self.__width = width;
+        self.__height = height;
+        self.__skyline = [[0, 0, width]];
+
+    def __fit(self, index, w, h):
+        # The lowest y a rectangle starting at the segment index can be placed at
+        x = self.__skyline[index][0];
+        if(x + w > self.__width):
+            return None;
+        y, remaining = 0, w;
+        while(remaining > 0):
+            if(index >= len(self.__skyline)):
+                return None;
+            y = max(y, self.__skyline[index][1]);
+            if(y + h > self.__height):
+                return None;
+            remaining -= self.__skyline[index][2];
+            index += 1;
+        return y;
+
+    def insert(self, w, h):
+        # The top left corner of the placed rectangle, None when the atlas is full
+        best = None;
+        for index in range(len(self.__skyline)):
+            y = self.__fit(index, w, h);
+            if(y is not None and (best is None or (y + h, self.__skyline[index][0]) < (best[1] + h, best[2]))):
+                best = (index, y, self.__skyline[index][0]);
+        if(best is None):
+            return None;
+        index, y, x = best;
+        self.__skyline.insert(index, [x, y + h, w]);
+        # Segments below the new one are shortened or removed
+        index += 1;
+        while(index < len(self.__skyline)):
+            segment = self.__skyline[index];
+            covered = x + w - segment[0];
+            if(covered <= 0):
+                break;
+            if(covered < segment[2]):
+                segment[0] += covered;
+                segment[2] -= covered;
+                break;
+            del self.__skyline[index];
+        self.__merge();
+        return x, y;
+
+    def __merge(self):
+        merged = [self.__skyline[0]];
+        for segment in self.__skyline[1:]:
+            if(segment[1] == merged[-1][1]):
+                merged[-1][2] += segment[2];
+            else:
+                merged.append(segment);
+        self.__skyline = merged;
+
+def packThumbnails(image_sizes, atlas_size=ATLAS_SIZE):
+    # Lists of (image, x, y, w, h), one per atlas. Taller thumbnails go first, the
+    # order is otherwise that of image_sizes so an unchanged category packs the same
+    order = sorted(range(len(image_sizes)), key=lambda i: (-image_sizes[i][2], -image_sizes[i][1], i));
+    atlases, packer = [], None;
+    for i in order:
+        image, w, h = image_sizes[i];
+        place = packer.insert(w, h) if packer else None;
+        if(place is None):
+            packer = SkylinePacker(*atlas_size);
+            atlases.append([]);
+            place = packer.insert(w, h);
+            if(place is None):
+                print('THUMBNAIL %s DOES NOT FIT IN AN ATLAS'%(image));
+                continue;
+        atlases[-1].append((image, place[0], place[1], w, h));
+    return atlases;
+
+def drawAtlas(atlas_path, members, atlas_size=ATLAS_SIZE):
+    # Runs in a worker process
+    atlas = Image.new('RGBA', atlas_size, (255, 255, 255, 0));
+    for (image_path, x, y, w, h) in members:
+        with Image.open(image_path) as thumbnail:
+            atlas.paste(thumbnail.convert('RGBA'), (x, y));
+    temp_path = atlas_path + '.tmp';
+    atlas.save(temp_path, format=ATLAS_FORMAT, **({'lossless': True, 'method': 4} if ATLAS_FORMAT == 'webp' else {'optimize': True}));
+    os.replace(temp_path, atlas_path);
+    return atlas_path;
+
+def writeAtlases(json_items, atlas_dir, export_path_root, hashes, atlas_size=ATLAS_SIZE, workers=None):
+    # Adds the 'atlas' of every item with a thumbnail in json_items and draws the atlases
+    # whose members changed. hashes are the content hashes of the thumbnails by their
+    # exported path. Returns the number of atlases drawn
+    if(not os.path.exists(atlas_dir)):
+        os.makedirs(atlas_dir);
+    manifest_path = os.path.join(atlas_dir, ATLAS_MANIFEST);
+    try:
+        with open(manifest_path, 'r') as f:
+            previous = json.load(f);
+    except (OSError, ValueError):
+        previous = {};
+
+    categories = {};
+    for json_item in json_items:
+        categories.setdefault(json_item['type'], []).append(json_item);
+
+    signatures, pending = {}, [];
+    aw, ah = atlas_size;
+    for category in sorted(categories):
+        # Items sharing a thumbnail (nopreview) share its place in the atlas
+        images = list(dict.fromkeys(json_item['image'] for json_item in categories[category]));
+        image_sizes = [];
+        for image in images:
+            with Image.open(os.path.join(export_path_root, image)) as thumbnail:
+                image_sizes.append((image, thumbnail.width, thumbnail.height));
+
+        rectangles = {};
+        for index, members in enumerate(packThumbnails(image_sizes, atlas_size)):
+            atlas_name = '%s-%d.%s'%(category, index, ATLAS_FORMAT);
+            atlas_path = os.path.join(atlas_dir, atlas_name);
+            atlas_url = os.path.relpath(atlas_path, start=export_path_root).replace(os.sep, '/');
+            signature = hashlib.sha1(json.dumps([atlas_size, [(image, hashes.get(os.path.join(export_path_root, image)), x, y, w, h) for (image, x, y, w, h) in members]]).encode('utf-8')).hexdigest();
+            signatures[atlas_name] = signature;
+            if(previous.get(atlas_name) != signature or not os.path.exists(atlas_path)):
+                pending.append((atlas_path, [(os.path.join(export_path_root, image), x, y, w, h) for (image, x, y, w, h) in members]));
+            for (image, x, y, w, h) in members:
+                rectangles[image] = {'url': atlas_url, 'rect': [x, y, w, h], 'uv': [x / aw, y / ah, (x + w) / aw, (y + h) / ah]};
+
+        for json_item in categories[category]:
+            if(json_item['image'] in rectangles):
+                json_item['atlas'] = rectangles[json_item['image']];
+
+    if(pending):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(drawAtlas, [atlas_path for (atlas_path, _) in pending], [members for (_, members) in pending], [atlas_size] * len(pending)));
+
+    # Atlases of categories that shrank or are gone
+    for atlas_name in set(previous) - set(signatures):
+        atlas_path = os.path.join(atlas_dir, atlas_name);
+        if(os.path.exists(atlas_path)):
+            os.remove(atlas_path);
+
+    temp_path = manifest_path + '.tmp';
+    with open(temp_path, 'w') as f:
+        json.dump(signatures, f, indent=1);
+    os.replace(temp_path, manifest_path);
+    return len(pending);